@@ -130,5 +130,11 @@ def parse_args():
         '--no_random',
         action='store_true',
         help='If set, keep the random seed and do not shuffle the data.')
+    parser.add_argument(
+        '--max_tokens_per_batch',
+        type=int,
+        default=0,
+        help='If set, batch sequences by length with at most this many padded '
+        'tokens per batch, only available for machine_translation.')
     args = parser.parse_args()
     return args
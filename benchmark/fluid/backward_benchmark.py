@@ -0,0 +1,122 @@
+# Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark the graph construction time of append_backward as the depth of
+the network grows.
+
+    python backward_benchmark.py --model transformer --depths 1,2,4,8,16
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+import paddle.fluid as fluid
+
+UNITTEST_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "python",
+    "paddle", "fluid", "tests", "unittests")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser('append_backward benchmark.')
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='transformer',
+        choices=['transformer', 'stacked_lstm'],
+        help='The model to build.')
+    parser.add_argument(
+        '--depths',
+        type=str,
+        default='1,2,4,8,16',
+        help='Comma separated numbers of layers to build.')
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='The number of times to build each depth, the best is reported.')
+    return parser.parse_args()
+
+
+def build_transformer(depth):
+    sys.path.insert(0, UNITTEST_DIR)
+    from dist_transformer import transformer, ModelHyperParams
+
+    sum_cost, _, _, _ = transformer(
+        ModelHyperParams.src_vocab_size, ModelHyperParams.trg_vocab_size,
+        ModelHyperParams.max_length + 1, depth, ModelHyperParams.n_head,
+        ModelHyperParams.d_key, ModelHyperParams.d_value,
+        ModelHyperParams.d_model, ModelHyperParams.d_inner_hid,
+        ModelHyperParams.dropout, ModelHyperParams.weight_sharing, 0.1)
+    return sum_cost
+
+
+def build_stacked_lstm(depth, dict_dim=10000, emb_dim=128, hid_dim=512):
+    data = fluid.layers.data(
+        name="words", shape=[1], dtype="int64", lod_level=1)
+    label = fluid.layers.data(name="label", shape=[1], dtype="int64")
+    emb = fluid.layers.embedding(input=data, size=[dict_dim, emb_dim])
+
+    fc1 = fluid.layers.fc(input=emb, size=hid_dim)
+    lstm1, cell1 = fluid.layers.dynamic_lstm(input=fc1, size=hid_dim)
+    inputs = [fc1, lstm1]
+    for i in range(2, depth + 1):
+        fc = fluid.layers.fc(input=inputs, size=hid_dim)
+        lstm, cell = fluid.layers.dynamic_lstm(
+            input=fc, size=hid_dim, is_reverse=(i % 2) == 0)
+        inputs = [fc, lstm]
+
+    fc_last = fluid.layers.sequence_pool(input=inputs[0], pool_type='max')
+    lstm_last = fluid.layers.sequence_pool(input=inputs[1], pool_type='max')
+    prediction = fluid.layers.fc(input=[fc_last, lstm_last],
+                                 size=2,
+                                 act='softmax')
+    cost = fluid.layers.cross_entropy(input=prediction, label=label)
+    return fluid.layers.mean(cost)
+
+
+def time_append_backward(build, depth):
+    main_program = fluid.Program()
+    with fluid.program_guard(main_program, fluid.Program()):
+        loss = build(depth)
+        num_forward_ops = len(main_program.global_block().ops)
+        start = time.time()
+        fluid.backward.append_backward(loss)
+        elapsed = time.time() - start
+    return num_forward_ops, len(main_program.global_block().ops), elapsed
+
+
+def main():
+    args = parse_args()
+    build = {
+        'transformer': build_transformer,
+        'stacked_lstm': build_stacked_lstm
+    }[args.model]
+    print("%8s %12s %12s %12s" % ("depth", "forward_ops", "total_ops",
+                                  "seconds"))
+    for depth in [int(d) for d in args.depths.split(',')]:
+        results = [
+            time_append_backward(build, depth) for _ in range(args.repeat)
+        ]
+        num_forward_ops, num_ops, _ = results[0]
+        best = min(r[2] for r in results)
+        print("%8d %12d %12d %12.4f" % (depth, num_forward_ops, num_ops, best))
+
+
+if __name__ == '__main__':
+    main()
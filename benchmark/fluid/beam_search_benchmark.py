@@ -0,0 +1,152 @@
+# Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark the decode latency of the machine translation model built with
+fluid.contrib.decoder.BeamSearchDecoder against the beam size. The source
+sentences are random, and the time to convert the decoded LoD outputs to
+padded arrays is reported separately.
+
+    python beam_search_benchmark.py --beam_sizes 1,2,4,8 --device CPU
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import numpy as np
+import six
+
+import paddle.fluid as fluid
+import paddle.fluid.layers as layers
+from paddle.fluid.contrib.decoder.beam_search_decoder import InitState, \
+    StateCell, BeamSearchDecoder, beam_search_decode_to_padded
+
+
+def parse_args():
+    parser = argparse.ArgumentParser('Beam search decode benchmark.')
+    parser.add_argument('--beam_sizes', type=str, default='1,2,4,8')
+    parser.add_argument('--batch_size', type=int, default=16)
+    parser.add_argument('--dict_size', type=int, default=30000)
+    parser.add_argument('--embedding_dim', type=int, default=512)
+    parser.add_argument('--hidden_dim', type=int, default=512)
+    parser.add_argument('--max_length', type=int, default=50)
+    parser.add_argument('--src_length', type=int, default=30)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--skip_batch_num', type=int, default=2)
+    parser.add_argument(
+        '--device',
+        type=str,
+        default='CPU',
+        choices=['CPU', 'GPU'],
+        help='The device type.')
+    return parser.parse_args()
+
+
+def build_decoder(args, beam_size):
+    src_word = layers.data(
+        name="src_word", shape=[1], dtype='int64', lod_level=1)
+    src_embedding = layers.embedding(
+        input=src_word, size=[args.dict_size, args.embedding_dim])
+    fc1 = layers.fc(input=src_embedding, size=args.hidden_dim * 4, act='tanh')
+    lstm_hidden0, _ = layers.dynamic_lstm(input=fc1, size=args.hidden_dim * 4)
+    context = layers.sequence_last_step(input=lstm_hidden0)
+
+    h = InitState(init=context, need_reorder=True)
+    state_cell = StateCell(inputs={'x': None}, states={'h': h}, out_state='h')
+
+    @state_cell.state_updater
+    def updater(state_cell):
+        current_word = state_cell.get_input('x')
+        prev_h = state_cell.get_state('h')
+        h = layers.fc(input=[prev_h, current_word],
+                      size=args.hidden_dim,
+                      act='tanh')
+        state_cell.set_state('h', h)
+
+    init_ids = layers.data(
+        name="init_ids", shape=[1], dtype="int64", lod_level=2)
+    init_scores = layers.data(
+        name="init_scores", shape=[1], dtype="float32", lod_level=2)
+    decoder = BeamSearchDecoder(
+        state_cell=state_cell,
+        init_ids=init_ids,
+        init_scores=init_scores,
+        target_dict_dim=args.dict_size,
+        word_dim=args.embedding_dim,
+        max_len=args.max_length,
+        beam_size=beam_size,
+        end_id=1)
+    decoder.decode()
+    return decoder()
+
+
+def random_feed(args, place):
+    seq_lens = [args.src_length] * args.batch_size
+    src_word = np.random.randint(
+        2, args.dict_size, size=(sum(seq_lens), 1)).astype('int64')
+    init_lod = [[1] * args.batch_size, [1] * args.batch_size]
+    init_ids = np.zeros((args.batch_size, 1), dtype='int64')
+    init_scores = np.ones((args.batch_size, 1), dtype='float32')
+    return {
+        'src_word': fluid.create_lod_tensor(src_word, [seq_lens], place),
+        'init_ids': fluid.create_lod_tensor(init_ids, init_lod, place),
+        'init_scores': fluid.create_lod_tensor(init_scores, init_lod, place)
+    }
+
+
+def run(args, beam_size, place):
+    main_program = fluid.Program()
+    startup_program = fluid.Program()
+    with fluid.program_guard(main_program, startup_program):
+        with fluid.unique_name.guard():
+            translation_ids, translation_scores = build_decoder(args,
+                                                                beam_size)
+    exe = fluid.Executor(place)
+    decode_time = convert_time = 0.
+    lengths = []
+    with fluid.scope_guard(fluid.core.Scope()):
+        exe.run(startup_program)
+        for i in six.moves.range(args.skip_batch_num + args.iterations):
+            feed = random_feed(args, place)
+            start = time.time()
+            ids, scores = exe.run(main_program,
+                                  feed=feed,
+                                  fetch_list=[translation_ids,
+                                              translation_scores],
+                                  return_numpy=False)
+            decoded = time.time()
+            _, hyp_lens, _ = beam_search_decode_to_padded(ids, scores)
+            if i < args.skip_batch_num:
+                continue
+            decode_time += decoded - start
+            convert_time += time.time() - decoded
+            lengths.append(hyp_lens[:, 0].mean())
+    return (decode_time / args.iterations, convert_time / args.iterations,
+            np.mean(lengths))
+
+
+def main():
+    args = parse_args()
+    place = fluid.CUDAPlace(0) if args.device == 'GPU' else fluid.CPUPlace()
+    print("%-10s %14s %14s %12s" % ("beam_size", "decode(ms)", "convert(ms)",
+                                    "mean_length"))
+    for beam_size in [int(s) for s in args.beam_sizes.split(',')]:
+        decode_time, convert_time, length = run(args, beam_size, place)
+        print("%-10d %14.2f %14.3f %12.2f" %
+              (beam_size, decode_time * 1000, convert_time * 1000, length))
+
+
+if __name__ == '__main__':
+    main()
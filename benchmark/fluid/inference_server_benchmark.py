@@ -0,0 +1,137 @@
+# Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A local load generator of fluid.contrib.BatchingInferencer. Client threads
+send single sample requests to an MLP as fast as they can, and the latency
+and throughput are compared with calling Inferencer.infer under a lock.
+
+    python inference_server_benchmark.py --clients 16 --num_workers 4
+"""
+
+from __future__ import print_function
+
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import six
+
+import paddle.fluid as fluid
+from paddle.fluid.contrib import BatchingInferencer, Histogram
+
+
+def parse_args():
+    parser = argparse.ArgumentParser('BatchingInferencer benchmark.')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--num_workers', type=int, default=4)
+    parser.add_argument('--max_batch_size', type=int, default=32)
+    parser.add_argument(
+        '--max_delay', type=float, default=0.002, help='In seconds.')
+    parser.add_argument('--input_size', type=int, default=256)
+    parser.add_argument('--hidden_size', type=int, default=1024)
+    parser.add_argument('--num_layers', type=int, default=3)
+    return parser.parse_args()
+
+
+def create_inferencer(args, param_path):
+    def infer_func():
+        x = fluid.layers.data(
+            name='x', shape=[args.input_size], dtype='float32')
+        hidden = x
+        for _ in six.moves.range(args.num_layers):
+            hidden = fluid.layers.fc(input=hidden,
+                                     size=args.hidden_size,
+                                     act='relu')
+        return fluid.layers.fc(input=hidden, size=10, act='softmax')
+
+    main_program = fluid.Program()
+    startup_program = fluid.Program()
+    with fluid.program_guard(main_program, startup_program):
+        with fluid.unique_name.guard():
+            infer_func()
+    place = fluid.CPUPlace()
+    exe = fluid.Executor(place)
+    with fluid.scope_guard(fluid.core.Scope()):
+        exe.run(startup_program)
+        fluid.io.save_params(exe, param_path, main_program=main_program)
+    return fluid.Inferencer(
+        infer_func=infer_func, param_path=param_path, place=place)
+
+
+def run_load(infer, args):
+    latency = Histogram()
+    stop_time = time.time() + args.duration
+
+    def client():
+        x = np.random.random((1, args.input_size)).astype('float32')
+        while time.time() < stop_time:
+            start = time.time()
+            infer({'x': x})
+            latency.record(time.time() - start)
+
+    threads = [
+        threading.Thread(target=client) for _ in six.moves.range(args.clients)
+    ]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latency, latency.count / (time.time() - start)
+
+
+def print_result(name, latency, qps):
+    summary = latency.summary()
+    print("%-20s %10.1f %10.2f %10.2f %10.2f" %
+          (name, qps, summary["p50"] * 1000, summary["p90"] * 1000,
+           summary["p99"] * 1000))
+
+
+def main():
+    args = parse_args()
+    param_path = tempfile.mkdtemp()
+    try:
+        inferencer = create_inferencer(args, param_path)
+        print("%-20s %10s %10s %10s %10s" % ("mode", "qps", "p50(ms)",
+                                            "p90(ms)", "p99(ms)"))
+
+        lock = threading.Lock()
+
+        def locked_infer(inputs):
+            with lock:
+                return inferencer.infer(inputs)
+
+        print_result("Inferencer", *run_load(locked_infer, args))
+
+        server = BatchingInferencer(
+            inferencer,
+            max_batch_size=args.max_batch_size,
+            max_delay=args.max_delay,
+            num_workers=args.num_workers)
+        print_result("BatchingInferencer", *run_load(server.infer, args))
+        stats = server.stats()
+        server.close()
+        print("mean batch size: %.2f, mean queue latency: %.3f ms" %
+              (stats["batch_size"]["mean"],
+               stats["queue_latency"]["mean"] * 1000))
+    finally:
+        shutil.rmtree(param_path)
+
+
+if __name__ == '__main__':
+    main()
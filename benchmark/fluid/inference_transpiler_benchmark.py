@@ -0,0 +1,118 @@
+# Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark the inference latency of the models saved by the book tests before
+and after the InferenceTranspiler, for example:
+
+    cd python/paddle/fluid/tests/book && python test_image_classification.py
+    python inference_transpiler_benchmark.py \\
+        --model_dirs image_classification_resnet.inference.model
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import numpy as np
+import six
+
+import paddle.fluid as fluid
+import paddle.fluid.core as core
+
+
+def parse_args():
+    parser = argparse.ArgumentParser('InferenceTranspiler benchmark.')
+    parser.add_argument(
+        '--model_dirs',
+        type=str,
+        required=True,
+        help='Comma separated directories of the saved inference models.')
+    parser.add_argument(
+        '--device',
+        type=str,
+        default='CPU',
+        choices=['CPU', 'GPU'],
+        help='The device type.')
+    parser.add_argument('--batch_size', type=int, default=1)
+    parser.add_argument(
+        '--seq_len',
+        type=int,
+        default=10,
+        help='The length of each sequence of the LoD inputs.')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--skip_batch_num', type=int, default=10)
+    return parser.parse_args()
+
+
+def random_feed(program, feed_names, args, place):
+    block = program.global_block()
+    feed = dict()
+    for name in feed_names:
+        var = block.var(name)
+        dtype = core.VarDesc.VarType
+        shape = [d if d > 0 else 1 for d in var.shape]
+        num_rows = args.batch_size
+        if var.lod_level > 0:
+            num_rows *= args.seq_len
+        shape[0] = num_rows
+        if var.dtype in (dtype.INT32, dtype.INT64):
+            np_dtype = 'int64' if var.dtype == dtype.INT64 else 'int32'
+            data = np.random.randint(0, 2, size=shape).astype(np_dtype)
+        else:
+            data = np.random.random(shape).astype('float32')
+        if var.lod_level > 0:
+            feed[name] = fluid.create_lod_tensor(
+                data, [[args.seq_len] * args.batch_size], place)
+        else:
+            feed[name] = data
+    return feed
+
+
+def time_program(exe, program, feed, fetch_targets, args):
+    for _ in six.moves.xrange(args.skip_batch_num):
+        exe.run(program, feed=feed, fetch_list=fetch_targets)
+    start = time.time()
+    for _ in six.moves.xrange(args.iterations):
+        exe.run(program, feed=feed, fetch_list=fetch_targets)
+    return (time.time() - start) / args.iterations * 1000
+
+
+def main():
+    args = parse_args()
+    place = fluid.CUDAPlace(0) if args.device == 'GPU' else fluid.CPUPlace()
+    exe = fluid.Executor(place)
+    print("%-48s %6s %6s %12s %12s" % ("model", "ops", "fused", "before(ms)",
+                                        "after(ms)"))
+    for model_dir in args.model_dirs.split(','):
+        scope = core.Scope()
+        with fluid.scope_guard(scope):
+            [program, feed_names, fetch_targets] = \
+                fluid.io.load_inference_model(model_dir, exe)
+            feed = random_feed(program, feed_names, args, place)
+            before = time_program(exe, program, feed, fetch_targets, args)
+
+            num_ops = len(program.global_block().ops)
+            t = fluid.InferenceTranspiler()
+            num_removed = t.transpile(program, place, scope)
+            after = time_program(exe, program, feed, fetch_targets, args)
+        print("%-48s %6d %6d %12.4f %12.4f" % (model_dir, num_ops, num_removed,
+                                               before, after))
+        for name, removed in six.iteritems(t.fuse_stats):
+            if removed:
+                print("    %-44s %6d" % (name, removed))
+
+
+if __name__ == '__main__':
+    main()
@@ -205,10 +205,18 @@ def get_model(args):
 
     optimizer = fluid.optimizer.Adam(learning_rate=args.learning_rate)
 
-    train_batch_generator = paddle.batch(
-        paddle.reader.shuffle(
-            paddle.dataset.wmt14.train(dict_size), buf_size=1000),
-        batch_size=args.batch_size * args.gpus)
+    if args.max_tokens_per_batch > 0:
+        # Group sentences of similar length to reduce padding.
+        train_batch_generator = paddle.reader.bucket_batch(
+            paddle.dataset.wmt14.train(dict_size),
+            max_tokens=args.max_tokens_per_batch * args.gpus,
+            length_key=lambda sample: max(len(sample[0]), len(sample[1])),
+            buf_size=1000)
+    else:
+        train_batch_generator = paddle.batch(
+            paddle.reader.shuffle(
+                paddle.dataset.wmt14.train(dict_size), buf_size=1000),
+            batch_size=args.batch_size * args.gpus)
 
     test_batch_generator = paddle.batch(
         paddle.reader.shuffle(
@@ -0,0 +1,146 @@
+# Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark the latency of loading many parameters saved one file per
+variable, in a save_combine file, and in a memory-mapped combined parameter
+file, as a whole and a subset. The memory-mapped variables are read lazily,
+so loading and then reading all of them is measured as well.
+
+    python param_load_benchmark.py --num_vars 10000 --dirname /mnt/nfs/bench
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import six
+
+import paddle.fluid as fluid
+from paddle.fluid.contrib import convert_to_combined_params, \
+    load_combined_params
+
+
+def parse_args():
+    parser = argparse.ArgumentParser('Parameter loading benchmark.')
+    parser.add_argument('--num_vars', type=int, default=10000)
+    parser.add_argument(
+        '--var_size',
+        type=int,
+        default=4096,
+        help='The number of float32 elements of each variable.')
+    parser.add_argument(
+        '--subset_ratio',
+        type=float,
+        default=0.01,
+        help='The ratio of the variables loaded by the subset loading.')
+    parser.add_argument(
+        '--dirname',
+        type=str,
+        default=None,
+        help='The directory to save the parameters, like a network storage. '
+        'A temporary directory is used by default.')
+    return parser.parse_args()
+
+
+def build_program(args):
+    program = fluid.Program()
+    block = program.global_block()
+    for i in six.moves.range(args.num_vars):
+        block.create_var(
+            name="var_%d" % i,
+            shape=[args.var_size],
+            dtype='float32',
+            persistable=True)
+    return program
+
+
+def drop_page_cache(dirname):
+    # Evict the saved files from the page cache to measure a cold start.
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for root, _, files in os.walk(dirname):
+        for filename in files:
+            fd = os.open(os.path.join(root, filename), os.O_RDONLY)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            os.close(fd)
+    return True
+
+
+def read_all(names):
+    # The mapped pages are read on first use, so read them all.
+    scope = fluid.global_scope()
+    for name in names:
+        np.array(scope.find_var(name).get_tensor()).sum()
+
+
+def timeit(dirname, load):
+    cold = drop_page_cache(dirname)
+    with fluid.scope_guard(fluid.core.Scope()):
+        start = time.time()
+        load()
+        return time.time() - start, cold
+
+
+def main():
+    args = parse_args()
+    dirname = tempfile.mkdtemp(dir=args.dirname)
+    try:
+        program = build_program(args)
+        exe = fluid.Executor(fluid.CPUPlace())
+        names = [v.name for v in program.list_vars()]
+        with fluid.scope_guard(fluid.core.Scope()):
+            scope = fluid.global_scope()
+            for name in names:
+                scope.var(name).get_tensor().set(
+                    np.random.random(args.var_size).astype('float32'),
+                    fluid.CPUPlace())
+            fluid.io.save_persistables(exe, os.path.join(dirname, "files"),
+                                       program)
+            fluid.io.save_persistables(
+                exe,
+                os.path.join(dirname, "combine"),
+                program,
+                filename="__params__")
+        combined = os.path.join(dirname, "model.params")
+        convert_to_combined_params(
+            os.path.join(dirname, "files"), combined, main_program=program)
+
+        subset = names[:max(1, int(len(names) * args.subset_ratio))]
+        cases = [
+            ("load_vars per file", lambda: fluid.io.load_persistables(
+                exe, os.path.join(dirname, "files"), program)),
+            ("load_vars save_combine", lambda: fluid.io.load_persistables(
+                exe, os.path.join(dirname, "combine"), program,
+                filename="__params__")),
+            ("mmap combined", lambda: load_combined_params(combined)),
+            ("mmap combined subset", lambda: load_combined_params(
+                combined, var_names=subset)),
+            ("mmap combined and read", lambda: read_all(
+                load_combined_params(combined))),
+        ]
+        print("%-28s %12s %8s" % ("case", "seconds", "cold"))
+        for name, load in cases:
+            elapsed, cold = timeit(dirname, load)
+            print("%-28s %12.4f %8s" % (name, elapsed, cold))
+    finally:
+        shutil.rmtree(dirname)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark the time of building the training programs of the book models and
+the models under benchmark/fluid/models, split into the forward network and
+optimizer.minimize, which includes append_backward.
+
+    python program_build_benchmark.py --models resnet,vgg,book_resnet
+"""
+
+from __future__ import print_function
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+import paddle.fluid as fluid
+
+BOOK_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "python",
+    "paddle", "fluid", "tests", "book")
+
+BENCHMARK_MODELS = [
+    "machine_translation", "resnet", "vgg", "mnist", "stacked_dynamic_lstm"
+]
+BOOK_MODELS = [
+    "book_recognize_digits", "book_resnet", "book_vgg",
+    "book_rnn_encoder_decoder"
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser('Program build benchmark.')
+    parser.add_argument(
+        '--models',
+        type=str,
+        default=','.join(BENCHMARK_MODELS + BOOK_MODELS),
+        help='Comma separated models to build.')
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='The number of times to build each model, the best is reported.')
+    return parser.parse_args()
+
+
+def benchmark_model_args():
+    # The arguments of fluid_benchmark.py that the models read.
+    return argparse.Namespace(
+        batch_size=32,
+        learning_rate=0.001,
+        gpus=1,
+        cpus=1,
+        device='CPU',
+        data_format='NCHW',
+        data_set='cifar10',
+        data_path='',
+        pass_num=1,
+        use_reader_op=False,
+        no_random=True,
+        max_tokens_per_batch=0)
+
+
+def build_benchmark_model(name):
+    model_def = importlib.import_module("models.%s" % name)
+    avg_cost, _, optimizer = model_def.get_model(benchmark_model_args())[:3]
+    return avg_cost, optimizer
+
+
+def build_book_model(name):
+    sys.path.insert(0, BOOK_DIR)
+    if name == "book_recognize_digits":
+        from test_recognize_digits import conv_net
+        img = fluid.layers.data(name='img', shape=[1, 28, 28], dtype='float32')
+        label = fluid.layers.data(name='label', shape=[1], dtype='int64')
+        _, avg_cost, _ = conv_net(img, label)
+    elif name == "book_rnn_encoder_decoder":
+        from test_rnn_encoder_decoder import seq_to_seq_net
+        avg_cost, _ = seq_to_seq_net()
+    else:
+        from test_image_classification import resnet_cifar10, vgg16_bn_drop
+        images = fluid.layers.data(
+            name='pixel', shape=[3, 32, 32], dtype='float32')
+        label = fluid.layers.data(name='label', shape=[1], dtype='int64')
+        if name == "book_resnet":
+            net = resnet_cifar10(images, 32)
+        else:
+            net = vgg16_bn_drop(images)
+        predict = fluid.layers.fc(input=net, size=10, act='softmax')
+        cost = fluid.layers.cross_entropy(input=predict, label=label)
+        avg_cost = fluid.layers.mean(cost)
+    return avg_cost, fluid.optimizer.Adam(learning_rate=0.001)
+
+
+def time_build(name):
+    main_program = fluid.Program()
+    startup_program = fluid.Program()
+    with fluid.program_guard(main_program, startup_program):
+        start = time.time()
+        if name in BOOK_MODELS:
+            avg_cost, optimizer = build_book_model(name)
+        else:
+            avg_cost, optimizer = build_benchmark_model(name)
+        forward_time = time.time() - start
+        start = time.time()
+        optimizer.minimize(avg_cost)
+        minimize_time = time.time() - start
+    return len(main_program.global_block().ops), forward_time, minimize_time
+
+
+def main():
+    args = parse_args()
+    print("%-26s %8s %12s %12s" % ("model", "ops", "forward(s)",
+                                    "minimize(s)"))
+    for name in args.models.split(','):
+        results = [time_build(name) for _ in range(args.repeat)]
+        num_ops = results[0][0]
+        print("%-26s %8d %12.4f %12.4f" % (name, num_ops,
+                                           min(r[1] for r in results),
+                                           min(r[2] for r in results)))
+
+
+if __name__ == '__main__':
+    main()
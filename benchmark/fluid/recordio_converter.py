@@ -16,7 +16,6 @@ import os
 import random
 import paddle
 import paddle.fluid as fluid
-import paddle.fluid.core as core
 from paddle.dataset import mnist, cifar, flowers, image
 
 
@@ -116,42 +115,7 @@ def imagenet_test(data_dir):
     return paddle.reader.map_readers(default_mapper, test_reader)
 
 
-# FIXME(wuyi): delete this when https://github.com/PaddlePaddle/Paddle/pull/11066 is merged
-def convert_reader_to_recordio_files(
-        filename,
-        batch_per_file,
-        reader_creator,
-        feeder,
-        compressor=core.RecordIOWriter.Compressor.Snappy,
-        max_num_records=1000,
-        feed_order=None):
-    if feed_order is None:
-        feed_order = feeder.feed_names
-    f_name, f_ext = os.path.splitext(filename)
-    assert (f_ext == ".recordio")
-
-    lines = []
-    f_idx = 0
-    counter = 0
-    for idx, batch in enumerate(reader_creator()):
-        lines.append(batch)
-        if idx >= batch_per_file and idx % batch_per_file == 0:
-            filename = "%s-%05d%s" % (f_name, f_idx, f_ext)
-            with fluid.recordio_writer.create_recordio_writer(
-                    filename, compressor, max_num_records) as writer:
-                for l in lines:
-                    res = feeder.feed(l)
-                    for each in feed_order:
-                        writer.append_tensor(res[each])
-                    writer.complete_append_tensor()
-                    counter += 1
-                lines = []
-                f_idx += 1
-            print("written file: ", filename)
-    return counter
-
-
-def prepare_imagenet(inpath, outpath, batch_size):
+def prepare_imagenet(inpath, outpath, batch_size, num_workers=1):
     r = paddle.batch(imagenet_train(inpath), batch_size=batch_size)
     feeder = fluid.DataFeeder(
         feed_list=[
@@ -161,4 +125,5 @@ def prepare_imagenet(inpath, outpath, batch_size):
         ],
         place=fluid.CPUPlace())
     outpath = os.path.join(outpath, "imagenet.recordio")
-    convert_reader_to_recordio_files(outpath, 10000, r, feeder)
+    fluid.recordio_writer.convert_reader_to_recordio_files(
+        outpath, 10000, r, feeder, num_workers=num_workers)
@@ -0,0 +1,93 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark py_paddle.DataProviderConverter on CTR-style batches, with sparse
+binary and sparse float features, a dense feature and a label, against the
+per-sample two passes scan.
+
+    python dataprovider_converter_benchmark.py --batch_size 512
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+import py_paddle.swig_paddle as api
+from py_paddle import DataProviderConverter
+from py_paddle.dataprovider_converter import IScanner
+import paddle.trainer.PyDataProvider2 as dp2
+
+
+def parse_args():
+    parser = argparse.ArgumentParser('DataProviderConverter benchmark.')
+    parser.add_argument('--batch_size', type=int, default=512)
+    parser.add_argument('--sparse_dim', type=int, default=1000000)
+    parser.add_argument('--nnz', type=int, default=100)
+    parser.add_argument('--dense_dim', type=int, default=13)
+    parser.add_argument('--iterations', type=int, default=50)
+    return parser.parse_args()
+
+
+def ctr_batch(args):
+    batch = []
+    for _ in xrange(args.batch_size):
+        nnz = np.random.randint(1, args.nnz * 2)
+        ids = np.random.randint(args.sparse_dim, size=nnz).tolist()
+        values = np.random.random(nnz).tolist()
+        batch.append((ids, zip(ids, values),
+                      np.random.random(args.dense_dim).tolist(),
+                      np.random.randint(2)))
+    return batch
+
+
+def two_pass_convert(converter, batch):
+    # The conversion before the scanners converted each slot at once.
+    argument = api.Arguments.createArguments(0)
+    argument.resize(len(converter.input_types))
+    scanners = [
+        DataProviderConverter.create_scanner(i, each_type)
+        for i, each_type in enumerate(converter.input_types)
+    ]
+    for column, scanner in itertools.izip(itertools.izip(*batch), scanners):
+        IScanner.scan_batch(scanner, column, argument)
+    return argument
+
+
+def timeit(convert, batches):
+    start = time.time()
+    for batch in batches:
+        convert(batch)
+    return (time.time() - start) / len(batches)
+
+
+def main():
+    args = parse_args()
+    api.initPaddle("--use_gpu=false")
+    converter = DataProviderConverter([
+        dp2.sparse_binary_vector(args.sparse_dim),
+        dp2.sparse_float_vector(args.sparse_dim),
+        dp2.dense_vector(args.dense_dim), dp2.integer_value(2)
+    ])
+    batches = [ctr_batch(args) for _ in xrange(args.iterations)]
+    two_pass = timeit(lambda b: two_pass_convert(converter, b), batches)
+    single_pass = timeit(converter, batches)
+    print "%-14s %12s" % ("converter", "ms/batch")
+    print "%-14s %12.3f" % ("two pass", two_pass * 1000)
+    print "%-14s %12.3f" % ("single pass", single_pass * 1000)
+    print "speedup: %.2fx" % (two_pass / single_pass)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark the construction of paddle.v2.topology.Topology for the networks of
+the book chapters: parsing the network, reusing the memoized model config,
+and loading the topology saved by serialize_for_inference.
+
+    python topology_benchmark.py --iterations 100
+"""
+
+import argparse
+import cStringIO
+import time
+
+import paddle.v2 as paddle
+from paddle.v2 import layer as v2_layer
+from paddle.v2 import topology
+
+
+def parse_args():
+    parser = argparse.ArgumentParser('Topology benchmark.')
+    parser.add_argument('--iterations', type=int, default=100)
+    return parser.parse_args()
+
+
+def fit_a_line():
+    x = paddle.layer.data(name='x', type=paddle.data_type.dense_vector(13))
+    return paddle.layer.fc(input=x, size=1, act=paddle.activation.Linear())
+
+
+def recognize_digits():
+    images = paddle.layer.data(
+        name='pixel', type=paddle.data_type.dense_vector(784))
+    conv_pool_1 = paddle.networks.simple_img_conv_pool(
+        input=images,
+        filter_size=5,
+        num_filters=20,
+        num_channel=1,
+        pool_size=2,
+        pool_stride=2,
+        act=paddle.activation.Relu())
+    conv_pool_2 = paddle.networks.simple_img_conv_pool(
+        input=conv_pool_1,
+        filter_size=5,
+        num_filters=50,
+        num_channel=20,
+        pool_size=2,
+        pool_stride=2,
+        act=paddle.activation.Relu())
+    return paddle.layer.fc(input=conv_pool_2,
+                           size=10,
+                           act=paddle.activation.Softmax())
+
+
+def word2vec(dict_size=2073, embsize=32, hiddensize=256, n=5):
+    def wordemb(name):
+        word = paddle.layer.data(
+            name=name, type=paddle.data_type.integer_value(dict_size))
+        return paddle.layer.embedding(
+            input=word,
+            size=embsize,
+            param_attr=paddle.attr.Param(name='_proj'))
+
+    contextemb = paddle.layer.concat(
+        input=[wordemb('w2v_%d' % i) for i in xrange(n - 1)])
+    hidden = paddle.layer.fc(input=contextemb,
+                             size=hiddensize,
+                             act=paddle.activation.Sigmoid())
+    return paddle.layer.fc(input=hidden,
+                           size=dict_size,
+                           act=paddle.activation.Softmax())
+
+
+def understand_sentiment(dict_size=5147, emb_dim=128, hid_dim=512,
+                         stacked_num=3):
+    data = paddle.layer.data(
+        'word', paddle.data_type.integer_value_sequence(dict_size))
+    emb = paddle.layer.embedding(input=data, size=emb_dim)
+    fc1 = paddle.layer.fc(input=emb,
+                          size=hid_dim,
+                          act=paddle.activation.Linear())
+    lstm1 = paddle.layer.lstmemory(input=fc1, act=paddle.activation.Relu())
+    inputs = [fc1, lstm1]
+    for i in xrange(2, stacked_num + 1):
+        fc = paddle.layer.fc(input=inputs,
+                             size=hid_dim,
+                             act=paddle.activation.Linear())
+        lstm = paddle.layer.lstmemory(
+            input=fc, reverse=(i % 2) == 0, act=paddle.activation.Relu())
+        inputs = [fc, lstm]
+    fc_last = paddle.layer.pooling(
+        input=inputs[0], pooling_type=paddle.pooling.Max())
+    lstm_last = paddle.layer.pooling(
+        input=inputs[1], pooling_type=paddle.pooling.Max())
+    return paddle.layer.fc(input=[fc_last, lstm_last],
+                           size=2,
+                           act=paddle.activation.Softmax())
+
+
+def timeit(func, iterations):
+    start = time.time()
+    for _ in xrange(iterations):
+        func()
+    return (time.time() - start) / iterations
+
+
+def main():
+    args = parse_args()
+    paddle.init(use_gpu=False, trainer_count=1)
+    models = [('fit_a_line', fit_a_line()),
+              ('recognize_digits', recognize_digits()),
+              ('word2vec', word2vec()),
+              ('understand_sentiment', understand_sentiment())]
+    print "%-22s %12s %12s %12s" % ("model", "parse(ms)", "memoized(ms)",
+                                   "load(ms)")
+    for name, output in models:
+        parse = timeit(lambda: v2_layer.parse_network([output]),
+                       args.iterations)
+        memoized = timeit(lambda: topology.Topology(output).data_type(),
+                          args.iterations)
+        stream = cStringIO.StringIO()
+        topology.Topology(output).serialize_for_inference(stream)
+
+        def load():
+            stream.seek(0)
+            topology.deserialize_for_inference(stream)
+
+        load_time = timeit(load, args.iterations)
+        print "%-22s %12.3f %12.3f %12.3f" % (name, parse * 1000,
+                                             memoized * 1000, load_time * 1000)
+
+
+if __name__ == '__main__':
+    main()
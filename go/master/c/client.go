@@ -140,10 +140,7 @@ func paddle_next_record(client C.paddle_master_client, record **C.uchar) C.int {
 	c := get(client)
 	r, err := c.NextRecord()
 	if err != nil {
-		// NOTE: use errors to indicate pass ends
-		if err.Error() == master.ErrAllTaskFailed.Error() ||
-			err.Error() == master.ErrNoMoreAvailable.Error() ||
-			err.Error() == master.ErrPassBefore.Error() {
+		if passEnd(err) {
 			return -2
 		}
 		*record = (*C.uchar)(nil)
@@ -162,6 +159,59 @@ func paddle_next_record(client C.paddle_master_client, record **C.uchar) C.int {
 	return C.int(size)
 }
 
+// paddle_next_records gets the next training records in bulk. The
+// records are copied into buf back to back, and their sizes are written
+// into sizes. It blocks until the first record is available, and then
+// takes the records that are already buffered, as many as buf and sizes
+// can hold.
+//
+// returns number of records if success, -1 if failed, -2 if pass end, -3
+// if buf is too small for the next record, whose size is written into
+// sizes[0].
+//
+//export paddle_next_records
+func paddle_next_records(client C.paddle_master_client, buf *C.uchar, bufSize C.int, sizes *C.int, maxRecords C.int) C.int {
+	c := get(client)
+	used, next := 0, 0
+	rs, err := c.NextRecords(int(maxRecords), func(r []byte) bool {
+		next = len(r)
+		if used+len(r) > int(bufSize) {
+			return false
+		}
+		used += len(r)
+		return true
+	})
+	if err != nil {
+		if passEnd(err) {
+			return -2
+		}
+		return -1
+	}
+
+	if len(rs) == 0 {
+		*sizes = C.int(next)
+		return -3
+	}
+
+	b := (*[1 << 30]byte)(unsafe.Pointer(buf))[:bufSize:bufSize]
+	s := (*[1 << 28]C.int)(unsafe.Pointer(sizes))[:maxRecords:maxRecords]
+	offset := 0
+	for i, r := range rs {
+		copy(b[offset:], r)
+		offset += len(r)
+		s[i] = C.int(len(r))
+	}
+	return C.int(len(rs))
+}
+
+// passEnd returns true if the error indicates the pass ends.
+func passEnd(err error) bool {
+	// NOTE: use errors to indicate pass ends
+	return err.Error() == master.ErrAllTaskFailed.Error() ||
+		err.Error() == master.ErrNoMoreAvailable.Error() ||
+		err.Error() == master.ErrPassBefore.Error()
+}
+
 // paddle_request_save_model requests the master server to approve the
 // caller to save the model.
 //
@@ -16,6 +16,7 @@ package master
 
 import (
 	"os"
+	"sync"
 	"time"
 
 	"github.com/PaddlePaddle/Paddle/go/connection"
@@ -29,6 +30,9 @@ type Client struct {
 	conn    *connection.Conn
 	ch      chan record
 	bufSize int
+
+	mu      sync.Mutex
+	pending *record
 }
 
 type record struct {
@@ -242,10 +246,65 @@ func (c *Client) taskFailed(meta TaskMeta) error {
 // NextRecord will block until the next record is available. It is
 // thread-safe.
 func (c *Client) NextRecord() ([]byte, error) {
-	r := <-c.ch
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	r := c.next()
 	return r.r, r.err
 }
 
+// NextRecords returns the next records in the dataset in bulk.
+//
+// NextRecords will block until the first record is available, and
+// then takes the records that are already buffered, until it has n
+// records or fit returns false. The record that does not fit is kept
+// for the next call, so no records are returned if the first one does
+// not fit. It is thread-safe.
+func (c *Client) NextRecords(n int, fit func(r []byte) bool) ([][]byte, error) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	var rs [][]byte
+	for len(rs) < n {
+		var r record
+		if len(rs) == 0 {
+			r = c.next()
+		} else {
+			select {
+			case r = <-c.ch:
+			default:
+				return rs, nil
+			}
+		}
+
+		if r.err != nil {
+			if len(rs) == 0 {
+				return nil, r.err
+			}
+			// return the error in the next call.
+			c.pending = &r
+			return rs, nil
+		}
+
+		if !fit(r.r) {
+			c.pending = &r
+			return rs, nil
+		}
+		rs = append(rs, r.r)
+	}
+	return rs, nil
+}
+
+// next returns the record kept by NextRecords if there is one, or the
+// next buffered record. It must be called with c.mu held.
+func (c *Client) next() record {
+	if c.pending != nil {
+		r := *c.pending
+		c.pending = nil
+		return r
+	}
+	return <-c.ch
+}
+
 // RequestSaveModel requests the master server to approve the caller
 // to save the model.
 func (c *Client) RequestSaveModel(trainerID string, blockDur time.Duration) (bool, error) {
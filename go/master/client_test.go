@@ -15,6 +15,7 @@
 package master_test
 
 import (
+	"bytes"
 	"fmt"
 	"net"
 	"net/http"
@@ -43,11 +44,8 @@ func goid() int {
 	return id
 }
 
-func TestNextRecord(t *testing.T) {
-	const (
-		path  = "/tmp/master_client_TestFull"
-		total = 50
-	)
+// startMaster starts a master server and returns its port.
+func startMaster() int {
 	l, err := net.Listen("tcp", ":0")
 	if err != nil {
 		panic(err)
@@ -77,7 +75,12 @@ func TestNextRecord(t *testing.T) {
 			panic(err)
 		}
 	}(l)
+	return p
+}
 
+// writeRecords writes total records into a recordio file, the i-th of
+// which is i+1 bytes of byte(i).
+func writeRecords(path string, total int) {
 	f, err := os.Create(path)
 	if err != nil {
 		panic(err)
@@ -85,7 +88,7 @@ func TestNextRecord(t *testing.T) {
 
 	w := recordio.NewWriter(f, 1, -1)
 	for i := 0; i < total; i++ {
-		_, err = w.Write([]byte{byte(i)})
+		_, err = w.Write(bytes.Repeat([]byte{byte(i)}, i+1))
 		if err != nil {
 			panic(err)
 		}
@@ -100,6 +103,15 @@ func TestNextRecord(t *testing.T) {
 	if err != nil {
 		panic(err)
 	}
+}
+
+func TestNextRecord(t *testing.T) {
+	const (
+		path  = "/tmp/master_client_TestFull"
+		total = 50
+	)
+	p := startMaster()
+	writeRecords(path, total)
 
 	// start several client to test task fetching
 	var wg sync.WaitGroup
@@ -134,8 +146,8 @@ func TestNextRecord(t *testing.T) {
 						}
 						t.Fatal(pass, taskid, "Read error:", e)
 					}
-					if len(r) != 1 {
-						t.Fatal(pass, taskid, "Length should be 1.", r)
+					if len(r) != int(r[0])+1 {
+						t.Fatal(pass, taskid, "Length should be", r[0]+1, r)
 					}
 					if received[r[0]] {
 						t.Fatal(pass, taskid, "Received duplicate.", received, r)
@@ -148,3 +160,59 @@ func TestNextRecord(t *testing.T) {
 	}
 	wg.Wait()
 }
+
+func TestNextRecords(t *testing.T) {
+	const (
+		path  = "/tmp/master_client_TestNextRecords"
+		total = 50
+	)
+	p := startMaster()
+	writeRecords(path, total)
+
+	c, err := master.NewClient(master.WithAddr(fmt.Sprintf(":%d", p)), master.WithBuffer(total))
+	if err != nil {
+		t.Fatal(err)
+	}
+	err = c.SetDataset([]string{path})
+	if err != nil {
+		t.Fatal(err)
+	}
+
+	c.StartGetRecords(0)
+	received := make(map[byte]bool)
+	size := 0
+	for {
+		rs, err := c.NextRecords(8, func(r []byte) bool {
+			return len(r) <= size
+		})
+		if err != nil {
+			if err.Error() == master.ErrPassBefore.Error() ||
+				err.Error() == master.ErrNoMoreAvailable.Error() {
+				break
+			}
+			t.Fatal("Read error:", err)
+		}
+		if len(rs) == 0 {
+			// the next record does not fit, it is kept for the
+			// next call.
+			size += 16
+			continue
+		}
+		if len(rs) > 8 {
+			t.Fatal("Too many records.", len(rs))
+		}
+		for _, r := range rs {
+			if len(r) > size || len(r) != int(r[0])+1 {
+				t.Fatal("Unexpected record.", r)
+			}
+			if received[r[0]] {
+				t.Fatal("Received duplicate.", r)
+			}
+			received[r[0]] = true
+		}
+	}
+
+	if len(received) != total {
+		t.Fatal("Should receive all records.", len(received))
+	}
+}
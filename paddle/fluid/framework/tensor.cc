@@ -73,6 +73,15 @@ void* Tensor::mutable_data(platform::Place place, std::type_index type,
                                  offset_);
 }
 
+void Tensor::ShareExternalData(void* ptr, size_t size, std::type_index type,
+                               std::shared_ptr<void> owner) {
+  PADDLE_ENFORCE_NOT_NULL(ptr, "The external memory should not be null.");
+  PADDLE_ENFORCE_LE(numel() * SizeOfType(type), size,
+                    "The external memory is smaller than the tensor.");
+  holder_.reset(new ExternalPlaceholder(ptr, size, type, std::move(owner)));
+  offset_ = 0;
+}
+
 void* Tensor::mutable_data(platform::Place place, size_t requested_size) {
   PADDLE_ENFORCE(this->holder_ != nullptr,
                  "Cannot invoke mutable data if current hold nothing.");
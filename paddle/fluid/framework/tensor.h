@@ -18,6 +18,7 @@ limitations under the License. */
 #include <cstring>
 #include <memory>
 #include <typeindex>
+#include <utility>
 #include <vector>
 
 #include "paddle/fluid/framework/data_layout.h"
@@ -120,6 +121,21 @@ class Tensor {
   /*! The internal of two tensors share the same memory block. */
   Tensor& ShareDataWith(const Tensor& src);
 
+  /**
+   * @brief   Use an external CPU memory block, like a memory-mapped file,
+   *          without copying it.
+   *
+   * @param[in] ptr    The start of the memory block.
+   * @param[in] size   The size of the memory block in bytes.
+   * @param[in] type   The data type of the elements.
+   * @param[in] owner  Keeps the memory block alive while the tensor uses it.
+   *
+   * @note    Resize the tensor before calling it. The memory block is used
+   *          until the tensor needs a larger one.
+   */
+  void ShareExternalData(void* ptr, size_t size, std::type_index type,
+                         std::shared_ptr<void> owner);
+
   /**
    * @brief  Return a sub-tensor of the given tensor.
    *
@@ -198,6 +214,28 @@ class Tensor {
     std::type_index type_;
   };
 
+  struct ExternalPlaceholder : public Placeholder {
+    ExternalPlaceholder(void* ptr, size_t size, std::type_index type,
+                        std::shared_ptr<void> owner)
+        : ptr_(ptr), size_(size), type_(type), owner_(std::move(owner)) {}
+
+    virtual size_t size() const { return size_; }
+    virtual platform::Place place() const { return platform::CPUPlace(); }
+    virtual void* ptr() const { return ptr_; }
+    virtual std::type_index type() const { return type_; }
+    virtual void set_type(std::type_index type) { type_ = type; }
+    virtual void set_place(platform::Place place) {
+      PADDLE_ENFORCE(platform::is_cpu_place(place),
+                     "External memory can only be on CPUPlace.");
+    }
+
+    void* ptr_;
+    size_t size_;
+    std::type_index type_;
+    /*! the owner of the memory block. */
+    std::shared_ptr<void> owner_;
+  };
+
   /*! holds the memory block if allocated. */
   std::shared_ptr<Placeholder> holder_;
 
@@ -14,7 +14,10 @@
 
 #include "paddle/fluid/framework/tensor.h"
 #include <gtest/gtest.h>
+#include <memory>
 #include <string>
+#include <utility>
+#include <vector>
 #include "paddle/fluid/platform/float16.h"
 
 namespace framework = paddle::framework;
@@ -143,6 +146,30 @@ TEST(Tensor, ShareDataWith) {
 #endif
 }
 
+TEST(Tensor, ShareExternalData) {
+  std::vector<float> buffer(24, 1.0f);
+  bool released = false;
+  {
+    std::shared_ptr<void> owner(&buffer,
+                                [&released](void*) { released = true; });
+    framework::Tensor tensor;
+    tensor.Resize(framework::make_ddim({2, 3, 4}));
+    tensor.ShareExternalData(buffer.data(), buffer.size() * sizeof(float),
+                             typeid(float), std::move(owner));
+    ASSERT_EQ(tensor.data<float>(), buffer.data());
+    ASSERT_TRUE(platform::is_cpu_place(tensor.place()));
+    // the memory is large enough, so it is not reallocated.
+    ASSERT_EQ(tensor.mutable_data<float>(platform::CPUPlace()),
+              buffer.data());
+    ASSERT_FALSE(released);
+
+    tensor.Resize(framework::make_ddim({4, 3, 4}));
+    ASSERT_NE(tensor.mutable_data<float>(platform::CPUPlace()),
+              buffer.data());
+    ASSERT_TRUE(released);
+  }
+}
+
 TEST(Tensor, Slice) {
   {
     framework::Tensor src_tensor;
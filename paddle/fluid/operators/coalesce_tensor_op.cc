@@ -0,0 +1,92 @@
+/* Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. */
+
+#include "paddle/fluid/operators/coalesce_tensor_op.h"
+
+namespace paddle {
+namespace operators {
+
+class CoalesceTensorOp : public framework::OperatorWithKernel {
+ public:
+  using framework::OperatorWithKernel::OperatorWithKernel;
+
+  void InferShape(framework::InferShapeContext* ctx) const override {
+    PADDLE_ENFORCE(ctx->HasInputs("Input"),
+                   "Inputs(Input) of CoalesceTensorOp should not be null.");
+    PADDLE_ENFORCE(ctx->HasOutputs("Output"),
+                   "Outputs(Output) of CoalesceTensorOp should not be null.");
+    PADDLE_ENFORCE(ctx->HasOutput("FusedOutput"),
+                   "Output(FusedOutput) of CoalesceTensorOp should not be "
+                   "null.");
+    auto in_dims = ctx->GetInputsDim("Input");
+    PADDLE_ENFORCE_EQ(in_dims.size(), ctx->Outputs("Output").size(),
+                      "The number of Input(Input) and Output(Output) of "
+                      "CoalesceTensorOp should be the same.");
+    int64_t numel = 0;
+    for (auto& dims : in_dims) {
+      int64_t size = framework::product(dims);
+      PADDLE_ENFORCE_GE(size, 0,
+                        "The shapes of Input(Input) of CoalesceTensorOp "
+                        "should be known.");
+      numel += size;
+    }
+    ctx->SetOutputsDim("Output", in_dims);
+    ctx->SetOutputDim("FusedOutput", framework::make_ddim({numel}));
+  }
+};
+
+class CoalesceTensorOpMaker : public framework::OpProtoAndCheckerMaker {
+ public:
+  void Make() override {
+    AddInput("Input",
+             "(vector<LoDTensor>) The tensors whose shapes, and data if "
+             "copy_data is true, are laid out in FusedOutput.")
+        .AsDuplicable();
+    AddOutput("Output",
+              "(vector<LoDTensor>) The tensors that become views of "
+              "FusedOutput, one for each Input.")
+        .AsDuplicable();
+    AddOutput("FusedOutput",
+              "(LoDTensor) The 1-D buffer that holds all the Output "
+              "contiguously.");
+    AddAttr<bool>("copy_data",
+                  "(bool, default true) Whether to copy the data of Input "
+                  "into FusedOutput.")
+        .SetDefault(true);
+    AddComment(R"DOC(
+CoalesceTensor Operator.
+
+Lay out the tensors contiguously in one 1-D buffer, FusedOutput, and make
+each Output[i] a view of its part, with the shape of Input[i]. Ops that update
+FusedOutput as a whole, like one optimizer op for many parameters, then update
+all the Output at once.
+
+If FusedOutput is already large enough, its memory is reused, and an Input
+that is already a view of its part is not copied again. So the op can be run
+again to bring back the tensors that some op has reallocated.
+
+)DOC");
+  }
+};
+
+}  // namespace operators
+}  // namespace paddle
+
+namespace ops = paddle::operators;
+REGISTER_OP_WITHOUT_GRADIENT(coalesce_tensor, ops::CoalesceTensorOp,
+                             ops::CoalesceTensorOpMaker);
+REGISTER_OP_CPU_KERNEL(
+    coalesce_tensor,
+    ops::CoalesceTensorKernel<paddle::platform::CPUDeviceContext, float>,
+    ops::CoalesceTensorKernel<paddle::platform::CPUDeviceContext, double>);
@@ -0,0 +1,68 @@
+/* Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. */
+
+#pragma once
+#include <vector>
+#include "paddle/fluid/framework/lod_tensor.h"
+#include "paddle/fluid/framework/op_registry.h"
+#include "paddle/fluid/framework/tensor_util.h"
+
+namespace paddle {
+namespace operators {
+
+template <typename DeviceContext, typename T>
+class CoalesceTensorKernel : public framework::OpKernel<T> {
+ public:
+  void Compute(const framework::ExecutionContext& context) const override {
+    auto ins = context.MultiInput<framework::LoDTensor>("Input");
+    auto outs = context.MultiOutput<framework::LoDTensor>("Output");
+    auto* fused = context.Output<framework::LoDTensor>("FusedOutput");
+    PADDLE_ENFORCE_EQ(ins.size(), outs.size(),
+                      "The number of Input(Input) and Output(Output) of "
+                      "CoalesceTensorOp should be the same.");
+    bool copy_data = context.Attr<bool>("copy_data");
+    auto& dev_ctx = context.template device_context<DeviceContext>();
+
+    int64_t numel = 0;
+    for (auto* in : ins) {
+      numel += in->numel();
+    }
+    // The buffer is reused if it is already large enough, so the tensors
+    // that are views of it stay untouched.
+    fused->Resize({numel});
+    const T* base = fused->mutable_data<T>(context.GetPlace());
+
+    int64_t offset = 0;
+    for (size_t i = 0; i < ins.size(); ++i) {
+      auto dims = ins[i]->dims();
+      int64_t size = ins[i]->numel();
+      if (size == 0) {
+        outs[i]->Resize(dims);
+        continue;
+      }
+      framework::Tensor slice = fused->Slice(offset, offset + size);
+      bool is_view = ins[i]->IsInitialized() &&
+                     ins[i]->data<T>() == base + offset;
+      if (copy_data && !is_view) {
+        framework::TensorCopy(*ins[i], context.GetPlace(), dev_ctx, &slice);
+      }
+      outs[i]->ShareDataWith(slice);
+      outs[i]->Resize(dims);
+      offset += size;
+    }
+  }
+};
+
+}  // namespace operators
+}  // namespace paddle
@@ -14,8 +14,10 @@ limitations under the License. */
 
 #pragma once
 #include <Python.h>
+#include <memory>
 #include <string>
 #include <tuple>
+#include <utility>
 #include <vector>
 #include "paddle/fluid/framework/lod_tensor.h"
 #include "paddle/fluid/memory/memcpy.h"
@@ -163,6 +165,50 @@ inline void PyCPUTensorSetFromArray(
   std::memcpy(dst, array.data(), sizeof(uint16_t) * array.size());
 }
 
+template <typename T, typename DataT = T>
+bool PyCPUTensorShareArrayOfType(framework::Tensor *self,
+                                 const pybind11::array &array) {
+  if (!pybind11::isinstance<pybind11::array_t<T>>(array)) {
+    return false;
+  }
+  // The array is kept alive until the tensor releases the memory.
+  std::shared_ptr<void> owner(new pybind11::object(array), [](void *ref) {
+    pybind11::gil_scoped_acquire gil;
+    delete static_cast<pybind11::object *>(ref);
+  });
+  self->ShareExternalData(const_cast<void *>(array.data()), array.nbytes(),
+                          typeid(DataT), std::move(owner));
+  return true;
+}
+
+/*
+ * Make the tensor use the memory of a C contiguous numpy array, like a
+ * numpy.memmap, without copying it. uint16 arrays are used as float16.
+ */
+inline void PyCPUTensorShareArray(framework::Tensor *self,
+                                  pybind11::array array) {
+  PADDLE_ENFORCE(array.flags() & pybind11::array::c_style,
+                 "The shared array should be C contiguous.");
+  std::vector<int64_t> dims;
+  dims.reserve(array.ndim());
+  for (size_t i = 0; i < array.ndim(); ++i) {
+    dims.push_back(static_cast<int64_t>(array.shape()[i]));
+  }
+  self->Resize(framework::make_ddim(dims));
+
+  if (PyCPUTensorShareArrayOfType<float>(self, array)) return;
+  if (PyCPUTensorShareArrayOfType<double>(self, array)) return;
+  if (PyCPUTensorShareArrayOfType<int>(self, array)) return;
+  if (PyCPUTensorShareArrayOfType<int64_t>(self, array)) return;
+  if (PyCPUTensorShareArrayOfType<bool>(self, array)) return;
+  if (PyCPUTensorShareArrayOfType<uint8_t>(self, array)) return;
+  if (PyCPUTensorShareArrayOfType<int8_t>(self, array)) return;
+  if (PyCPUTensorShareArrayOfType<uint16_t, platform::float16>(self, array)) {
+    return;
+  }
+  PADDLE_THROW("The data type of the shared array is not supported.");
+}
+
 #ifdef PADDLE_WITH_CUDA
 template <typename T>
 void PyCUDATensorSetFromArray(
@@ -1,4 +1,11 @@
-%module(directors="1") swig_paddle
+%module(directors="1", threads="1") swig_paddle
+// Only the long running computations release the GIL, so that Python
+// threads, like the data conversion of a pipelined trainer, run meanwhile.
+// The pipelined conversion only runs on CPU, since the arguments may be
+// allocated on GPU otherwise.
+%nothread;
+%thread GradientMachine::forward;
+%thread GradientMachine::forwardBackward;
 %include "std_string.i"
 %{
 #define SWIG_FILE_WITH_INIT
@@ -71,6 +71,9 @@ enum CacheType {
   CACHE_PASS_IN_MEM = 1,  // First pass will load data from PyDataProvider2,
                           // then cache all data in memory. Load data from
                           // memory in rest passes.
+  CACHE_PASS_ON_DISK = 2,  // First pass will load data from PyDataProvider2,
+                           // and python caches all data on local disk. Python
+                           // loads data from disk in rest passes.
 };
 
 struct SlotHeader {  // Slot Header will parse from python object's slots field.
@@ -1019,6 +1022,7 @@ class CacheOnePassInMemory : public IPyDataProviderCache {
 IPyDataProviderCache* IPyDataProviderCache::create(CacheType ct) {
   switch (ct) {
     case NO_CACHE:
+    case CACHE_PASS_ON_DISK:  // the python side reads the cache.
       return new NoCacheStrategy();
     case CACHE_PASS_IN_MEM:
       return new CacheOnePassInMemory();
@@ -14,6 +14,7 @@ limitations under the License. */
 
 #ifndef PADDLE_NO_PYTHON
 #include <gtest/gtest.h>
+#include <algorithm>
 #include <fstream>
 #include "paddle/legacy/gserver/dataproviders/DataProvider.h"
 #include "paddle/legacy/utils/PythonUtil.h"
@@ -393,6 +394,94 @@ TEST(PyDataProvider2, minPoolSizeWithCache) {
   }
 }
 
+TEST(PyDataProvider2, numWorkers) {
+  const std::string fileList = FLAGS_train_list + ".num_workers";
+  {
+    std::ofstream fout(fileList);
+    CHECK(fout.is_open());
+    for (int i = 0; i < 5; ++i) {
+      fout << "stub_file_" << i << std::endl;
+    }
+  }
+
+  paddle::DataConfig config;
+  config.set_type("py2");
+  config.set_files(fileList.c_str());
+  config.set_load_data_module("test_PyDataProvider2");
+  config.set_load_data_object("test_num_workers");
+  std::unique_ptr<paddle::DataProvider> provider(
+      paddle::DataProvider::create(config, false));
+
+  paddle::DataBatch batch;
+  for (size_t pass = 0; pass < 2; ++pass) {
+    provider->reset();
+    std::vector<int> ids;
+    while (int64_t num = provider->getNextBatchInternal(64, &batch)) {
+      auto &ivec = batch.getStream(0).ids;
+      for (int64_t i = 0; i < num; ++i) {
+        ids.push_back(ivec->getData()[i]);
+      }
+    }
+    std::sort(ids.begin(), ids.end());
+    ASSERT_EQ(ids.size(), 500UL);
+    for (int i = 0; i < 500; ++i) {
+      ASSERT_EQ(ids[i], i);
+    }
+  }
+}
+
+TEST(PyDataProvider2, cacheOnDisk) {
+  paddle::DataConfig config;
+  config.set_type("py2");
+  config.set_files(FLAGS_train_list.c_str());
+  config.set_load_data_module("test_PyDataProvider2");
+  config.set_load_data_object("test_cache_on_disk");
+  std::unique_ptr<paddle::DataProvider> provider(
+      paddle::DataProvider::create(config, false));
+  provider->setSkipShuffle();  // compare the passes sample by sample.
+
+  // The data is random, so the rest passes equal the first pass only if they
+  // are read from the cache.
+  std::vector<real> denses[2];
+  std::vector<int> ids[2];
+  std::vector<int> starts[2];
+  std::vector<int> cols[2];
+  std::vector<real> values[2];
+  paddle::DataBatch batch;
+  for (size_t pass = 0; pass < 2; ++pass) {
+    provider->reset();
+    int64_t num = provider->getNextBatchInternal(10000, &batch);
+    ASSERT_EQ(num, 200);
+    auto &dense = batch.getStream(0).value;
+    denses[pass].assign(dense->getData(),
+                        dense->getData() + dense->getElementCnt());
+    auto &seq = batch.getStream(1);
+    ids[pass].assign(seq.ids->getData(),
+                     seq.ids->getData() + seq.ids->getSize());
+    starts[pass].assign(seq.sequenceStartPositions->getData(false),
+                        seq.sequenceStartPositions->getData(false) +
+                            seq.sequenceStartPositions->getSize());
+    auto csm = std::dynamic_pointer_cast<paddle::CpuSparseMatrix>(
+        batch.getStream(2).value);
+    CHECK(csm != nullptr);
+    for (int i = 0; i < num; ++i) {
+      size_t colNum = csm->getColNum(i);
+      cols[pass].push_back(colNum);
+      cols[pass].insert(
+          cols[pass].end(), csm->getRowCols(i), csm->getRowCols(i) + colNum);
+      values[pass].insert(values[pass].end(),
+                          csm->getRowValues(i),
+                          csm->getRowValues(i) + colNum);
+    }
+    ASSERT_EQ(0, provider->getNextBatchInternal(10000, &batch));
+  }
+  ASSERT_EQ(denses[0], denses[1]);
+  ASSERT_EQ(ids[0], ids[1]);
+  ASSERT_EQ(starts[0], starts[1]);
+  ASSERT_EQ(cols[0], cols[1]);
+  ASSERT_EQ(values[0], values[1]);
+}
+
 int main(int argc, char **argv) {
   testing::InitGoogleTest(&argc, argv);
   paddle::initMain(argc, argv);
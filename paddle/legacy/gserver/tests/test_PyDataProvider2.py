@@ -123,3 +123,26 @@ def test_min_pool_size_with_cache(settings, filename):
     import random
     for _ in xrange(2**20):
         yield random.randint(0, 9)
+
+
+@provider(input_types=[index_slot(1000)], check=True, num_workers=2)
+def test_num_workers(settings, filename):
+    file_id = int(filename.split('_')[-1])
+    for i in xrange(100):
+        yield file_id * 100 + i
+
+
+@provider(
+    input_types=[
+        dense_vector(10), integer_value_sequence(100),
+        sparse_float_vector(1000)
+    ],
+    cache=CacheType.CACHE_PASS_ON_DISK)
+def test_cache_on_disk(settings, filename):
+    for _ in xrange(200):
+        yield [
+            [random.random() for _ in xrange(10)],
+            [random.randint(0, 99) for _ in xrange(random.randint(1, 5))],
+            [(random.randint(0, 999), random.random())
+             for _ in xrange(random.randint(0, 5))]
+        ]
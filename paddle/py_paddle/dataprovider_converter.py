@@ -24,12 +24,16 @@ __all__ = ['DataProviderConverter']
 
 class IScanner(object):
     """
-    The scanner will scan Python object two passes, then convert it to Paddle's
-    argument.
+    The scanner will scan Python object, then convert it to Paddle's argument.
 
-    In the first pass, `pre_scan` will be invoked by every data instance, and
-    then invoke `finish_pre_scan` to arguments. And the second pass do the same
-    thing except the functions changed to `scan`, `finish_scan`.
+    The converter invokes `scan_batch` with the data of one slot of all the
+    data instances in a batch. The built-in scanners convert the whole slot
+    at once with numpy.
+
+    By default, `scan_batch` scans the Python object two passes. In the first
+    pass, `pre_scan` will be invoked by every data instance, and then invoke
+    `finish_pre_scan` to arguments. And the second pass do the same thing
+    except the functions changed to `scan`, `finish_scan`.
 
     During the first pass, a scanner may count the shape of input matrix and
     allocate memory for this argument. Then fill the data into this  argument
@@ -89,6 +93,22 @@ class IScanner(object):
         """
         pass
 
+    def scan_batch(self, column, argument):
+        """
+        Convert the data of this slot of all the data instances in a batch.
+
+        :param column: The Python objects of this slot.
+        :type column: collections.Sequence
+        :param argument: Output arguments object.
+        :type argument: swig_paddle.Arguments
+        """
+        for dat in column:
+            self.pre_scan(dat)
+        self.finish_pre_scan(argument)
+        for dat in column:
+            self.scan(dat)
+        self.finish_scan(argument)
+
 
 class DenseScanner(IScanner):
     """
@@ -138,6 +158,34 @@ class DenseScanner(IScanner):
         assert isinstance(argument, swig_paddle.Arguments)
         if self.__mat__.dtype != numpy.float32:
             self.__mat__ = self.__mat__.astype(numpy.float32)
+        self._set_slot(argument)
+
+    def scan_batch(self, column, argument):
+        if len(column) == 0:
+            # For example, a batch of empty sequences. numpy.stack refuses
+            # an empty list.
+            mat = numpy.zeros((0, self.input_type.dim), dtype=numpy.float32)
+        else:
+            try:
+                mat = numpy.stack(column)
+            except ValueError:
+                raise ValueError(
+                    "The data shape must be same in one mini-batch.")
+        self.__shape__ = mat.shape[1:]
+        if len(self.__shape__) > 3:
+            raise ValueError("The dimension of input cannot be greater than 3.")
+        if len(self.__shape__) == 0:
+            raise ValueError(
+                "The input should be a vector, please check your input data.")
+        if len(self.__shape__) == 1 and \
+                self.__shape__[0] != self.input_type.dim:
+            raise ValueError("The data size must be equal to it in data layer.")
+        self.__mat__ = numpy.ascontiguousarray(
+            mat.reshape(len(mat), reduce(lambda x, y: x * y, self.__shape__)),
+            dtype=numpy.float32)
+        self._set_slot(argument)
+
+    def _set_slot(self, argument):
         m = swig_paddle.Matrix.createDenseFromNumpy(self.__mat__, True,
                                                     self.data_in_gpu)
         argument.setSlotValue(self.pos, m)
@@ -180,6 +228,21 @@ class SparseBinaryScanner(IScanner):
         m.sparseCopyFrom(self.__rows__, self.__cols__, self.__value__)
         argument.setSlotValue(self.pos, m)
 
+    def scan_batch(self, column, argument):
+        lengths = numpy.fromiter(
+            (len(dat) for dat in column), dtype=numpy.int64, count=len(column))
+        rows = numpy.zeros(len(column) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=rows[1:])
+        self.__rows__ = rows.tolist()
+        self.__height__ = len(column)
+        self.extend_cols_batch(column, int(rows[-1]))
+        self.finish_scan(argument)
+
+    def extend_cols_batch(self, column, nnz):
+        self.__cols__ = numpy.fromiter(
+            itertools.chain.from_iterable(column), dtype=numpy.int64,
+            count=nnz).tolist()
+
 
 class SparseFloatScanner(SparseBinaryScanner):
     def __init__(self, input_type, pos):
@@ -189,6 +252,13 @@ class SparseFloatScanner(SparseBinaryScanner):
         self.__cols__.extend((x[0] for x in dat))
         self.__value__.extend((x[1] for x in dat))
 
+    def extend_cols_batch(self, column, nnz):
+        pairs = numpy.array(
+            list(itertools.chain.from_iterable(column)),
+            dtype=numpy.float64).reshape(nnz, 2)
+        self.__cols__ = pairs[:, 0].astype(numpy.int64).tolist()
+        self.__value__ = pairs[:, 1].astype(numpy.float32).tolist()
+
 
 class IndexScanner(IScanner):
     def __init__(self, input_type, pos):
@@ -212,6 +282,12 @@ class IndexScanner(IScanner):
         assert isinstance(argument, swig_paddle.Arguments)
         argument.setSlotIds(self.pos, ids)
 
+    def scan_batch(self, column, argument):
+        ids = numpy.fromiter(column, dtype=numpy.int32, count=len(column))
+        ids = swig_paddle.IVector.createVectorFromNumpy(ids, True,
+                                                        self.data_in_gpu)
+        argument.setSlotIds(self.pos, ids)
+
 
 class SequenceScanner(IScanner):
     def __init__(self, input_type, pos, inner_scanner, setter):
@@ -243,6 +319,31 @@ class SequenceScanner(IScanner):
         else:
             return len(dat)
 
+    def scan_batch(self, column, argument):
+        self.scan_batch_starts(column, argument)
+
+    def scan_batch_starts(self, column, argument):
+        """
+        Convert the slot like `scan_batch`, and return the start positions of
+        the sequences in the innermost data.
+        """
+        lengths = numpy.fromiter(
+            (len(dat) for dat in column), dtype=numpy.int32, count=len(column))
+        seq = numpy.zeros(len(column) + 1, dtype=numpy.int32)
+        numpy.cumsum(lengths, out=seq[1:])
+        items = list(itertools.chain.from_iterable(column))
+        if isinstance(self.__inner_scanner__, SequenceScanner):
+            # The start positions of the sub-sequences that begin each
+            # sequence.
+            seq = self.__inner_scanner__.scan_batch_starts(items,
+                                                           argument)[seq]
+        else:
+            self.__inner_scanner__.scan_batch(items, argument)
+        self.__setter__(argument, self.pos,
+                        swig_paddle.IVector.createVectorFromNumpy(seq, True,
+                                                                  False))
+        return seq
+
 
 class DataProviderConverter(object):
     def __init__(self, input_types):
@@ -262,19 +363,9 @@ class DataProviderConverter(object):
             for i, each_type in enumerate(self.input_types)
         ]
 
-        for each_sample in dat:
-            for each_step, scanner in itertools.izip(each_sample, scanners):
-                scanner.pre_scan(each_step)
-
-        for scanner in scanners:
-            scanner.finish_pre_scan(argument)
-
-        for each_sample in dat:
-            for each_step, scanner in itertools.izip(each_sample, scanners):
-                scanner.scan(each_step)
-
-        for scanner in scanners:
-            scanner.finish_scan(argument)
+        # Each slot of all the samples is converted at once.
+        for column, scanner in itertools.izip(itertools.izip(*dat), scanners):
+            scanner.scan_batch(column, argument)
 
         return argument
 
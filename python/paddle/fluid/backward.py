@@ -42,6 +42,32 @@ def _rename_arg_(op_descs, old_name, new_name, begin_idx=None, end_idx=None):
         op_desc.rename_output(old_name, new_name)
 
 
+def _rename_arg_by_index_(op_descs, var_op_index, old_name, new_name):
+    """
+    Rename "old_name" as "new_name" in the ops of op_descs whose positions are
+    recorded in var_op_index[old_name], and move these positions to
+    var_op_index[new_name]. Only the ops that refer to "old_name" are visited.
+    """
+    positions = var_op_index.pop(old_name, set())
+    for i in positions:
+        op_desc = op_descs[i]
+        if isinstance(op_desc, tuple):
+            op_desc = op_desc[0]
+        op_desc.rename_input(old_name, new_name)
+        op_desc.rename_output(old_name, new_name)
+    var_op_index[new_name] |= positions
+
+
+def _index_op_args_(var_op_index, op_desc, position):
+    """
+    Record that the op at "position" refers to all its input/output args.
+    """
+    for name in op_desc.input_arg_names():
+        var_op_index[name].add(position)
+    for name in op_desc.output_arg_names():
+        var_op_index[name].add(position)
+
+
 def _create_op_desc_(op_type, inputs, outputs, attrs):
     """
     Create a C++ OpDesc object with specified inputs, outputs and attributes.
@@ -138,16 +164,27 @@ def _addup_repetitive_outputs_(op_descs):
     And one op may yield its multiple outputs to the same variable.
     In these cases, the variable should be the accumulation of all the outputs.
     `sum_op`s are added to implement the accumulate.
+
+    The positions of the ops that refer to each variable are indexed while
+    the ops are visited, so renaming a variable only touches the ops that use
+    it instead of rescanning all previous ops.
     """
     pending_sum_ops = []
     var_rename_count = collections.defaultdict(int)
     renamed_vars = collections.defaultdict(list)
+    # var name -> positions in op_descs[:idx] / pending_sum_ops of the ops
+    # that refer to the var.
+    var_op_index = collections.defaultdict(set)
+    var_sum_op_index = collections.defaultdict(set)
     for idx, op_desc in enumerate(op_descs):
         for var_name in op_desc.input_arg_names():
             if len(renamed_vars[var_name]) > 1:
-                pending_sum_ops.append((_create_op_desc_(
+                sum_op_desc = _create_op_desc_(
                     "sum", {"X": renamed_vars[var_name]}, {"Out": [var_name]},
-                    {"use_mkldnn": False}), idx))
+                    {"use_mkldnn": False})
+                _index_op_args_(var_sum_op_index, sum_op_desc,
+                                len(pending_sum_ops))
+                pending_sum_ops.append((sum_op_desc, idx))
                 renamed_vars[var_name] = [var_name]
         for param_idx, param_name in enumerate(op_desc.output_names()):
             arg_names = op_desc.output(param_name)
@@ -166,8 +203,11 @@ def _addup_repetitive_outputs_(op_descs):
                         var_rename_count[var_name] += 1
                         # rename original var_name
                         renamed_vars[var_name][0] = new_name
-                        _rename_arg_(op_descs, var_name, new_name, 0, idx)
-                        _rename_arg_(pending_sum_ops, var_name, new_name)
+                        _rename_arg_by_index_(op_descs, var_op_index,
+                                              var_name, new_name)
+                        _rename_arg_by_index_(pending_sum_ops,
+                                              var_sum_op_index, var_name,
+                                              new_name)
 
                         for p in op_desc.output_names()[:param_idx]:
                             p_arg_names = op_desc.output(p)
@@ -188,6 +228,7 @@ def _addup_repetitive_outputs_(op_descs):
                     arg_names[arg_idx] = new_name
                     op_desc.set_output(param_name, arg_names)
                     renamed_vars[var_name].append(new_name)
+        _index_op_args_(var_op_index, op_desc, idx)
 
     for var_name, inputs in six.iteritems(renamed_vars):
         if len(inputs) > 1:
@@ -18,5 +18,12 @@ from . import decoder
 from .decoder import *
 from . import memory_usage_calc
 from .memory_usage_calc import *
+from . import program_cache
+from .program_cache import *
+from . import serving
+from .serving import *
+from . import shared_params
+from .shared_params import *
 
-__all__ = decoder.__all__ + memory_usage_calc.__all__
+__all__ = decoder.__all__ + memory_usage_calc.__all__ + \
+    program_cache.__all__ + serving.__all__ + shared_params.__all__
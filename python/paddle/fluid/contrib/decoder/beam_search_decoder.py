@@ -32,7 +32,10 @@ from ... import core
 from ... import framework, unique_name
 from ...layer_helper import LayerHelper
 
-__all__ = ['InitState', 'StateCell', 'TrainingDecoder', 'BeamSearchDecoder']
+__all__ = [
+    'InitState', 'StateCell', 'TrainingDecoder', 'BeamSearchDecoder',
+    'beam_search_decode_to_padded'
+]
 
 
 class _DecoderType:
@@ -536,7 +539,9 @@ class BeamSearchDecoder(object):
         input_var_dict (dict): A feeding dict to feed the required input
             variables to the state cell. It will be used by state_cell 's
             compute method. Default empty.
-        topk_size (int): The topk size used for beam search. Default 50.
+        topk_size (int): The topk size used for beam search. Since at most
+            `beam_size` candidates of a prefix can be selected, a larger size
+            only adds work. Default None, which means `beam_size`.
         max_len (int): The maximum allowed length of the generated sentence.
             Default 100.
         beam_size (int): The beam width of beam search decode. Default 1.
@@ -576,7 +581,7 @@ class BeamSearchDecoder(object):
                  target_dict_dim,
                  word_dim,
                  input_var_dict={},
-                 topk_size=50,
+                 topk_size=None,
                  sparse_emb=True,
                  max_len=100,
                  beam_size=1,
@@ -592,6 +597,8 @@ class BeamSearchDecoder(object):
             x=self._counter,
             y=layers.fill_constant(
                 shape=[1], dtype='int64', value=max_len))
+        self._finished = layers.fill_constant(
+            shape=[1], value=0, dtype='bool', force_cpu=True)
         self._while_op = layers.While(self._cond)
         self._state_cell = state_cell
         self._state_cell._enter_decoder(self)
@@ -608,7 +615,7 @@ class BeamSearchDecoder(object):
         self._init_ids = init_ids
         self._init_scores = init_scores
         self._target_dict_dim = target_dict_dim
-        self._topk_size = topk_size
+        self._topk_size = beam_size if topk_size is None else topk_size
         self._sparse_emb = sparse_emb
         self._word_dim = word_dim
         self._input_var_dict = input_var_dict
@@ -635,6 +642,10 @@ class BeamSearchDecoder(object):
 
                     layers.less_than(
                         x=self._counter, y=self._max_len, cond=self._cond)
+                    layers.logical_and(
+                        x=self._cond,
+                        y=layers.logical_not(x=self._finished),
+                        out=self._cond)
 
         self._status = BeamSearchDecoder.AFTER_BEAM_SEARCH_DECODER
         self._state_cell._leave_decoder(self)
@@ -650,6 +661,27 @@ class BeamSearchDecoder(object):
         layers.fill_constant(
             shape=[1], value=0, dtype='bool', force_cpu=True, out=self._cond)
 
+    def stop_if_finished(self, ids):
+        """
+        Stop the generation after the current step if all the ids selected in
+        it are `end_id`, which means every beam is finished. Unlike
+        `early_stop`, the current step is still written to the arrays. The
+        decode loop also stops when beam search selects no ids, so this only
+        saves the last step, which would find every beam finished.
+
+        Args:
+            ids (Variable): The ids selected by beam search in current step.
+        """
+        self._assert_in_decoder_block('stop_if_finished')
+        end_id = layers.fill_constant(
+            shape=[1], dtype=ids.dtype, value=self._end_id)
+        layers.logical_and(
+            x=layers.equal(
+                x=layers.reduce_min(ids), y=end_id),
+            y=layers.equal(
+                x=layers.reduce_max(ids), y=end_id),
+            out=self._finished)
+
     def decode(self):
         """
         Set up the computation within the decoder. Then you could call the
@@ -714,7 +746,7 @@ class BeamSearchDecoder(object):
                 topk_indices,
                 accu_scores,
                 self._beam_size,
-                end_id=1,
+                end_id=self._end_id,
                 level=0)
 
             with layers.Switch() as switch:
@@ -727,6 +759,7 @@ class BeamSearchDecoder(object):
                     for update_name, var_to_update in six.iteritems(
                             update_dict):
                         self.update_array(var_to_update, feed_dict[update_name])
+                    self.stop_if_finished(selected_ids)
 
     def read_array(self, init, is_ids=False, is_scores=False):
         """
@@ -840,3 +873,96 @@ class BeamSearchDecoder(object):
         if self._status != BeamSearchDecoder.IN_BEAM_SEARCH_DECODER:
             raise ValueError('%s should be invoked inside block of '
                              'BeamSearchDecoder object.' % method)
+
+
+def beam_search_decode_to_padded(ids,
+                                 scores,
+                                 pad_id=0,
+                                 length_penalty=0.0,
+                                 n_best=None):
+    """
+    Convert the LoD outputs of `beam_search_decode` for a whole batch into
+    padded numpy arrays at once. The hypotheses of each source sentence are
+    sorted by their length-normalized scores in descending order, where the
+    score of a hypothesis is the score of its last token divided by
+    `((5 + length) / 6) ** length_penalty`.
+
+    Only this final ranking is normalized. The beams are still pruned by
+    their unnormalized accumulated scores during the search, so the
+    normalization can not bring back a longer hypothesis that was pruned.
+
+    Args:
+        ids (LoDTensor): The decoded ids with a 2-level LoD, whose first level
+            holds the hypotheses of each source sentence and the second level
+            holds the tokens of each hypothesis.
+        scores (LoDTensor): The scores of the decoded ids, with the same LoD.
+        pad_id (int): The id to pad the hypotheses with. Default 0.
+        length_penalty (float): The exponent of the length normalization of
+            the final ranking, 0 means no normalization. Default 0.
+        n_best (int): The number of hypotheses kept for each source sentence.
+            Default None, which means the maximum number of hypotheses of the
+            source sentences.
+
+    Returns:
+        tuple: A tuple of (ids, lengths, scores). ids is an int64 array in
+            shape [num_sources, n_best, max_length], lengths and scores are
+            arrays in shape [num_sources, n_best]. The missing hypotheses have
+            zero lengths and -inf scores.
+
+    Examples:
+        .. code-block:: python
+
+          ids, scores = exe.run(fetch_list=[translation_ids,
+                                            translation_scores],
+                                return_numpy=False)
+          padded_ids, lengths, scores = beam_search_decode_to_padded(
+              ids, scores, length_penalty=0.6)
+    """
+    seq_lens = ids.recursive_sequence_lengths()
+    if len(seq_lens) != 2:
+        raise ValueError('The LoD level of ids must be 2, got %d.' %
+                         len(seq_lens))
+    hyp_nums = np.array(seq_lens[0], dtype='int64')
+    hyp_lens = np.array(seq_lens[1], dtype='int64')
+    ids_data = np.array(ids).reshape(-1)
+    scores_data = np.array(scores).reshape(-1)
+    num_sources = len(hyp_nums)
+    num_hyps = len(hyp_lens)
+
+    hyp_src = np.repeat(np.arange(num_sources), hyp_nums)
+    hyp_ends = np.cumsum(hyp_lens)
+    hyp_starts = hyp_ends - hyp_lens
+    final_scores = np.full([num_hyps], -np.inf, dtype=scores_data.dtype)
+    non_empty = hyp_lens > 0
+    final_scores[non_empty] = scores_data[hyp_ends[non_empty] - 1]
+    if length_penalty:
+        final_scores = final_scores / np.power(
+            (5. + hyp_lens) / 6., length_penalty).astype(final_scores.dtype)
+
+    # Sort by source and then by descending score, and rank each hypothesis
+    # within its source.
+    order = np.lexsort((-final_scores, hyp_src))
+    src_starts = np.cumsum(hyp_nums) - hyp_nums
+    rank = np.arange(num_hyps) - src_starts[hyp_src[order]]
+    if n_best is None:
+        n_best = int(hyp_nums.max()) if num_sources else 0
+    kept = order[rank < n_best]
+    kept_rank = rank[rank < n_best]
+    kept_src = hyp_src[kept]
+    kept_lens = hyp_lens[kept]
+    max_len = int(kept_lens.max()) if len(kept) else 0
+
+    out_ids = np.full([num_sources, n_best, max_len], pad_id, dtype='int64')
+    out_lens = np.zeros([num_sources, n_best], dtype='int64')
+    out_scores = np.full(
+        [num_sources, n_best], -np.inf, dtype=scores_data.dtype)
+    out_lens[kept_src, kept_rank] = kept_lens
+    out_scores[kept_src, kept_rank] = final_scores[kept]
+
+    # Scatter all the tokens of the kept hypotheses at once.
+    token_hyp = np.repeat(np.arange(len(kept)), kept_lens)
+    token_pos = np.arange(len(token_hyp)) - np.repeat(
+        np.cumsum(kept_lens) - kept_lens, kept_lens)
+    out_ids[kept_src[token_hyp], kept_rank[token_hyp], token_pos] = ids_data[
+        hyp_starts[kept][token_hyp] + token_pos]
+    return out_ids, out_lens, out_scores
@@ -0,0 +1,331 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This module provides a cache of the finished main and startup programs, so
+a trainer or inference worker can restore them from disk at startup instead
+of running the layer code, append_backward, the optimizer and the
+transpilers again.
+
+This API is still under active development and may change drastically.
+"""
+
+from __future__ import print_function
+
+import hashlib
+import inspect
+import os
+import tempfile
+import warnings
+
+import six
+from six.moves import cPickle as pickle
+
+from ... import compat as cpt
+from .. import unique_name
+from ..framework import Program, Parameter, Variable
+
+__all__ = ['ProgramCache']
+
+# Bump it when the layout of the cache files changes.
+CACHE_VERSION = 3
+
+_PARAMETER_ATTRS = ("trainable", "optimize_attr", "regularizer",
+                    "gradient_clip_attr", "do_model_average")
+
+
+def _paddle_version():
+    try:
+        from ... import version
+    except ImportError:
+        # running from a source tree without a generated version module.
+        return "unknown"
+    return "%s-%s" % (version.full_version, version.commit)
+
+
+def _unique_name_state():
+    generator = unique_name.generator
+    return _canonical([generator.prefix, dict(generator.ids)])
+
+
+def _canonical(value):
+    """
+    Serialize a build function argument to a string that only depends on
+    its value. The repr of an arbitrary object may contain its address, so
+    only plain data is accepted.
+    """
+    if value is None or isinstance(value, (bool, float) + six.integer_types):
+        return "%s:%r" % (type(value).__name__, value)
+    if isinstance(value, (six.text_type, six.binary_type)):
+        return "str:%r" % cpt.to_text(value)
+    if isinstance(value, (list, tuple)):
+        return "%s:[%s]" % (type(value).__name__,
+                            ",".join(_canonical(v) for v in value))
+    if isinstance(value, dict):
+        items = sorted((_canonical(k), _canonical(v))
+                       for k, v in six.iteritems(value))
+        return "dict:{%s}" % ",".join("%s=%s" % kv for kv in items)
+    raise TypeError("the argument %r of type %s can not be used in the "
+                    "cache key, pass plain data like numbers, strings, "
+                    "lists and dicts, or use get_or_build_with_key with an "
+                    "explicit key." % (value, type(value).__name__))
+
+
+def _program_meta(program):
+    """
+    Collect the Python side information of a program that is lost by
+    serializing its ProgramDesc.
+    """
+    blocks = []
+    for block in program.blocks:
+        vars_meta = dict()
+        for name, var in six.iteritems(block.vars):
+            meta = {
+                "stop_gradient": var.stop_gradient,
+                "is_data": var.is_data,
+                "error_clip": var.error_clip,
+                "is_parameter": isinstance(var, Parameter)
+            }
+            if isinstance(var, Parameter):
+                for attr in _PARAMETER_ATTRS:
+                    meta[attr] = getattr(var, attr)
+            vars_meta[name] = meta
+        blocks.append(vars_meta)
+    return {
+        "blocks": blocks,
+        "seed": program.random_seed,
+        "is_distributed": program._is_distributed,
+        "is_chief": program._is_chief,
+        "endpoints": program._endpoints,
+        "distributed_lookup_table": program._distributed_lookup_table
+    }
+
+
+def _restore_program(desc_str, meta):
+    program = Program.parse_from_string(desc_str)
+    for block, vars_meta in zip(program.blocks, meta["blocks"]):
+        for name, var_meta in six.iteritems(vars_meta):
+            v = block.vars.get(name, None)
+            if v is None:
+                continue
+            if var_meta["is_parameter"]:
+                kwargs = dict((attr, var_meta[attr])
+                              for attr in _PARAMETER_ATTRS)
+                v = Parameter(
+                    block=block,
+                    shape=v.shape,
+                    dtype=v.dtype,
+                    type=v.type,
+                    lod_level=v.lod_level,
+                    stop_gradient=var_meta["stop_gradient"],
+                    error_clip=var_meta["error_clip"],
+                    name=v.name,
+                    **kwargs)
+            else:
+                v.stop_gradient = var_meta["stop_gradient"]
+                v.error_clip = var_meta["error_clip"]
+            v.is_data = var_meta["is_data"]
+    program.random_seed = meta["seed"]
+    program._is_distributed = meta["is_distributed"]
+    program._is_chief = meta["is_chief"]
+    program._endpoints = meta["endpoints"]
+    program._distributed_lookup_table = meta["distributed_lookup_table"]
+    return program
+
+
+class ProgramCache(object):
+    """
+    A disk cache of the programs built by a function.
+
+    The build function returns a tuple of the main program, the startup
+    program and a list of target Variables of the main program, such as the
+    loss. The cache key is a hash of the Paddle version, the source file of
+    the build function, the :code:`key_files`, and the arguments of the
+    build function. The arguments must be plain data, like numbers,
+    strings, lists and dicts; otherwise pass an explicit key to
+    :code:`get_or_build_with_key`. On a
+    cache hit, the programs are restored from the serialized ProgramDescs
+    together with the Python side information of their variables, like the
+    parameter attributes and the data flags. On a miss, the function is
+    called and its result is written to the cache.
+
+    The names of the built variables, like :code:`fc_0.w_0`, depend on the
+    counters of :code:`fluid.unique_name`, so their state is a part of the
+    key too. A cache hit advances the counters as the build would, so the
+    layers built afterwards get new names, just like after a real build.
+
+    A program that refers to variables of another program, like a
+    parameter server program from the DistributeTranspiler, is not
+    cached and is rebuilt every time.
+
+    Args:
+        cache_dir(str): The directory to store the cached programs. It can
+            be shared by many processes.
+        key_files(list|None): Other files whose contents change the built
+            programs, for example the modules that define the network.
+
+    Examples:
+        .. code-block:: python
+
+            def build(hidden_size):
+                main, startup = fluid.Program(), fluid.Program()
+                with fluid.program_guard(main, startup):
+                    x = fluid.layers.data(name='x', shape=[13])
+                    y = fluid.layers.data(name='y', shape=[1])
+                    y_predict = fluid.layers.fc(input=x, size=hidden_size)
+                    cost = fluid.layers.square_error_cost(y_predict, y)
+                    avg_cost = fluid.layers.mean(cost)
+                    fluid.optimizer.SGD(learning_rate=0.01).minimize(avg_cost)
+                return main, startup, [avg_cost]
+
+            cache = fluid.contrib.ProgramCache("./program_cache")
+            main, startup, (avg_cost, ) = cache.get_or_build(build, 10)
+    """
+
+    def __init__(self, cache_dir, key_files=None):
+        self.cache_dir = cache_dir
+        self.key_files = list(key_files or [])
+        # whether the last get_or_build call was a cache hit.
+        self.last_hit = False
+
+    def cache_key(self, build_fn, *args, **kwargs):
+        """
+        Get the cache key of calling build_fn with the arguments.
+
+        Returns:
+            str: the hex digest of the key.
+
+        Raises:
+            TypeError: if an argument is not plain data.
+        """
+        return self._key(build_fn, _canonical(args), _canonical(kwargs))
+
+    def _key(self, build_fn, *parts):
+        h = hashlib.sha1()
+        h.update(cpt.to_bytes("version:%d\n" % CACHE_VERSION))
+        h.update(cpt.to_bytes("paddle:%s\n" % _paddle_version()))
+        h.update(cpt.to_bytes("unique_name:%s\n" % _unique_name_state()))
+        h.update(cpt.to_bytes("fn:%s.%s\n" % (build_fn.__module__,
+                                              build_fn.__name__)))
+        files = [inspect.getsourcefile(build_fn)] + self.key_files
+        for filename in files:
+            with open(filename, 'rb') as f:
+                h.update(f.read())
+        for part in parts:
+            h.update(cpt.to_bytes(part + "\n"))
+        return h.hexdigest()
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, "%s.program" % key)
+
+    def get_or_build(self, build_fn, *args, **kwargs):
+        """
+        Restore the programs built by :code:`build_fn(*args, **kwargs)` from
+        the cache, or build and cache them on a miss.
+
+        Returns:
+            tuple: the main program, the startup program and the list of
+            target Variables in the main program.
+        """
+        key = self.cache_key(build_fn, *args, **kwargs)
+        return self._get_or_build(key, build_fn, *args, **kwargs)
+
+    def get_or_build_with_key(self, key, build_fn, *args, **kwargs):
+        """
+        Like :code:`get_or_build`, but the arguments of build_fn are
+        replaced by :code:`key` in the cache key. Use it when the arguments
+        are not plain data, for example a config object.
+
+        Args:
+            key: plain data, like a string, that identifies the arguments.
+        """
+        key = self._key(build_fn, "key:" + _canonical(key))
+        return self._get_or_build(key, build_fn, *args, **kwargs)
+
+    def _get_or_build(self, key, build_fn, *args, **kwargs):
+        path = self._cache_path(key)
+        cached = self._load(path)
+        if cached is not None:
+            self.last_hit = True
+            return self._restore(cached)
+
+        self.last_hit = False
+        main_program, startup_program, targets = build_fn(*args, **kwargs)
+        self._save(path, main_program, startup_program, targets)
+        return main_program, startup_program, targets
+
+    def _load(self, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception as e:
+            # A truncated or corrupted file, it is rebuilt and overwritten.
+            warnings.warn("failed to load the program cache %s, rebuilding "
+                          "it: %s" % (path, e))
+            return None
+        if not isinstance(cached, dict) or \
+                cached.get("version", None) != CACHE_VERSION:
+            return None
+        return cached
+
+    def _restore(self, cached):
+        main_program = _restore_program(cached["main"], cached["main_meta"])
+        startup_program = _restore_program(cached["startup"],
+                                           cached["startup_meta"])
+        block = main_program.global_block()
+        targets = [block.var(name) for name in cached["targets"]]
+        # The counters were in the same state before the build, as they are
+        # a part of the key.
+        unique_name.generator.ids.update(cached["unique_name_ids"])
+        return main_program, startup_program, targets
+
+    def _save(self, path, main_program, startup_program, targets):
+        if main_program._slice_vars_and_attrs or \
+                startup_program._slice_vars_and_attrs:
+            return
+        for t in targets:
+            if not isinstance(t, Variable) or \
+                    t.block is not main_program.global_block():
+                raise TypeError("the targets returned by the build function "
+                                "should be Variables of the global block of "
+                                "the main program.")
+        cached = {
+            "version": CACHE_VERSION,
+            "main": main_program.desc.serialize_to_string(),
+            "main_meta": _program_meta(main_program),
+            "startup": startup_program.desc.serialize_to_string(),
+            "startup_meta": _program_meta(startup_program),
+            "targets": [t.name for t in targets],
+            "unique_name_ids": dict(unique_name.generator.ids)
+        }
+        try:
+            data = pickle.dumps(cached, protocol=2)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Some Python side attributes, like a lambda error clip, can not
+            # be cached. Such programs are rebuilt every time.
+            return
+
+        if not os.path.isdir(self.cache_dir):
+            try:
+                os.makedirs(self.cache_dir)
+            except OSError:
+                # created by another process
+                pass
+        # Write to a temporary file and rename it, so other processes never
+        # read a partially written cache.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmp_path, path)
@@ -0,0 +1,452 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This module provides a thread-safe serving front end of an Inferencer, which
+merges the concurrent requests into batches and runs them on a pool of
+executors.
+
+This API is still under active development and may change drastically.
+"""
+
+from __future__ import print_function
+
+import bisect
+import collections
+import itertools
+import math
+import threading
+import time
+
+import numpy as np
+import six
+from six.moves import queue
+
+from .. import core
+from .. import executor
+
+__all__ = ['BatchingInferencer', 'Histogram']
+
+
+class Histogram(object):
+    """
+    A thread-safe histogram with exponentially growing buckets, used to
+    record the latencies and the batch sizes of BatchingInferencer.
+
+    Args:
+        min_value(float): the upper bound of the first bucket.
+        growth(float): the ratio of the upper bounds of adjacent buckets.
+        num_buckets(int): the number of buckets.
+    """
+
+    def __init__(self, min_value=1e-4, growth=1.25, num_buckets=80):
+        self.bounds = [min_value * growth**i for i in range(num_buckets)]
+        self.counts = [0] * (num_buckets + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """
+        Get the upper bound of the bucket that contains the p-th percentile.
+        """
+        with self._lock:
+            return self._percentile(p)
+
+    def _percentile(self, p):
+        if self.count == 0:
+            return 0.0
+        rank = int(math.ceil(self.count * p / 100.0))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.bounds[i], self.max) \
+                    if i < len(self.bounds) else self.max
+        return self.max
+
+    def mean(self):
+        with self._lock:
+            return self._mean()
+
+    def _mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        """
+        Returns:
+            dict: the count, mean, max and the 50/90/99th percentiles, taken
+            at the same moment.
+        """
+        with self._lock:
+            return {
+                "count": self.count,
+                "mean": self._mean(),
+                "p50": self._percentile(50),
+                "p90": self._percentile(90),
+                "p99": self._percentile(99),
+                "max": self.max
+            }
+
+
+class _Request(object):
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.keys = tuple(sorted(inputs.keys()))
+        self.batch_size = _batch_size(inputs[self.keys[0]])
+        self.enqueue_time = time.time()
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def set_result(self, result, error=None):
+        self.result = result
+        self.error = error
+        self._done.set()
+
+    def get(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise RuntimeError("The inference request is timeout.")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _to_array_and_lens(data):
+    if isinstance(data, core.LoDTensor):
+        return np.array(data), data.recursive_sequence_lengths()
+    return np.asarray(data), []
+
+
+def _batch_size(data):
+    """
+    The batch size of an input is its number of sequences for a LoDTensor,
+    or its number of rows for a dense input.
+    """
+    if isinstance(data, core.LoDTensor):
+        lens = data.recursive_sequence_lengths()
+        if lens:
+            return len(lens[0])
+    return np.asarray(data).shape[0]
+
+
+def _prepare_inputs(request):
+    """
+    Convert the inputs of a request to pairs of an array and the sequence
+    lengths, and check that every input holds the samples of the request.
+    """
+    inputs = dict()
+    for name in request.keys:
+        array, lens = _to_array_and_lens(request.inputs[name])
+        if array.ndim == 0:
+            raise ValueError("The input %s should be a batch." % name)
+        batch_size = len(lens[0]) if lens else array.shape[0]
+        if batch_size != request.batch_size:
+            raise ValueError("The batch sizes of the inputs differ.")
+        inputs[name] = (array, lens)
+    return inputs
+
+
+def _input_signature(inputs):
+    """
+    The prepared inputs of requests with the same signature can be merged.
+    """
+    return tuple((name, array.shape[1:], array.dtype.str, len(lens))
+                 for name, (array, lens) in sorted(six.iteritems(inputs)))
+
+
+def _merge_inputs(inputs_list, place):
+    """
+    Concatenate the prepared inputs of the requests with the same signature
+    along the batch dimension. The sequence lengths of each LoD level are
+    concatenated as well.
+    """
+    feed = dict()
+    for name in inputs_list[0]:
+        merged = np.concatenate(
+            [inputs[name][0] for inputs in inputs_list], axis=0)
+        lens = [
+            list(itertools.chain.from_iterable(levels))
+            for levels in zip(*[inputs[name][1] for inputs in inputs_list])
+        ]
+        if lens:
+            tensor = core.LoDTensor()
+            tensor.set(merged, place)
+            tensor.set_recursive_sequence_lengths(lens)
+            feed[name] = tensor
+        else:
+            feed[name] = merged
+    return feed
+
+
+def _slice_lod(array, lens, start, end):
+    """
+    Slice the sequences [start, end) of the top LoD level.
+    """
+    sub_lens = []
+    for level in lens:
+        sub_lens.append(level[start:end])
+        start, end = sum(level[:start]), sum(level[:end])
+    return array[start:end], sub_lens
+
+
+def _split_output(tensor, requests):
+    array = np.array(tensor)
+    lens = tensor.recursive_sequence_lengths()
+    results = []
+    start = 0
+    for req in requests:
+        end = start + req.batch_size
+        if lens:
+            sub_array, sub_lens = _slice_lod(array, lens, start, end)
+            sub_tensor = core.LoDTensor()
+            sub_tensor.set(sub_array, core.CPUPlace())
+            sub_tensor.set_recursive_sequence_lengths(sub_lens)
+            results.append(sub_tensor)
+        else:
+            results.append(array[start:end])
+        start = end
+    return results
+
+
+class BatchingInferencer(object):
+    """
+    A thread-safe serving front end of an Inferencer.
+
+    The requests from :code:`infer` or :code:`submit` are put into a queue,
+    and a batching thread merges the queued requests with the same input
+    names into a batch, until the batch has :code:`max_batch_size` samples
+    or the first request has waited :code:`max_delay` seconds. The batches
+    are run by a pool of :code:`num_workers` executors. Each of them runs in
+    a child scope of the scope of the Inferencer, so the parameters are
+    shared while the temporary variables are private to each worker. The
+    outputs are split back to the requests.
+
+    A sample is a row of a dense input, or a top level sequence of a
+    LoDTensor input. An output with LoD is returned as a LoDTensor on
+    CPUPlace, other outputs are returned as numpy arrays.
+
+    Args:
+        inferencer(Inferencer): the inferencer whose program and parameters
+            are served. It should not be parallel.
+        max_batch_size(int): the maximum number of samples of a batch. A
+            request larger than it is run as a batch alone.
+        max_delay(float): the maximum seconds to wait for more requests
+            after the first request of a batch arrives.
+        num_workers(int): the number of executors.
+
+    Examples:
+        .. code-block:: python
+
+            inferencer = fluid.Inferencer(
+                infer_func=inference_program, param_path="/tmp/model",
+                place=fluid.CPUPlace())
+            server = fluid.contrib.BatchingInferencer(
+                inferencer, max_batch_size=32, max_delay=0.002, num_workers=4)
+            # called from the threads of the RPC server
+            results = server.infer({'x': numpy.random.random((1, 13))})
+            print(server.stats())
+            server.close()
+    """
+
+    def __init__(self,
+                 inferencer,
+                 max_batch_size=32,
+                 max_delay=0.005,
+                 num_workers=1):
+        if inferencer.parallel:
+            raise ValueError("BatchingInferencer does not support a parallel "
+                             "Inferencer, use num_workers instead.")
+        if max_batch_size < 1 or num_workers < 1:
+            raise ValueError("max_batch_size and num_workers should be "
+                             "positive.")
+        self.inferencer = inferencer
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.num_workers = num_workers
+
+        self.latency = Histogram()
+        self.queue_latency = Histogram()
+        self.batch_size = Histogram(min_value=1, growth=2, num_buckets=16)
+        self._num_requests = 0
+        self._num_requests_lock = threading.Lock()
+        self._start_time = time.time()
+
+        self._requests = queue.Queue()
+        # a batch waits here until a worker is free, so requests keep
+        # accumulating in the next batch when all workers are busy.
+        self._batches = queue.Queue(maxsize=1)
+        self._closed = False
+
+        self._threads = [threading.Thread(target=self._batching_loop)]
+        for i in six.moves.range(num_workers):
+            self._threads.append(
+                threading.Thread(
+                    target=self._worker_loop, args=(i, )))
+        for t in self._threads:
+            t.daemon = True
+            t.start()
+
+    def submit(self, inputs):
+        """
+        Submit a request without waiting for it.
+
+        Args:
+            inputs(dict): a map of {"input_name": input_var}, like the inputs
+                of Inferencer.infer.
+
+        Returns:
+            A request whose :code:`get(timeout=None)` waits and returns the
+            list of outputs of the request.
+        """
+        if self._closed:
+            raise RuntimeError("Attempted to use a closed BatchingInferencer")
+        if not isinstance(inputs, dict) or not inputs:
+            raise ValueError(
+                "inputs should be a map of {'input_name': input_var}")
+        req = _Request(inputs)
+        self._requests.put(req)
+        return req
+
+    def infer(self, inputs, timeout=None):
+        """
+        Do inference for the inputs of one request, it is thread-safe.
+
+        Returns:
+            list: the outputs of the request.
+        """
+        return self.submit(inputs).get(timeout)
+
+    def stats(self):
+        """
+        Get the statistics of the served requests.
+
+        Returns:
+            dict: the summaries of the histograms of the request latency,
+            the time waiting in the queue and the batch size, in seconds
+            and samples, and the throughput in requests per second.
+        """
+        elapsed = max(time.time() - self._start_time, 1e-6)
+        return {
+            "latency": self.latency.summary(),
+            "queue_latency": self.queue_latency.summary(),
+            "batch_size": self.batch_size.summary(),
+            "requests_per_second": self._num_requests / elapsed
+        }
+
+    def close(self):
+        """
+        Stop the batching thread and the workers after the queued requests
+        are done.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._requests.put(None)
+        for t in self._threads:
+            t.join()
+
+    def _batching_loop(self):
+        pending = None
+        while True:
+            req = pending if pending is not None else self._requests.get()
+            pending = None
+            if req is None:
+                break
+            batch = [req]
+            num_samples = req.batch_size
+            deadline = req.enqueue_time + self.max_delay
+            while num_samples < self.max_batch_size:
+                timeout = deadline - time.time()
+                try:
+                    if timeout > 0:
+                        req = self._requests.get(timeout=timeout)
+                    else:
+                        req = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if req is None or req.keys != batch[0].keys or \
+                        num_samples + req.batch_size > self.max_batch_size:
+                    pending = req
+                    break
+                batch.append(req)
+                num_samples += req.batch_size
+            self._batches.put(batch)
+            if pending is None and req is None:
+                break
+        for _ in six.moves.range(self.num_workers):
+            self._batches.put(None)
+
+    def _worker_loop(self, worker_id):
+        exe = executor.Executor(self.inferencer.place)
+        scope = self.inferencer.scope.new_scope()
+        program = self.inferencer.inference_program.clone()
+        fetch_list = [self.inferencer.predict_var.name]
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                break
+            start = time.time()
+            for req in batch:
+                self.queue_latency.record(start - req.enqueue_time)
+            self.batch_size.record(sum(req.batch_size for req in batch))
+            # A bad request only fails itself. The requests whose inputs can
+            # not be merged together are run separately.
+            groups = collections.OrderedDict()
+            for req in batch:
+                try:
+                    inputs = _prepare_inputs(req)
+                except Exception as e:
+                    self._finish([req], [None], [e])
+                    continue
+                groups.setdefault(_input_signature(inputs), []).append(
+                    (req, inputs))
+            for group in six.itervalues(groups):
+                reqs = [req for req, _ in group]
+                try:
+                    feed = _merge_inputs([inputs for _, inputs in group],
+                                         self.inferencer.place)
+                    # The feed and fetch holders are persistable, so they are
+                    # created in the shared root scope. Each worker uses its
+                    # own.
+                    outs = exe.run(program,
+                                   feed=feed,
+                                   fetch_list=fetch_list,
+                                   feed_var_name='feed_%d' % worker_id,
+                                   fetch_var_name='fetch_%d' % worker_id,
+                                   scope=scope,
+                                   return_numpy=False,
+                                   use_program_cache=True)
+                    split_outs = [_split_output(out, reqs) for out in outs]
+                    results = [list(r) for r in zip(*split_outs)]
+                    errors = [None] * len(reqs)
+                except Exception as e:
+                    results = [None] * len(reqs)
+                    errors = [e] * len(reqs)
+                self._finish(reqs, results, errors)
+
+    def _finish(self, requests, results, errors):
+        end = time.time()
+        for req, result, error in zip(requests, results, errors):
+            self.latency.record(end - req.enqueue_time)
+            req.set_result(result, error)
+        with self._num_requests_lock:
+            self._num_requests += len(requests)
@@ -0,0 +1,395 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This module provides a combined parameter file format that is loaded by
+memory mapping, and a scope whose parameters are memory-mapped from it, so
+many scopes, threads and processes on a host use one copy of the
+parameters.
+
+A combined parameter file is laid out as:
+
+    - 8 bytes magic, uint32 version, uint32 alignment, uint64 header size
+    - the header, a JSON index of the name, dtype, shape, LoD, offset and
+      size in bytes of each variable, padded to the alignment
+    - the data of each variable, each starting at an aligned offset
+
+This API is still under active development and may change drastically.
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import struct
+
+import numpy as np
+import six
+
+from .. import core
+from .. import io
+from ..executor import global_scope
+from ..framework import default_main_program
+from ..proto import framework_pb2
+
+__all__ = [
+    'save_combined_params', 'load_combined_params',
+    'read_combined_params_header', 'convert_to_combined_params',
+    'save_shared_params', 'SharedParamScope'
+]
+
+COMBINED_PARAMS_MAGIC = b"PDPARAMS"
+COMBINED_PARAMS_VERSION = 1
+# The data of each variable starts at a multiple of the alignment, so it can
+# be used in place by the tensors.
+COMBINED_PARAMS_ALIGNMENT = 64
+# magic, version, alignment, header size
+_PREFIX_FORMAT = "<8sIIQ"
+_PREFIX_SIZE = struct.calcsize(_PREFIX_FORMAT)
+
+SHARED_PARAMS_FILENAME = "__shared_params__"
+
+# The data types of the serialized LoDTensors. float16 is kept as uint16,
+# which is how numpy arrays are used as float16 tensors.
+_PROTO_TO_NP_DTYPE = {
+    framework_pb2.VarType.BOOL: np.bool_,
+    framework_pb2.VarType.INT16: np.int16,
+    framework_pb2.VarType.INT32: np.int32,
+    framework_pb2.VarType.INT64: np.int64,
+    framework_pb2.VarType.FP16: np.uint16,
+    framework_pb2.VarType.FP32: np.float32,
+    framework_pb2.VarType.FP64: np.float64,
+    framework_pb2.VarType.UINT8: np.uint8,
+    framework_pb2.VarType.INT8: np.int8,
+}
+
+
+def _align(offset, alignment):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _persistable_vars(main_program, var_names):
+    if main_program is None:
+        main_program = default_main_program()
+    names = []
+    for var in main_program.list_vars():
+        if not io.is_persistable(var) or var.name in names:
+            continue
+        if var.type != core.VarDesc.VarType.LOD_TENSOR:
+            continue
+        if var_names is None or var.name in var_names:
+            names.append(var.name)
+    return names
+
+
+def _write_combined_params(filename, arrays):
+    """
+    Write the list of (name, numpy array, recursive sequence lengths).
+    """
+    entries = []
+    offset = 0
+    for name, array, lod in arrays:
+        entries.append({
+            "name": name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "lod": lod,
+            "offset": offset,
+            "nbytes": array.nbytes
+        })
+        offset = _align(offset + array.nbytes, COMBINED_PARAMS_ALIGNMENT)
+
+    header = json.dumps(entries, sort_keys=True).encode("utf-8")
+    data_start = _align(_PREFIX_SIZE + len(header), COMBINED_PARAMS_ALIGNMENT)
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wb") as f:
+        f.write(
+            struct.pack(_PREFIX_FORMAT, COMBINED_PARAMS_MAGIC,
+                        COMBINED_PARAMS_VERSION, COMBINED_PARAMS_ALIGNMENT,
+                        len(header)))
+        f.write(header)
+        for entry, (_, array, _) in zip(entries, arrays):
+            f.seek(data_start + entry["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.rename(tmp_filename, filename)
+
+
+def save_combined_params(filename, main_program=None, scope=None,
+                         var_names=None):
+    """
+    Save the persistable variables of a program from a scope into a
+    combined parameter file, which is loaded by :code:`load_combined_params`.
+
+    Args:
+        filename(str): The file to save the variables.
+        main_program(Program|None): The program whose persistable variables
+            are saved. The default_main_program is used if it is None.
+        scope(Scope|None): The scope holding the variables. The global scope
+            is used if it is None.
+        var_names(list|None): Only save these persistable variables.
+
+    Examples:
+        .. code-block:: python
+
+            exe = fluid.Executor(fluid.CPUPlace())
+            exe.run(fluid.default_startup_program())
+            fluid.contrib.save_combined_params("./model.params")
+    """
+    if scope is None:
+        scope = global_scope()
+    arrays = []
+    for name in _persistable_vars(main_program, var_names):
+        scope_var = scope.find_var(name)
+        if scope_var is None:
+            raise ValueError("Variable %s is not found in the scope." % name)
+        tensor = scope_var.get_tensor()
+        arrays.append((name, np.array(tensor),
+                       tensor.recursive_sequence_lengths()))
+    _write_combined_params(filename, arrays)
+
+
+def read_combined_params_header(filename):
+    """
+    Read the index of a combined parameter file without reading the data.
+
+    Returns:
+        tuple: the offset of the data, and the list of entries, each is a
+        dict of the name, dtype, shape, lod, offset and nbytes of a
+        variable, where offset is relative to the data.
+    """
+    with open(filename, "rb") as f:
+        prefix = f.read(_PREFIX_SIZE)
+        if len(prefix) != _PREFIX_SIZE:
+            raise ValueError("%s is not a combined parameter file." %
+                             filename)
+        magic, version, alignment, header_size = struct.unpack(_PREFIX_FORMAT,
+                                                               prefix)
+        if magic != COMBINED_PARAMS_MAGIC:
+            raise ValueError("%s is not a combined parameter file." %
+                             filename)
+        if version != COMBINED_PARAMS_VERSION:
+            raise ValueError("Unsupported combined parameter file version %d."
+                             % version)
+        entries = json.loads(f.read(header_size).decode("utf-8"))
+    return _align(_PREFIX_SIZE + header_size, alignment), entries
+
+
+def load_combined_params(filename, scope=None, var_names=None, place=None):
+    """
+    Load the variables of a combined parameter file into a scope.
+
+    The file is memory-mapped copy-on-write, and only the pages of the
+    loaded variables are read. On CPUPlace, a tensor uses the mapped memory
+    without copying when the data is aligned for its dtype. Otherwise the
+    data is copied into the tensor.
+
+    Args:
+        filename(str): The combined parameter file.
+        scope(Scope|None): The scope to load the variables into. The global
+            scope is used if it is None.
+        var_names(list|None): The names of the variables to load, all the
+            variables in the file are loaded if it is None.
+        place(Place|None): The place of the tensors, CPUPlace by default.
+
+    Returns:
+        list: the names of the loaded variables.
+
+    Examples:
+        .. code-block:: python
+
+            fluid.contrib.load_combined_params(
+                "./model.params", var_names=["fc_0.w_0", "fc_0.b_0"])
+    """
+    if scope is None:
+        scope = global_scope()
+    if place is None:
+        place = core.CPUPlace()
+    data_start, entries = read_combined_params_header(filename)
+    if var_names is not None:
+        by_name = dict((entry["name"], entry) for entry in entries)
+        missing = [name for name in var_names if name not in by_name]
+        if missing:
+            raise ValueError("Variables %s are not saved in %s." %
+                             (missing, filename))
+        entries = [by_name[name] for name in var_names]
+    if not entries:
+        return []
+
+    mapped = np.memmap(filename, dtype=np.uint8, mode='c')
+    for entry in entries:
+        dtype = np.dtype(entry["dtype"])
+        start = data_start + entry["offset"]
+        array = mapped[start:start + entry["nbytes"]].view(dtype).reshape(
+            entry["shape"])
+        if dtype == np.float16:
+            # float16 tensors are set from uint16 arrays.
+            array = array.view(np.uint16)
+        tensor = scope.var(entry["name"]).get_tensor()
+        if isinstance(place, core.CPUPlace) and array.flags.aligned and \
+                array.size > 0:
+            tensor._share_numpy_data(array)
+        else:
+            tensor.set(np.array(array), place)
+        if entry["lod"]:
+            tensor.set_recursive_sequence_lengths(entry["lod"])
+    return [entry["name"] for entry in entries]
+
+
+def _read_lod_tensor(f):
+    """
+    Read a LoDTensor written by the save or save_combine operator.
+
+    Returns:
+        tuple: the numpy array and the recursive sequence lengths.
+    """
+    version, lod_level = struct.unpack("<IQ", f.read(12))
+    if version != 0:
+        raise ValueError("Unsupported LoDTensor version %d." % version)
+    lod = []
+    for _ in six.moves.range(lod_level):
+        size, = struct.unpack("<Q", f.read(8))
+        offsets = np.frombuffer(f.read(size), dtype=np.uint64)
+        lod.append([int(n) for n in np.diff(offsets)])
+    version, desc_size = struct.unpack("<Ii", f.read(8))
+    if version != 0:
+        raise ValueError("Unsupported Tensor version %d." % version)
+    desc = framework_pb2.VarType.TensorDesc.FromString(f.read(desc_size))
+    dtype = np.dtype(_PROTO_TO_NP_DTYPE[desc.data_type])
+    shape = list(desc.dims)
+    array = np.frombuffer(
+        f.read(int(np.prod(shape)) * dtype.itemsize), dtype=dtype)
+    return array.reshape(shape), lod
+
+
+def convert_to_combined_params(dirname,
+                               output_filename,
+                               main_program=None,
+                               filename=None,
+                               var_names=None):
+    """
+    Convert the variables saved by :code:`fluid.io.save_vars`, or by
+    save_params, save_persistables and save_inference_model, into a combined
+    parameter file. The saved files are parsed directly, so no executor or
+    scope is needed.
+
+    Args:
+        dirname(str): The directory of the saved variables.
+        output_filename(str): The combined parameter file to write.
+        main_program(Program|None): The program whose persistable variables
+            were saved. The default_main_program is used if it is None.
+        filename(str|None): The file in dirname holding all the variables, if
+            they were saved in a single file. The variables are read in the
+            order they were saved, which is the order of the persistable
+            variables in main_program, so var_names should also select the
+            variables that were saved.
+        var_names(list|None): Only convert these persistable variables.
+
+    Examples:
+        .. code-block:: python
+
+            [program, _, _] = fluid.io.load_inference_model(dirname, exe)
+            fluid.contrib.convert_to_combined_params(
+                dirname, "./model.params", main_program=program)
+    """
+    names = _persistable_vars(main_program, var_names)
+    arrays = []
+    if filename is None:
+        for name in names:
+            with open(os.path.join(dirname, name), "rb") as f:
+                array, lod = _read_lod_tensor(f)
+            arrays.append((name, array, lod))
+    else:
+        with open(os.path.join(dirname, filename), "rb") as f:
+            for name in names:
+                array, lod = _read_lod_tensor(f)
+                arrays.append((name, array, lod))
+    _write_combined_params(output_filename, arrays)
+
+
+def save_shared_params(dirname, main_program=None, scope=None):
+    """
+    Save the persistable variables of a program from a scope into a combined
+    parameter file in dirname, to be loaded by SharedParamScope.
+
+    Args:
+        dirname(str): The directory to save the variables.
+        main_program(Program|None): The program whose persistable variables
+            are saved. The default_main_program is used if it is None.
+        scope(Scope|None): The scope holding the variables. The global scope
+            is used if it is None.
+
+    Examples:
+        .. code-block:: python
+
+            exe = fluid.Executor(fluid.CPUPlace())
+            fluid.io.load_params(exe, "./params", main_program=prog)
+            fluid.contrib.save_shared_params("./shared_params", prog)
+    """
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    save_combined_params(
+        os.path.join(dirname, SHARED_PARAMS_FILENAME), main_program, scope)
+
+
+class SharedParamScope(object):
+    """
+    A scope holding the parameters saved by :code:`save_shared_params`.
+
+    The parameters are memory-mapped copy-on-write and used by the tensors
+    without copying, so the memory of the parameters is shared by all the
+    processes that map the same files, and only the pages actually read are
+    resident. The parameters should be read-only: an operator writing a
+    parameter gets a private copy of the touched pages.
+
+    The parameters are on CPUPlace. The per-request temporaries are kept in
+    the child scopes from :code:`new_scope`, since an Executor creates the
+    persistable variables in the root scope and the others in a local scope
+    of the scope it runs in.
+
+    Args:
+        dirname(str): The directory of the saved parameters.
+        var_names(list|None): The names of the parameters to load, all the
+            saved parameters are loaded if it is None.
+
+    Examples:
+        .. code-block:: python
+
+            shared = fluid.contrib.SharedParamScope("./shared_params")
+            # in each worker thread or process
+            inferencer = fluid.Inferencer(
+                infer_func=inference_program,
+                param_path=None,
+                place=fluid.CPUPlace(),
+                param_scope=shared)
+    """
+
+    def __init__(self, dirname, var_names=None):
+        self.scope = core.Scope()
+        self.var_names = sorted(
+            load_combined_params(
+                os.path.join(dirname, SHARED_PARAMS_FILENAME),
+                scope=self.scope,
+                var_names=var_names))
+
+    def new_scope(self):
+        """
+        Create a child scope which uses the shared parameters.
+
+        Returns:
+            Scope: the child scope.
+        """
+        return self.scope.new_scope()
+
+    def find_var(self, name):
+        return self.scope.find_var(name)
@@ -17,6 +17,7 @@ from __future__ import print_function
 import numpy as np
 import contextlib
 import six
+import weakref
 from .framework import Program, default_main_program, Variable
 from . import core
 
@@ -204,22 +205,61 @@ def _fetch_var(name, scope=None, return_numpy=True):
     return tensor
 
 
+def _to_name_str(var):
+    if isinstance(var, Variable):
+        return var.desc.name()
+    elif isinstance(var, str):
+        return var
+    elif isinstance(var, six.string_types):
+        return str(var)
+    else:
+        raise TypeError(str(var) + " should be Variable or str")
+
+
 def _get_program_cache_key(feed, fetch_list):
     feed_var_names = list(feed.keys())
+    fetch_var_names = list(map(_to_name_str, fetch_list))
 
-    def to_name_str(var):
-        if isinstance(var, Variable):
-            return var.desc.name()
-        elif isinstance(var, str):
-            return var
-        elif isinstance(var, six.string_types):
-            return str(var)
-        else:
-            raise TypeError(str(var) + " should be Variable or str")
+    return str(feed_var_names + fetch_var_names)
 
-    fetch_var_names = list(map(to_name_str, fetch_list))
 
-    return str(feed_var_names + fetch_var_names)
+# The operators that talk to other processes. Their outputs are dummy
+# variables for control dependency, so they are never pruned.
+_SIDE_EFFECT_OP_TYPES = set([
+    'send', 'recv', 'send_barrier', 'fetch_barrier', 'checkpoint_notify',
+    'listen_and_serv'
+])
+
+
+def _prune_program(program, feed, fetch_list):
+    """
+    Get a copy of program which only contains the operators of the global
+    block that are needed to compute the fetch_list from the feed.
+
+    An operator is needed if it writes a variable read by the fetch_list or
+    by another needed operator after it. The fed variables are given, so the
+    operators that compute them are not needed. The operators without
+    outputs, like print and save, and the RPC operators are run for their
+    side effects and always kept.
+    """
+    pruned_program = program.clone()
+    block = pruned_program.global_block()
+    feed_names = set(feed.keys())
+    needed_names = set(map(_to_name_str, fetch_list))
+    for i in reversed(range(len(block.ops))):
+        op_desc = block.ops[i].desc
+        op_type = op_desc.type()
+        if op_type == 'feed':
+            continue
+        if op_type != 'fetch' and op_type not in _SIDE_EFFECT_OP_TYPES:
+            outputs = set(op_desc.output_arg_names())
+            if outputs and not (outputs & needed_names) - feed_names:
+                block._remove_op(i)
+                continue
+        needed_names.update(
+            name for name in op_desc.input_arg_names()
+            if name not in feed_names)
+    return pruned_program
 
 
 def _as_lodtensor(data, place):
@@ -260,7 +300,8 @@ class Executor(object):
     Python executor takes a program, add feed operators and fetch operators to this program according
     to feed map and fetch_list. Feed map provides input data for the program. fetch_list provides
     the variables(or names) that user want to get after program run. Note: the executor will run all
-    operators in the program but not only the operators dependent by the fetch_list.
+    operators in the program but not only the operators dependent by the fetch_list, unless
+    :code:`use_prune` of :code:`run` is set.
     It store the global variables into the global scope, and create a local scope for the temporary
     variables. The local scope contents will be discarded after every minibatch forward/backward finished.
     But the global scope variables will be persistent through different runs.
@@ -279,6 +320,9 @@ class Executor(object):
         p.set_place(place)
         self.executor = core.Executor(p)
         self.program_caches = dict()
+        # program --> {cache key: (number of ops, pruned program)}, dropped
+        # with the program.
+        self._pruned_program_caches = weakref.WeakKeyDictionary()
         self._closed = False
 
     def _get_program_cache(self, program_cache_key):
@@ -287,6 +331,18 @@ class Executor(object):
     def _add_program_cache(self, program_cache_key, program):
         self.program_caches[program_cache_key] = program
 
+    def _get_pruned_program(self, program, feed, fetch_list):
+        caches = self._pruned_program_caches.setdefault(program, dict())
+        key = _get_program_cache_key(feed, fetch_list)
+        num_ops = len(program.global_block().ops)
+        cached = caches.get(key, None)
+        # The cache is dropped when ops are appended to or removed from the
+        # program.
+        if cached is None or cached[0] != num_ops:
+            cached = (num_ops, _prune_program(program, feed, fetch_list))
+            caches[key] = cached
+        return cached[1]
+
     def _add_feed_fetch_ops(self, program, feed, fetch_list, feed_var_name,
                             fetch_var_name):
         tmp_program = program.clone()
@@ -379,7 +435,8 @@ class Executor(object):
             fetch_var_name='fetch',
             scope=None,
             return_numpy=True,
-            use_program_cache=False):
+            use_program_cache=False,
+            use_prune=False):
         """
         Run program by this Executor. Feed data by feed map, fetch result by fetch_list.
         Python executor takes a program, add feed operators and fetch operators to this program according
@@ -387,7 +444,8 @@ class Executor(object):
         the variables(or names) that user want to get after program run.
 
         Note: the executor will run all
-        operators in the program but not only the operators dependent by the fetch_list
+        operators in the program but not only the operators dependent by the fetch_list,
+        unless use_prune is set.
 
         Args:
             program(Program): the program that need to run, if not provied, then default_main_program will be used.
@@ -398,6 +456,10 @@ class Executor(object):
             scope(Scope): the scope used to run this program, you can switch it to different scope. default is global_scope
             return_numpy(bool): if convert the fetched tensor to numpy
             use_program_cache(bool): set use_program_cache to true if program not changed compare to the last step.
+            use_prune(bool): only run the operators of the global block needed to compute the fetch_list from
+                the feed. For example, evaluating a metric of a training program does not run the backward and
+                optimizer operators. The pruned program is cached for each program, feed and fetch_list, so the
+                program should not be changed in place except by appending or removing operators.
 
         Returns:
 
@@ -421,6 +483,12 @@ class Executor(object):
             >>> outs = exe.run(
             >>>     feed={'X': x},
             >>>     fetch_list=[loss.name])
+
+            >>> # only run the forward operators
+            >>> outs = exe.run(
+            >>>     feed={'X': x},
+            >>>     fetch_list=[loss.name],
+            >>>     use_prune=True)
         """
 
         if self._closed:
@@ -446,6 +514,9 @@ class Executor(object):
             scope = global_scope()
 
         cache_key = _get_program_cache_key(feed, fetch_list)
+        if use_prune:
+            program = self._get_pruned_program(program, feed, fetch_list)
+            cache_key = "pruned:" + cache_key
         if use_program_cache:
             cached_program = self._get_program_cache(cache_key)
             if cached_program is None:
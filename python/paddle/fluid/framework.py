@@ -51,6 +51,9 @@ TEMP_VAR_NAME = core.kTempVarName()
 GRAD_VAR_SUFFIX = core.kGradVarSuffix()
 ZERO_VAR_SUFFIX = core.kZeroVarSuffix()
 CONTROL_DEP_VAR_PREFIX = core.kControlDepVarName()
+# The buffers that hold several variables contiguously, see the fused_update
+# of Optimizer. They are not saved, the variables they hold are.
+FUSED_VAR_SUFFIX = "@FUSED"
 
 
 class NameScope(object):
@@ -1175,6 +1178,11 @@ class Block(object):
 
     def create_parameter(self, *args, **kwargs):
         global_block = self.program.global_block()
+        name = kwargs.get('name', None)
+        # Only a parameter that has been created before can be inited by an
+        # op already, so the scan of all the ops is skipped for new ones.
+        is_new_param = name is None or global_block.desc.find_var(
+            cpt.to_bytes(name)) is None
         param = Parameter(global_block, *args, **kwargs)
         if 'initializer' in kwargs:
 
@@ -1186,7 +1194,8 @@ class Block(object):
                 return init_ops
 
             initializer = kwargs['initializer']
-            init_ops = _is_inited_by(global_block, param)
+            init_ops = [] if is_new_param else _is_inited_by(global_block,
+                                                             param)
             init_ops_len = len(init_ops)
             if init_ops_len > 1:
                 raise RuntimeError("param " + param.name +
@@ -1275,56 +1284,19 @@ class Block(object):
             if not self.desc.find_var(cpt.to_bytes(var)):
                 self.vars.pop(var)
 
-        # sync operators from cpp
-        ops_in_cpp = []
-        for op_idx in range(0, self.desc.op_size()):
-            ops_in_cpp.append(self.desc.op(op_idx))
-
-        if len(self.ops) != 0:
-            first_op_in_python = self.ops[0].desc
-            last_op_in_python = self.ops[len(self.ops) - 1].desc
-            start_index = None
-            end_index = None
-            for index in range(len(ops_in_cpp)):
-                if first_op_in_python == ops_in_cpp[index]:
-                    start_index = index
-                if last_op_in_python == ops_in_cpp[index]:
-                    end_index = index
-            assert start_index is not None
-            assert end_index is not None
-            assert start_index <= end_index
-        else:
-            start_index = 0
-            end_index = -1
-
-        # sync ops append to the head of cpp_ops
-        for index in range((start_index - 1 - 1), -1, -1):
-            op_desc = ops_in_cpp[index]
-            op = Operator(self, op_desc)
-            self.ops.insert(0, op)
-
-        # sync ops append to the end of cpp_ops
-        for index in range((end_index + 1), len(ops_in_cpp)):
-            op_desc = ops_in_cpp[index]
-            op = Operator(self, op_desc)
-            self.ops.append(op)
-
-        # sync ops removed from c++ end
-        if end_index != -1 and end_index < len(self.ops):
-            ops_in_cpp_index = 0
-            ops_in_python_index = 0
-            while ops_in_python_index < len(
-                    self.ops) and ops_in_cpp_index < len(ops_in_cpp):
-                if self.ops[ops_in_python_index].desc != ops_in_cpp[
-                        ops_in_cpp_index]:
-                    del self.ops[ops_in_python_index]
-                else:
-                    ops_in_cpp_index += 1
-                    ops_in_python_index += 1
-
-        assert len(self.ops) == len(ops_in_cpp)
-        for index in range(len(self.ops)):
-            assert self.ops[index].desc == ops_in_cpp[index]
+        # sync operators from cpp. Python operators are matched to the op
+        # descs in c++ by identity in one pass: new op descs get a new
+        # Operator, and the operators whose descs are removed from c++ are
+        # dropped.
+        ops_in_python = dict((id(op.desc), op) for op in self.ops)
+        ops = []
+        for op_idx in range(self.desc.op_size()):
+            op_desc = self.desc.op(op_idx)
+            op = ops_in_python.get(id(op_desc), None)
+            if op is None:
+                op = Operator(self, op_desc)
+            ops.append(op)
+        self.ops[:] = ops
 
     def _copy_param_info_from(self, other):
         """
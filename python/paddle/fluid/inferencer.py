@@ -37,6 +37,9 @@ class Inferencer(object):
         param_path (str): The path where the inference model is saved by fluid.io.save_params
         place (Place): place to do the inference
         parallel (bool): use parallel_executor to run the inference, it will use multi CPU/GPU.
+        param_scope (Scope|SharedParamScope|None): a scope holding the loaded parameters, like
+            fluid.contrib.SharedParamScope. If it is set, the inference runs in a child scope of it
+            and param_path is not loaded, so many Inferencers share one copy of the parameters.
 
     Examples:
         .. code-block:: python
@@ -52,20 +55,38 @@ class Inferencer(object):
 
     """
 
-    def __init__(self, infer_func, param_path, place=None, parallel=False):
+    def __init__(self,
+                 infer_func,
+                 param_path,
+                 place=None,
+                 parallel=False,
+                 param_scope=None):
         self.param_path = param_path
-        self.scope = core.Scope()
         self.parallel = parallel
         self.place = check_and_get_place(place)
+        self._feed_var_name = 'feed'
+        self._fetch_var_name = 'fetch'
+        if param_scope is None:
+            self.scope = core.Scope()
+        else:
+            if parallel:
+                raise ValueError(
+                    "param_scope is not supported by parallel Inferencer.")
+            self.scope = param_scope.new_scope()
+            # The feed and fetch holders are persistable and created in the
+            # root scope, which is shared with other Inferencers.
+            self._feed_var_name = unique_name.generate('feed')
+            self._fetch_var_name = unique_name.generate('fetch')
 
         self.inference_program = framework.Program()
         with framework.program_guard(self.inference_program):
             with unique_name.guard():
                 self.predict_var = infer_func()
 
-        with self._prog_and_scope_guard():
-            # load params from param_path into scope
-            io.load_params(executor.Executor(self.place), param_path)
+        if param_scope is None:
+            with self._prog_and_scope_guard():
+                # load params from param_path into scope
+                io.load_params(executor.Executor(self.place), param_path)
 
         if parallel:
             with self._prog_and_scope_guard():
@@ -99,9 +120,16 @@ class Inferencer(object):
                 "inputs should be a map of {'input_name': input_var}")
 
         with self._prog_and_scope_guard():
-            results = self.exe.run(feed=inputs,
-                                   fetch_list=[self.predict_var.name],
-                                   return_numpy=return_numpy)
+            if self.parallel:
+                results = self.exe.run(feed=inputs,
+                                       fetch_list=[self.predict_var.name],
+                                       return_numpy=return_numpy)
+            else:
+                results = self.exe.run(feed=inputs,
+                                       fetch_list=[self.predict_var.name],
+                                       feed_var_name=self._feed_var_name,
+                                       fetch_var_name=self._fetch_var_name,
+                                       return_numpy=return_numpy)
 
         return results
 
@@ -21,7 +21,7 @@ import shutil
 import six
 
 from paddle.fluid.evaluator import Evaluator
-from paddle.fluid.framework import Program, Parameter, default_main_program, default_startup_program, Variable
+from paddle.fluid.framework import Program, Parameter, default_main_program, default_startup_program, Variable, FUSED_VAR_SUFFIX
 from . import core
 
 __all__ = [
@@ -72,6 +72,9 @@ def is_persistable(var):
             var.desc.type() == core.VarDesc.VarType.FETCH_LIST or \
             var.desc.type() == core.VarDesc.VarType.READER:
         return False
+    if var.name.endswith(FUSED_VAR_SUFFIX):
+        # the variables it holds are saved instead.
+        return False
     return var.persistable
 
 
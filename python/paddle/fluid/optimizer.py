@@ -14,8 +14,11 @@
 
 from __future__ import print_function
 import re
-from collections import defaultdict
-from paddle.fluid.framework import Program, Variable, name_scope
+import six
+from collections import defaultdict, OrderedDict
+from paddle.fluid.framework import Program, Variable, name_scope, \
+    FUSED_VAR_SUFFIX
+from . import core
 from . import framework
 from . import layers
 from .backward import append_backward
@@ -41,13 +44,26 @@ class Optimizer(object):
     Define the common interface of an optimizer.
     User should not use this class directly,
     but need to use one of it's implementation.
+
+    If `fused_update` is True, the dense float32 and float64 parameters are
+    grouped by data type and learning rate. The parameters, gradients and
+    accumulators of a group are laid out contiguously in one buffer each, and
+    the group is updated by one optimizer op instead of one op for each
+    parameter. The parameters and accumulators remain variables that are views
+    of the buffers, so they can be saved and loaded as before. The
+    accumulators that are not shaped like their parameters, like the beta
+    power accumulators of Adam, are kept for the first parameter of a group
+    only. The fused update works with Executor
+    only, and is not supported by ParallelExecutor, memory_optimize or the
+    distribute transpiler.
     """
 
     def __init__(self,
                  learning_rate,
                  regularization=None,
                  LARS_weight_decay=0.0,
-                 name=None):
+                 name=None,
+                 fused_update=False):
         if not isinstance(learning_rate, float) and \
                 not isinstance(learning_rate, framework.Variable):
             raise TypeError("learning rate should be float or Variable")
@@ -69,6 +85,7 @@ class Optimizer(object):
         self._accumulators = defaultdict(lambda: dict())
         self.helper = None
         self._LARS_weight_decay = LARS_weight_decay
+        self._fused_update = fused_update
 
     def _create_global_learning_rate(self):
         lr = self._global_learning_rate()
@@ -193,6 +210,125 @@ class Optimizer(object):
                             format(name, param.name))
         return self._accumulators[name][param.name]
 
+    def _remove_global_variable(self, var, main_block, startup_block):
+        """Remove a global variable, like an unused accumulator, from the
+        main program, and its variable and initializers from the startup
+        program.
+        """
+        main_block._remove_var(var.name)
+        if startup_block.has_var(var.name):
+            for index in reversed(range(len(startup_block.ops))):
+                if var.name in startup_block.ops[index].output_arg_names:
+                    startup_block._remove_op(index)
+            startup_block._remove_var(var.name)
+
+    def _fuse_parameters_and_grads(self, block, parameters_and_grads):
+        """Lay out the parameters, gradients and accumulators of each group
+        of parameters contiguously for fused_update.
+
+        Args:
+            block: the block in which the loss variable is present
+            parameters_and_grads: list of (parameter, gradient) pairs
+
+        Returns:
+            list of (parameter, gradient) pairs to update, in which each group
+            is replaced by the pair of its buffers
+        """
+        groups = OrderedDict()
+        fused_params_and_grads = []
+        for param, grad in parameters_and_grads:
+            if grad is None or param.trainable is not True or \
+                    grad.type != core.VarDesc.VarType.LOD_TENSOR or \
+                    param.dtype not in (core.VarDesc.VarType.FP32,
+                                        core.VarDesc.VarType.FP64):
+                fused_params_and_grads.append((param, grad))
+                continue
+            param_lr = param.optimize_attr['learning_rate']
+            if isinstance(param_lr, Variable):
+                param_lr = param_lr.name
+            groups.setdefault((param.dtype, param_lr), []).append(
+                (param, grad))
+
+        main_block = framework.default_main_program().global_block()
+        startup_block = framework.default_startup_program().global_block()
+        for group in six.itervalues(groups):
+            if len(group) == 1:
+                fused_params_and_grads.extend(group)
+                continue
+            params = [p for p, _ in group]
+            grads = [g for _, g in group]
+            numel = sum(
+                six.moves.reduce(lambda x, y: x * y, p.shape, 1)
+                for p in params)
+
+            def create_buffer(prefix, persistable):
+                var = main_block.create_var(
+                    name=unique_name.generate(prefix) + FUSED_VAR_SUFFIX,
+                    shape=[numel],
+                    dtype=params[0].dtype,
+                    persistable=persistable)
+                if persistable:
+                    # The buffer is filled by the startup program, so it must
+                    # be persistable there too to be kept in the global scope.
+                    startup_block.create_var(
+                        name=var.name,
+                        shape=var.shape,
+                        dtype=var.dtype,
+                        persistable=True)
+                return var
+
+            fused_param = create_buffer("fused_param", True)
+            fused_param.trainable = True
+            fused_param.optimize_attr = params[0].optimize_attr
+            startup_block.append_op(
+                type="coalesce_tensor",
+                inputs={"Input": params},
+                outputs={"Output": params,
+                         "FusedOutput": fused_param},
+                attrs={"copy_data": True})
+            for name, accumulators in six.iteritems(self._accumulators):
+                if params[0].name not in accumulators:
+                    continue
+                accs = [accumulators[p.name] for p in params]
+                if any(acc.shape != p.shape for acc, p in zip(accs, params)):
+                    # Only the accumulator of the first parameter is updated,
+                    # so the others are removed instead of saved stale.
+                    accumulators[fused_param.name] = accs[0]
+                    for acc, p in zip(accs[1:], params[1:]):
+                        del accumulators[p.name]
+                        self._remove_global_variable(acc, main_block,
+                                                     startup_block)
+                    continue
+                fused_acc = create_buffer(name, True)
+                startup_block.append_op(
+                    type="coalesce_tensor",
+                    inputs={"Input": accs},
+                    outputs={"Output": accs,
+                             "FusedOutput": fused_acc},
+                    attrs={"copy_data": True})
+                accumulators[fused_param.name] = fused_acc
+
+            # The gradients are made views before any op of the program, so
+            # the backward ops write them in place. The ops that reallocate
+            # their outputs are covered by copying those gradients back before
+            # the update.
+            fused_grad = create_buffer("fused_grad", False)
+            main_block._prepend_op(
+                type="coalesce_tensor",
+                inputs={"Input": params},
+                outputs={"Output": grads,
+                         "FusedOutput": fused_grad},
+                attrs={"copy_data": False})
+            with block.program.optimized_guard([fused_param, fused_grad]):
+                block.append_op(
+                    type="coalesce_tensor",
+                    inputs={"Input": grads},
+                    outputs={"Output": grads,
+                             "FusedOutput": fused_grad},
+                    attrs={"copy_data": True})
+            fused_params_and_grads.append((fused_param, fused_grad))
+        return fused_params_and_grads
+
     def _create_optimization_pass(self,
                                   parameters_and_grads,
                                   loss,
@@ -231,6 +367,14 @@ class Optimizer(object):
                 layers.append_LARS(parameters_and_grads,
                                    self._global_learning_rate(),
                                    self._LARS_weight_decay)
+            if self._fused_update:
+                parameters_and_grads = self._fuse_parameters_and_grads(
+                    loss.block, parameters_and_grads)
+                # one op is prepended to the program for each fused group.
+                start += len([
+                    p for p, _ in parameters_and_grads
+                    if p.name.endswith(FUSED_VAR_SUFFIX)
+                ])
 
             optimize_ops = []
             for param_and_grad in parameters_and_grads:
@@ -15,12 +15,20 @@
 from __future__ import print_function
 
 import os
+import json
+import collections
 import contextlib
+import multiprocessing
+import shutil
+import six
 from . import core
 __all__ = [
-    'convert_reader_to_recordio_file', 'convert_reader_to_recordio_files'
+    'convert_reader_to_recordio_file', 'convert_reader_to_recordio_files',
+    'load_recordio_shard_meta'
 ]
 
+RECORDIO_META_SUFFIX = ".meta"
+
 
 @contextlib.contextmanager
 def create_recordio_writer(filename,
@@ -91,6 +99,164 @@ def convert_reader_to_recordio_file(
     return counter
 
 
+def _merge_field_stat(stat, tensor):
+    shape = tensor.shape()
+    lod_level = len(tensor.recursive_sequence_lengths())
+    if stat is None:
+        return {
+            "shape": list(shape[1:]),
+            "dtype": str(tensor._dtype()),
+            "lod_level": lod_level,
+            "num_rows": shape[0] if shape else 0
+        }
+    # Dimensions that differ between records are reported as -1.
+    if len(stat["shape"]) != len(shape) - 1:
+        stat["shape"] = [-1] * (len(shape) - 1)
+    else:
+        stat["shape"] = [
+            d if d == s else -1 for d, s in zip(stat["shape"], shape[1:])
+        ]
+    stat["num_rows"] += shape[0] if shape else 0
+    return stat
+
+
+def _merge_field_stats(stat, other):
+    if stat is None:
+        return other
+    if len(stat["shape"]) != len(other["shape"]):
+        stat["shape"] = [-1] * len(stat["shape"])
+    else:
+        stat["shape"] = [
+            d if d == o else -1 for d, o in zip(stat["shape"], other["shape"])
+        ]
+    stat["num_rows"] += other["num_rows"]
+    return stat
+
+
+def _write_recordio_records(filename, batches, feeder, feed_order, compressor,
+                            max_num_records):
+    """
+    Write the batches into a recordio file.
+
+    Returns:
+        tuple: the number of records and the statistics of each field.
+    """
+    fields = dict()
+    counter = 0
+    with create_recordio_writer(filename, compressor,
+                                max_num_records) as writer:
+        for batch in batches:
+            res = feeder.feed(batch)
+            for each in feed_order:
+                writer.append_tensor(res[each])
+                fields[each] = _merge_field_stat(fields.get(each), res[each])
+            writer.complete_append_tensor()
+            counter += 1
+    return counter, fields
+
+
+def _write_recordio_meta(filename, counter, fields, feed_order):
+    meta = {
+        "filename": os.path.basename(filename),
+        "num_records": counter,
+        "num_bytes": os.path.getsize(filename),
+        "feed_order": list(feed_order),
+        "fields": fields
+    }
+    with open(filename + RECORDIO_META_SUFFIX, "w") as f:
+        json.dump(meta, f, indent=2, sort_keys=True)
+    return meta
+
+
+def _write_recordio_shard(filename, batches, feeder, feed_order, compressor,
+                          max_num_records):
+    """
+    Write one shard and its sidecar meta file.
+
+    Returns:
+        dict: the shard statistics written into the sidecar.
+    """
+    counter, fields = _write_recordio_records(
+        filename, batches, feeder, feed_order, compressor, max_num_records)
+    return _write_recordio_meta(filename, counter, fields, feed_order)
+
+
+def load_recordio_shard_meta(filename):
+    """
+    Load the sidecar meta file written by
+    :code:`convert_reader_to_recordio_files` for a recordio shard.
+
+    Args:
+        filename(str): The recordio shard filename.
+
+    Returns:
+        dict: the record count, byte size and per field shapes of the shard.
+    """
+    with open(filename + RECORDIO_META_SUFFIX, "r") as f:
+        return json.load(f)
+
+
+# The arguments shared by every part written by a worker process, set by
+# the initializer of the pool.
+_worker_context = None
+
+
+def _init_recordio_worker(feeder, feed_order, compressor, max_num_records):
+    global _worker_context
+    _worker_context = dict(
+        feeder=feeder,
+        feed_order=feed_order,
+        compressor=compressor,
+        max_num_records=max_num_records)
+
+
+def _write_recordio_part_in_worker(filename, batches):
+    return _write_recordio_records(filename, batches, **_worker_context)
+
+
+def _iter_shards(reader_creator, batch_per_file, f_name, f_ext):
+    batches = []
+    f_idx = 0
+    for batch in reader_creator():
+        batches.append(batch)
+        if len(batches) == batch_per_file:
+            yield "%s-%05d%s" % (f_name, f_idx, f_ext), batches
+            batches = []
+            f_idx += 1
+    if batches:
+        yield "%s-%05d%s" % (f_name, f_idx, f_ext), batches
+
+
+def _iter_shard_parts(reader_creator, batch_per_file, part_size, f_name,
+                      f_ext):
+    """
+    Split the shards into parts of at most part_size batches.
+
+    Yields:
+        tuple: the shard filename, the index of the part in the shard,
+        the batches of the part and whether it is the last part of the shard.
+    """
+    batches = []
+    f_idx = 0
+    part_idx = 0
+    num_batches = 0
+    for batch in reader_creator():
+        batches.append(batch)
+        num_batches += 1
+        shard_done = num_batches == batch_per_file
+        if len(batches) == part_size or shard_done:
+            yield ("%s-%05d%s" % (f_name, f_idx, f_ext), part_idx, batches,
+                   shard_done)
+            batches = []
+            part_idx += 1
+        if shard_done:
+            f_idx += 1
+            part_idx = 0
+            num_batches = 0
+    if num_batches > 0:
+        yield "%s-%05d%s" % (f_name, f_idx, f_ext), part_idx, batches, True
+
+
 def convert_reader_to_recordio_files(
         filename,
         batch_per_file,
@@ -98,38 +264,101 @@ def convert_reader_to_recordio_files(
         feeder,
         compressor=core.RecordIOWriter.Compressor.Snappy,
         max_num_records=1000,
-        feed_order=None):
+        feed_order=None,
+        num_workers=1):
     """
     convert a python reader to many recordio files.
 
     This API is basically same as :code:`convert_reader_to_recordio_file`,
-    instead of it will create many recordio files. Each file contains at
-    most :code:`batch_per_file` records.
+    instead of it will create many recordio files. Each file contains
+    :code:`batch_per_file` records, except the last one which contains the
+    remaining records.
+
+    Each file gets a sidecar file named :code:`<file>.recordio.meta` with its
+    record count, byte size and field shapes. Use
+    :code:`load_recordio_shard_meta` to read it.
+
+    When :code:`num_workers` is larger than 1, the feeding and compression are
+    spread across a pool of worker processes. Each shard is split into parts
+    of :code:`max_num_records` batches, which are written by the workers and
+    then joined in order, so the shards are the same as the serial ones. The
+    reader still runs in the calling process, and at most
+    :code:`2 * num_workers` parts are buffered in memory at a time. The
+    feeder and the compressor are passed to the workers, so they must be
+    picklable when the start method of multiprocessing is not fork.
 
     Please reference
     :ref:`api_fluid_recordio_writer_convert_reader_to_recordio_file` for more
     details.
+
+    Args:
+        num_workers(int): The number of processes writing shards.
+
+    Returns:
+        int: the number of record that saved.
     """
     if feed_order is None:
         feed_order = feeder.feed_names
     f_name, f_ext = os.path.splitext(filename)
     assert (f_ext == ".recordio")
 
-    lines = []
-    f_idx = 0
+    shards = _iter_shards(reader_creator, batch_per_file, f_name, f_ext)
+    if num_workers <= 1:
+        counter = 0
+        for shard_name, batches in shards:
+            meta = _write_recordio_shard(shard_name, batches, feeder,
+                                         feed_order, compressor,
+                                         max_num_records)
+            counter += meta["num_records"]
+        return counter
+
+    pool = multiprocessing.Pool(
+        num_workers,
+        initializer=_init_recordio_worker,
+        initargs=(feeder, feed_order, compressor, max_num_records))
     counter = 0
-    for idx, batch in enumerate(reader_creator()):
-        lines.append(batch)
-        if idx >= batch_per_file and idx % batch_per_file == 0:
-            filename = "%s-%05d%s" % (f_name, f_idx, f_ext)
-            with create_recordio_writer(filename, compressor,
-                                        max_num_records) as writer:
-                for l in lines:
-                    res = feeder.feed(l)
-                    for each in feed_order:
-                        writer.append_tensor(res[each])
-                    writer.complete_append_tensor()
-                    counter += 1
-                lines = []
-                f_idx += 1
+    pending = collections.deque()
+    # the number of records and the field statistics of the shard being
+    # joined.
+    shard_stat = [0, dict()]
+
+    def join_oldest_part():
+        shard_name, part_name, part_idx, is_last, result = pending.popleft()
+        num_records, fields = result.get()
+        with open(shard_name, "ab" if part_idx > 0 else "wb") as f:
+            with open(part_name, "rb") as part:
+                shutil.copyfileobj(part, f)
+        os.remove(part_name)
+        shard_stat[0] += num_records
+        for name, stat in six.iteritems(fields):
+            shard_stat[1][name] = _merge_field_stats(shard_stat[1].get(name),
+                                                     stat)
+        if is_last:
+            _write_recordio_meta(shard_name, shard_stat[0], shard_stat[1],
+                                 feed_order)
+            shard_stat[:] = [0, dict()]
+        return num_records
+
+    try:
+        # A recordio file is a sequence of chunks, each with its own header,
+        # and a part holds whole chunks, so the parts can be concatenated.
+        for shard_name, part_idx, batches, is_last in _iter_shard_parts(
+                reader_creator, batch_per_file, max_num_records, f_name,
+                f_ext):
+            part_name = "%s.part-%05d" % (shard_name, part_idx)
+            result = pool.apply_async(_write_recordio_part_in_worker,
+                                      (part_name, batches))
+            pending.append((shard_name, part_name, part_idx, is_last, result))
+            # Bound the batches held in memory by waiting for the oldest part.
+            if len(pending) >= 2 * num_workers:
+                counter += join_oldest_part()
+        while pending:
+            counter += join_oldest_part()
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+        for _, part_name, _, _, _ in pending:
+            if os.path.exists(part_name):
+                os.remove(part_name)
     return counter
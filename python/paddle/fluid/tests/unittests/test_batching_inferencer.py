@@ -0,0 +1,137 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle.fluid as fluid
+from paddle.fluid.contrib import BatchingInferencer, Histogram
+
+
+def dense_infer_func():
+    x = fluid.layers.data(name='x', shape=[13], dtype='float32')
+    return fluid.layers.fc(input=x, size=3, act='relu')
+
+
+def lod_infer_func():
+    x = fluid.layers.data(name='x', shape=[4], dtype='float32', lod_level=1)
+    hidden = fluid.layers.fc(input=x, size=3)
+    return fluid.layers.sequence_pool(input=hidden, pool_type='sum')
+
+
+class TestBatchingInferencer(unittest.TestCase):
+    def setUp(self):
+        self.param_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.param_path)
+
+    def create_inferencer(self, infer_func):
+        main_program = fluid.Program()
+        startup_program = fluid.Program()
+        with fluid.program_guard(main_program, startup_program):
+            with fluid.unique_name.guard():
+                infer_func()
+        place = fluid.CPUPlace()
+        exe = fluid.Executor(place)
+        scope = fluid.core.Scope()
+        with fluid.scope_guard(scope):
+            exe.run(startup_program)
+            fluid.io.save_params(
+                exe, self.param_path, main_program=main_program)
+        return fluid.Inferencer(
+            infer_func=infer_func, param_path=self.param_path, place=place)
+
+    def test_dense(self):
+        inferencer = self.create_inferencer(dense_infer_func)
+        server = BatchingInferencer(
+            inferencer, max_batch_size=8, max_delay=0.01, num_workers=2)
+        inputs = [
+            np.random.random((i % 3 + 1, 13)).astype('float32')
+            for i in range(20)
+        ]
+        requests = [server.submit({'x': x}) for x in inputs]
+        for x, req in zip(inputs, requests):
+            expected = inferencer.infer({'x': x})[0]
+            result = req.get(timeout=10)
+            self.assertEqual(len(result), 1)
+            self.assertTrue(np.allclose(result[0], expected, atol=1e-5))
+        stats = server.stats()
+        server.close()
+        self.assertEqual(stats["latency"]["count"], len(inputs))
+        self.assertGreater(stats["batch_size"]["max"], 3)
+        self.assertLessEqual(stats["batch_size"]["max"], 8)
+
+    def test_bad_request(self):
+        inferencer = self.create_inferencer(dense_infer_func)
+        server = BatchingInferencer(
+            inferencer, max_batch_size=16, max_delay=0.1, num_workers=1)
+        inputs = [
+            np.random.random((2, 13)).astype('float32') for _ in range(3)
+        ]
+        requests = [server.submit({'x': x}) for x in inputs]
+        bad_request = server.submit(
+            {'x': np.random.random((2, 7)).astype('float32')})
+        # the bad request does not fail the others in its batch
+        with self.assertRaises(Exception):
+            bad_request.get(timeout=10)
+        for x, req in zip(inputs, requests):
+            expected = inferencer.infer({'x': x})[0]
+            result = req.get(timeout=10)
+            self.assertTrue(np.allclose(result[0], expected, atol=1e-5))
+        server.close()
+
+    def test_lod(self):
+        inferencer = self.create_inferencer(lod_infer_func)
+        server = BatchingInferencer(inferencer, max_batch_size=4)
+        place = fluid.CPUPlace()
+        inputs = []
+        for i in range(6):
+            seq_lens = [i + 1, 2]
+            data = np.random.random((sum(seq_lens), 4)).astype('float32')
+            inputs.append(fluid.create_lod_tensor(data, [seq_lens], place))
+        requests = [server.submit({'x': x}) for x in inputs]
+        for x, req in zip(inputs, requests):
+            expected = inferencer.infer({'x': x}, return_numpy=False)[0]
+            result = req.get(timeout=10)[0]
+            self.assertTrue(
+                np.allclose(
+                    np.array(result), np.array(expected), atol=1e-5))
+        server.close()
+        with self.assertRaises(RuntimeError):
+            server.infer({'x': inputs[0]})
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentile(self):
+        hist = Histogram(min_value=1, growth=2, num_buckets=8)
+        for value in range(1, 101):
+            hist.record(value)
+        self.assertEqual(hist.count, 100)
+        self.assertEqual(hist.percentile(50), 64)
+        self.assertEqual(hist.percentile(100), 100)
+        self.assertAlmostEqual(hist.mean(), 50.5)
+        summary = hist.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p50"], 64)
+        self.assertEqual(summary["max"], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
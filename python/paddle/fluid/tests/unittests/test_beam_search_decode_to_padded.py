@@ -0,0 +1,66 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import unittest
+
+import numpy as np
+import paddle.fluid as fluid
+from paddle.fluid.contrib.decoder.beam_search_decoder import \
+    beam_search_decode_to_padded
+
+
+class TestBeamSearchDecodeToPadded(unittest.TestCase):
+    def setUp(self):
+        place = fluid.CPUPlace()
+        # 2 source sentences, with 2 and 3 hypotheses.
+        seq_lens = [[2, 3], [3, 2, 4, 1, 2]]
+        ids = np.array(
+            [0, 5, 1, 0, 1, 0, 4, 6, 1, 0, 0, 7], dtype='int64').reshape(
+                [-1, 1])
+        scores = np.array(
+            [0, -1, -2, 0, -1.5, 0, -1, -2, -2.5, 0, 0, -3],
+            dtype='float32').reshape([-1, 1])
+        self.ids = fluid.create_lod_tensor(ids, seq_lens, place)
+        self.scores = fluid.create_lod_tensor(scores, seq_lens, place)
+
+    def test_padded(self):
+        ids, lengths, scores = beam_search_decode_to_padded(
+            self.ids, self.scores, pad_id=-1)
+        self.assertEqual(ids.shape, (2, 3, 4))
+        self.assertTrue(
+            np.array_equal(ids[0], [[0, 1, -1, -1], [0, 5, 1, -1],
+                                    [-1, -1, -1, -1]]))
+        self.assertTrue(
+            np.array_equal(ids[1], [[0, -1, -1, -1], [0, 4, 6, 1],
+                                    [0, 7, -1, -1]]))
+        self.assertTrue(np.array_equal(lengths, [[2, 3, 0], [1, 4, 2]]))
+        self.assertTrue(np.allclose(scores[:, :2], [[-1.5, -2], [0, -2.5]]))
+        self.assertEqual(scores[0, 2], -np.inf)
+
+    def test_length_penalty(self):
+        ids, lengths, scores = beam_search_decode_to_padded(
+            self.ids, self.scores, length_penalty=1.0, n_best=1)
+        self.assertEqual(ids.shape, (2, 1, 2))
+        self.assertTrue(np.array_equal(lengths, [[2], [1]]))
+        self.assertTrue(np.allclose(scores, [[-1.5 / (7. / 6.)], [0.]]))
+        ids, lengths, scores = beam_search_decode_to_padded(
+            self.ids, self.scores, length_penalty=4.0, n_best=2)
+        # the longer hypothesis of the first source ranks first.
+        self.assertTrue(np.array_equal(lengths[0], [3, 2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
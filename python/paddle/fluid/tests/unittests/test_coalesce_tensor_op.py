@@ -0,0 +1,81 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import unittest
+import numpy as np
+from op_test import OpTest
+import paddle.fluid.core as core
+from paddle.fluid.op import Operator
+
+
+class TestCoalesceTensorOp(OpTest):
+    def setUp(self):
+        self.op_type = "coalesce_tensor"
+        x = [
+            np.random.random(shape).astype('float32')
+            for shape in [(3, 4), (5, ), (2, 3, 2)]
+        ]
+        self.inputs = {"Input": [("x%d" % i, x[i]) for i in range(len(x))]}
+        self.outputs = {
+            "Output": [("out%d" % i, x[i]) for i in range(len(x))],
+            "FusedOutput": np.concatenate([t.flatten() for t in x])
+        }
+        self.attrs = {"copy_data": True}
+
+    def test_check_output(self):
+        self.check_output()
+
+
+class TestCoalesceTensorView(unittest.TestCase):
+    def check_with_place(self, place):
+        scope = core.Scope()
+        x = [
+            np.random.random(shape).astype('float32')
+            for shape in [(3, 4), (5, )]
+        ]
+        names = ["x0", "x1"]
+        for name, data in zip(names, x):
+            scope.var(name).get_tensor().set(data, place)
+        scope.var("fused")
+        op = Operator(
+            "coalesce_tensor",
+            Input=names,
+            Output=names,
+            FusedOutput="fused",
+            copy_data=True)
+        op.run(scope, place)
+        fused = np.array(scope.find_var("fused").get_tensor())
+        self.assertTrue(
+            np.array_equal(fused, np.concatenate([t.flatten() for t in x])))
+
+        # the inputs are views of the fused tensor now.
+        fused_data = np.zeros_like(fused)
+        scope.find_var("fused").get_tensor().set(fused_data, place)
+        for name, data in zip(names, x):
+            result = np.array(scope.find_var(name).get_tensor())
+            self.assertEqual(result.shape, data.shape)
+            self.assertTrue(np.array_equal(result, np.zeros_like(data)))
+
+    def test_view(self):
+        places = [core.CPUPlace()]
+        if core.is_compiled_with_cuda():
+            places.append(core.CUDAPlace(0))
+        for place in places:
+            self.check_with_place(place)
+
+
+if __name__ == '__main__':
+    unittest.main()
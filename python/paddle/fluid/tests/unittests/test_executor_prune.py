@@ -0,0 +1,113 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import gc
+import unittest
+
+import numpy as np
+
+import paddle.fluid as fluid
+import paddle.fluid.core as core
+from paddle.fluid.executor import _prune_program
+
+
+class TestExecutorPrune(unittest.TestCase):
+    def setUp(self):
+        self.main_program = fluid.Program()
+        self.startup_program = fluid.Program()
+        with fluid.program_guard(self.main_program, self.startup_program):
+            x = fluid.layers.data(name='x', shape=[13], dtype='float32')
+            y = fluid.layers.data(name='y', shape=[1], dtype='float32')
+            self.hidden = fluid.layers.fc(
+                input=x,
+                size=8,
+                param_attr=fluid.ParamAttr(name='w'),
+                bias_attr=False)
+            y_predict = fluid.layers.fc(input=self.hidden, size=1)
+            cost = fluid.layers.square_error_cost(input=y_predict, label=y)
+            self.avg_cost = fluid.layers.mean(cost)
+            fluid.optimizer.SGD(learning_rate=0.1).minimize(self.avg_cost)
+        self.feed = {
+            'x': np.random.random((4, 13)).astype('float32'),
+            'y': np.random.random((4, 1)).astype('float32')
+        }
+
+    def test_prune_program(self):
+        pruned = _prune_program(self.main_program, {'x': None},
+                                [self.hidden])
+        op_types = [op.type for op in pruned.global_block().ops]
+        self.assertEqual(op_types, ['mul'])
+
+        pruned = _prune_program(self.main_program, self.feed,
+                                [self.avg_cost])
+        for op in pruned.global_block().ops:
+            self.assertNotIn('grad', op.type)
+            self.assertNotEqual(op.type, 'sgd')
+
+    def test_keep_side_effect_ops(self):
+        with fluid.program_guard(self.main_program, self.startup_program):
+            fluid.layers.Print(self.hidden)
+        pruned = _prune_program(self.main_program, {'x': None},
+                                [self.hidden])
+        op_types = [op.type for op in pruned.global_block().ops]
+        self.assertEqual(op_types, ['mul', 'print'])
+
+    def test_run(self):
+        scope = core.Scope()
+        exe = fluid.Executor(fluid.CPUPlace())
+        with fluid.scope_guard(scope):
+            exe.run(self.startup_program)
+            w = np.array(scope.find_var('w').get_tensor())
+            for _ in range(2):
+                hidden, = exe.run(self.main_program,
+                                  feed={'x': self.feed['x']},
+                                  fetch_list=[self.hidden],
+                                  use_prune=True)
+            self.assertEqual(len(exe._pruned_program_caches), 1)
+            # the optimizer is not run.
+            self.assertTrue(
+                np.array_equal(w, np.array(scope.find_var('w').get_tensor())))
+            self.assertTrue(
+                np.allclose(hidden, np.dot(self.feed['x'], w), atol=1e-5))
+
+            pruned_loss, = exe.run(self.main_program,
+                                   feed=self.feed,
+                                   fetch_list=[self.avg_cost],
+                                   use_prune=True)
+            loss, = exe.run(self.main_program,
+                            feed=self.feed,
+                            fetch_list=[self.avg_cost])
+            self.assertTrue(np.allclose(pruned_loss, loss))
+            self.assertFalse(
+                np.array_equal(w, np.array(scope.find_var('w').get_tensor())))
+
+    def test_cache_dropped_with_program(self):
+        scope = core.Scope()
+        exe = fluid.Executor(fluid.CPUPlace())
+        with fluid.scope_guard(scope):
+            exe.run(self.startup_program)
+            exe.run(self.main_program,
+                    feed={'x': self.feed['x']},
+                    fetch_list=[self.hidden.name],
+                    use_prune=True)
+        self.assertEqual(len(exe._pruned_program_caches), 1)
+        del self.main_program, self.hidden, self.avg_cost
+        gc.collect()
+        self.assertEqual(len(exe._pruned_program_caches), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle.fluid as fluid
+
+
+def build_program(create_optimizer, fused_update):
+    main_program = fluid.Program()
+    startup_program = fluid.Program()
+    main_program.random_seed = 1
+    startup_program.random_seed = 1
+    with fluid.program_guard(main_program, startup_program):
+        with fluid.unique_name.guard():
+            x = fluid.layers.data(name='x', shape=[8], dtype='float32')
+            y = fluid.layers.data(name='y', shape=[1], dtype='float32')
+            hidden = x
+            for _ in range(3):
+                hidden = fluid.layers.fc(input=hidden, size=16)
+                hidden = fluid.layers.batch_norm(input=hidden, act='relu')
+            ids = fluid.layers.data(name='ids', shape=[1], dtype='int64')
+            emb = fluid.layers.embedding(
+                input=ids, size=[8, 4], is_sparse=True)
+            predict = fluid.layers.fc(input=[hidden, emb], size=1)
+            loss = fluid.layers.mean(
+                fluid.layers.square_error_cost(
+                    input=predict, label=y))
+            create_optimizer(fused_update).minimize(loss)
+    return main_program, startup_program, loss
+
+
+class TestFusedUpdate(unittest.TestCase):
+    def train(self, create_optimizer, fused_update, steps=5):
+        main_program, startup_program, loss = build_program(create_optimizer,
+                                                            fused_update)
+        exe = fluid.Executor(fluid.CPUPlace())
+        scope = fluid.core.Scope()
+        np.random.seed(1)
+        losses = []
+        with fluid.scope_guard(scope):
+            exe.run(startup_program)
+            for _ in range(steps):
+                feed = {
+                    'x': np.random.random((4, 8)).astype('float32'),
+                    'y': np.random.random((4, 1)).astype('float32'),
+                    'ids': np.random.randint(
+                        0, 8, size=(4, 1)).astype('int64')
+                }
+                losses.append(
+                    exe.run(main_program, feed=feed, fetch_list=[loss])[0])
+        return main_program, scope, losses
+
+    def check_fused(self, create_optimizer, op_type):
+        program, scope, losses = self.train(create_optimizer, False)
+        fused_program, fused_scope, fused_losses = self.train(
+            create_optimizer, True)
+        self.assertTrue(np.allclose(losses, fused_losses, atol=1e-5))
+        params = program.global_block().all_parameters()
+        for param in params:
+            expected = np.array(scope.find_var(param.name).get_tensor())
+            actual = np.array(fused_scope.find_var(param.name).get_tensor())
+            self.assertTrue(np.allclose(expected, actual, atol=1e-5))
+
+        def num_ops(program):
+            return len([
+                op for op in program.global_block().ops if op.type == op_type
+            ])
+
+        self.assertEqual(
+            num_ops(program), len([p for p in params if p.trainable]))
+        # the sparse embedding is updated on its own.
+        self.assertEqual(num_ops(fused_program), 2)
+        return fused_program, fused_scope
+
+    def test_sgd(self):
+        self.check_fused(
+            lambda fused: fluid.optimizer.SGD(learning_rate=0.1,
+                                              fused_update=fused),
+            "sgd")
+
+    def test_momentum(self):
+        self.check_fused(lambda fused: fluid.optimizer.Momentum(
+            learning_rate=0.1, momentum=0.9, fused_update=fused), "momentum")
+
+    def test_adam(self):
+        self.check_fused(
+            lambda fused: fluid.optimizer.Adam(learning_rate=0.01,
+                                               fused_update=fused),
+            "adam")
+
+    def test_one_step(self):
+        create_optimizer = lambda fused: fluid.optimizer.Momentum(
+            learning_rate=0.1, momentum=0.9, fused_update=fused)
+        program, scope, losses = self.train(create_optimizer, False, steps=1)
+        fused_program, fused_scope, fused_losses = self.train(
+            create_optimizer, True, steps=1)
+        self.assertTrue(np.allclose(losses, fused_losses, atol=1e-5))
+        fused_vars = [
+            var for var in fused_program.list_vars()
+            if var.name.endswith(fluid.framework.FUSED_VAR_SUFFIX) and
+            var.persistable
+        ]
+        self.assertEqual(len(fused_vars), 2)
+        for var in fused_vars:
+            # the buffers filled by the startup program are kept in the scope.
+            value = np.array(fused_scope.find_var(var.name).get_tensor())
+            self.assertEqual(value.size, var.shape[0])
+        for param in program.global_block().all_parameters():
+            expected = np.array(scope.find_var(param.name).get_tensor())
+            actual = np.array(fused_scope.find_var(param.name).get_tensor())
+            self.assertTrue(np.allclose(expected, actual, atol=1e-5))
+
+    def test_adam_beta_pow(self):
+        fused_program, _ = self.check_fused(
+            lambda fused: fluid.optimizer.Adam(learning_rate=0.01,
+                                               fused_update=fused),
+            "adam")
+        beta_pows = [
+            var.name for var in fused_program.list_vars()
+            if 'beta1_pow_acc' in var.name
+        ]
+        # one for the fused group and one for the sparse embedding.
+        self.assertEqual(len(beta_pows), 2)
+
+    def test_save_load(self):
+        program, scope = self.check_fused(
+            lambda fused: fluid.optimizer.Momentum(
+                learning_rate=0.1, momentum=0.9, fused_update=fused),
+            "momentum")
+        exe = fluid.Executor(fluid.CPUPlace())
+        dirname = tempfile.mkdtemp()
+        try:
+            with fluid.scope_guard(scope):
+                fluid.io.save_persistables(exe, dirname, program)
+            self.assertFalse(
+                any(
+                    fluid.io.is_persistable(var) and
+                    var.name.endswith(fluid.framework.FUSED_VAR_SUFFIX)
+                    for var in program.list_vars()))
+            # load into a fused program, the parameters stay views of the
+            # buffers and keep being updated.
+            main_program, startup_program, loss = build_program(
+                lambda fused: fluid.optimizer.Momentum(
+                    learning_rate=0.1, momentum=0.9, fused_update=fused),
+                True)
+            new_scope = fluid.core.Scope()
+            with fluid.scope_guard(new_scope):
+                exe.run(startup_program)
+                fluid.io.load_persistables(exe, dirname, main_program)
+                for param in main_program.global_block().all_parameters():
+                    expected = np.array(scope.find_var(param.name).get_tensor())
+                    actual = np.array(
+                        new_scope.find_var(param.name).get_tensor())
+                    self.assertTrue(np.array_equal(expected, actual))
+                feed = {
+                    'x': np.random.random((4, 8)).astype('float32'),
+                    'y': np.random.random((4, 1)).astype('float32'),
+                    'ids': np.random.randint(
+                        0, 8, size=(4, 1)).astype('int64')
+                }
+                exe.run(main_program, feed=feed)
+                param = main_program.global_block().all_parameters()[0]
+                self.assertFalse(
+                    np.array_equal(
+                        np.array(scope.find_var(param.name).get_tensor()),
+                        np.array(new_scope.find_var(param.name).get_tensor(
+                        ))))
+        finally:
+            shutil.rmtree(dirname)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import unittest
+
+import numpy as np
+
+import paddle.fluid as fluid
+import paddle.fluid.core as core
+from paddle.fluid.transpiler import register_inference_pass
+
+
+class TestInferenceTranspilerPasses(unittest.TestCase):
+    def build_program(self):
+        main_program = fluid.Program()
+        startup_program = fluid.Program()
+        with fluid.program_guard(main_program, startup_program):
+            x = fluid.layers.data(name='x', shape=[4, 6], dtype='float32')
+            x = fluid.layers.transpose(x, perm=[0, 2, 1])
+            x = fluid.layers.transpose(x, perm=[0, 2, 1])
+            x = fluid.layers.reshape(x, shape=[-1, 6, 4])
+            x = fluid.layers.reshape(x, shape=[-1, 24])
+            hidden = fluid.layers.fc(input=x, size=16, act='relu')
+            hidden = fluid.layers.dropout(hidden, dropout_prob=0.5)
+            hidden = fluid.layers.scale(hidden, scale=2.0)
+            w = fluid.layers.create_parameter(
+                shape=[16], dtype='float32', name='offset')
+            offset = fluid.layers.scale(w, scale=0.5)
+            hidden = fluid.layers.elementwise_add(hidden, offset)
+            out = fluid.layers.relu(hidden)
+        return main_program.clone(for_test=True), startup_program, out
+
+    def run_program(self, program, out, place, data):
+        exe = fluid.Executor(place)
+        return exe.run(program, feed={'x': data}, fetch_list=[out])[0]
+
+    def check_transpile(self, place):
+        program, startup_program, out = self.build_program()
+        data = np.random.random((3, 4, 6)).astype('float32')
+        scope = core.Scope()
+        with fluid.scope_guard(scope):
+            fluid.Executor(place).run(startup_program)
+            expected = self.run_program(program, out, place, data)
+
+            num_ops = len(program.global_block().ops)
+            t = fluid.InferenceTranspiler()
+            num_removed = t.transpile(program, place, scope)
+            self.assertEqual(num_removed,
+                             num_ops - len(program.global_block().ops))
+            self.assertEqual(num_removed, sum(t.fuse_stats.values()))
+
+            op_types = [op.type for op in program.global_block().ops]
+            self.assertEqual(op_types.count('transpose2'), 1)
+            self.assertEqual(op_types.count('reshape2'), 1)
+            self.assertNotIn('dropout', op_types)
+            self.assertEqual(op_types.count('scale'), 1)
+            self.assertGreater(t.fuse_stats['constant_folding'], 0)
+            self.assertIn('fused_elemwise_activation', op_types)
+            if isinstance(place, core.CPUPlace):
+                self.assertIn('fc', op_types)
+
+            actual = self.run_program(program, out, place, data)
+        self.assertTrue(np.allclose(expected, actual, atol=1e-5))
+
+    def test_cpu(self):
+        self.check_transpile(fluid.CPUPlace())
+
+    def test_cuda(self):
+        if core.is_compiled_with_cuda():
+            self.check_transpile(fluid.CUDAPlace(0))
+
+    def test_duplicated_pass(self):
+        with self.assertRaises(ValueError):
+            register_inference_pass("conv_bn_fuse")(lambda *args: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import paddle.fluid as fluid
+from paddle.fluid.framework import Parameter
+
+build_count = [0]
+
+
+def build_network(hidden_size):
+    build_count[0] += 1
+    main, startup = fluid.Program(), fluid.Program()
+    with fluid.program_guard(main, startup):
+        x = fluid.layers.data(name='x', shape=[13], dtype='float32')
+        y = fluid.layers.data(name='y', shape=[1], dtype='float32')
+        hidden = fluid.layers.fc(
+            input=x,
+            size=hidden_size,
+            param_attr=fluid.ParamAttr(
+                name='fc_w',
+                regularizer=fluid.regularizer.L2Decay(0.01),
+                learning_rate=0.5))
+        y_predict = fluid.layers.fc(input=hidden, size=1)
+        cost = fluid.layers.square_error_cost(input=y_predict, label=y)
+        avg_cost = fluid.layers.mean(cost)
+        fluid.optimizer.SGD(learning_rate=0.01).minimize(avg_cost)
+    return main, startup, [avg_cost]
+
+
+class TestProgramCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def get_or_build(self, cache, *args):
+        # The names of the built variables depend on the unique_name
+        # counters, so they are reset as in a new process.
+        with fluid.unique_name.guard():
+            return cache.get_or_build(*args)
+
+    def test_hit_and_miss(self):
+        cache = fluid.contrib.ProgramCache(self.cache_dir)
+        build_count[0] = 0
+        main, startup, (avg_cost, ) = self.get_or_build(cache, build_network,
+                                                        10)
+        self.assertFalse(cache.last_hit)
+
+        cached_main, cached_startup, (cached_cost, ) = self.get_or_build(
+            cache, build_network, 10)
+        self.assertTrue(cache.last_hit)
+        self.assertEqual(build_count[0], 1)
+        self.assertEqual(cached_cost.name, avg_cost.name)
+        self.assertEqual(cached_main.desc.serialize_to_string(),
+                         main.desc.serialize_to_string())
+        self.assertEqual(cached_startup.desc.serialize_to_string(),
+                         startup.desc.serialize_to_string())
+
+        param = cached_main.global_block().var('fc_w')
+        self.assertTrue(isinstance(param, Parameter))
+        self.assertEqual(param.optimize_attr['learning_rate'], 0.5)
+        self.assertAlmostEqual(param.regularizer._regularization_coeff, 0.01)
+        self.assertTrue(cached_main.global_block().var('x').is_data)
+
+        # other arguments miss the cache
+        self.get_or_build(cache, build_network, 20)
+        self.assertFalse(cache.last_hit)
+        self.assertEqual(build_count[0], 2)
+
+    def test_unique_names(self):
+        cache = fluid.contrib.ProgramCache(self.cache_dir)
+        build_count[0] = 0
+        with fluid.unique_name.guard():
+            cache.get_or_build(build_network, 10)
+            built_next = fluid.unique_name.generate('fc')
+            # the programs built after others have other names, so they miss
+            main, _, _ = cache.get_or_build(build_network, 10)
+            self.assertFalse(cache.last_hit)
+        self.assertEqual(build_count[0], 2)
+
+        with fluid.unique_name.guard():
+            cached_main, _, _ = cache.get_or_build(build_network, 10)
+            self.assertTrue(cache.last_hit)
+            # the layers built after a hit do not reuse the cached names
+            self.assertEqual(fluid.unique_name.generate('fc'), built_next)
+            cached_main, _, _ = cache.get_or_build(build_network, 10)
+            self.assertTrue(cache.last_hit)
+            self.assertEqual(
+                sorted(cached_main.global_block().vars.keys()),
+                sorted(main.global_block().vars.keys()))
+        self.assertEqual(build_count[0], 2)
+
+    def test_key(self):
+        cache = fluid.contrib.ProgramCache(self.cache_dir)
+
+        class Config(object):
+            hidden_size = 10
+
+        # the repr of an object contains its address, so it is refused
+        self.assertRaises(TypeError, cache.get_or_build, build_network,
+                          Config())
+
+        build_count[0] = 0
+        for _ in range(2):
+            with fluid.unique_name.guard():
+                cache.get_or_build_with_key("hidden_10", build_network,
+                                            Config.hidden_size)
+        self.assertTrue(cache.last_hit)
+        self.assertEqual(build_count[0], 1)
+
+    def test_corrupted_cache(self):
+        cache = fluid.contrib.ProgramCache(self.cache_dir)
+        build_count[0] = 0
+        self.get_or_build(cache, build_network, 10)
+        with fluid.unique_name.guard():
+            path = cache._cache_path(cache.cache_key(build_network, 10))
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:len(data) // 2])
+
+        self.get_or_build(cache, build_network, 10)
+        self.assertFalse(cache.last_hit)
+        self.assertEqual(build_count[0], 2)
+        self.assertEqual(os.path.getsize(path), len(data))
+        self.get_or_build(cache, build_network, 10)
+        self.assertTrue(cache.last_hit)
+
+
+if __name__ == '__main__':
+    unittest.main()
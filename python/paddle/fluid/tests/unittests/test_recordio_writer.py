@@ -0,0 +1,106 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import paddle
+import paddle.fluid as fluid
+
+
+def fake_reader():
+    for i in range(25):
+        yield np.random.random(size=[784]).astype('float32'), i % 10
+
+
+class TestConvertReaderToRecordIOFiles(unittest.TestCase):
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def convert(self, num_workers, max_num_records=1000):
+        with fluid.program_guard(fluid.Program(), fluid.Program()):
+            reader = paddle.batch(fake_reader, batch_size=2)
+            feeder = fluid.DataFeeder(
+                feed_list=[
+                    fluid.layers.data(
+                        name='image', shape=[784]),
+                    fluid.layers.data(
+                        name='label', shape=[1], dtype='int64'),
+                ],
+                place=fluid.CPUPlace())
+            filename = os.path.join(self.dirname,
+                                    'fake_%d.recordio' % num_workers)
+            return fluid.recordio_writer.convert_reader_to_recordio_files(
+                filename,
+                5,
+                reader,
+                feeder,
+                max_num_records=max_num_records,
+                num_workers=num_workers)
+
+    def check_shards(self, num_workers):
+        counter = self.convert(num_workers)
+        # 25 samples in batches of 2 give 13 records, sharded as 5, 5, 3.
+        self.assertEqual(counter, 13)
+        shards = sorted(
+            glob.glob(
+                os.path.join(self.dirname, 'fake_%d-*.recordio' %
+                             num_workers)))
+        self.assertEqual(len(shards), 3)
+        metas = [
+            fluid.recordio_writer.load_recordio_shard_meta(s) for s in shards
+        ]
+        self.assertEqual([m['num_records'] for m in metas], [5, 5, 3])
+        for shard, meta in zip(shards, metas):
+            self.assertEqual(meta['num_bytes'], os.path.getsize(shard))
+            self.assertEqual(meta['fields']['image']['shape'], [784])
+            self.assertEqual(meta['fields']['label']['shape'], [1])
+        self.assertEqual(
+            sum(m['fields']['image']['num_rows'] for m in metas), 25)
+
+    def test_serial(self):
+        self.check_shards(1)
+
+    def test_parallel(self):
+        self.check_shards(3)
+
+    def test_parallel_parts(self):
+        # the shards are written in parts of 2 records by the workers, and
+        # joined into the same files as the serial ones.
+        np.random.seed(1)
+        self.assertEqual(self.convert(1, max_num_records=2), 13)
+        np.random.seed(1)
+        self.assertEqual(self.convert(3, max_num_records=2), 13)
+        for serial in glob.glob(os.path.join(self.dirname, 'fake_1-*')):
+            parallel = serial.replace('fake_1-', 'fake_3-')
+            with open(serial, 'rb') as f1, open(parallel, 'rb') as f2:
+                content = f2.read()
+                if serial.endswith('.meta'):
+                    content = content.replace(b'fake_3-', b'fake_1-')
+                self.assertEqual(f1.read(), content)
+        self.assertEqual(
+            len(glob.glob(os.path.join(self.dirname, '*.part-*'))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
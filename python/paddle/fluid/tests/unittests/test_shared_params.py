@@ -0,0 +1,156 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle.fluid as fluid
+from paddle.fluid.contrib import save_shared_params, SharedParamScope, \
+    convert_to_combined_params, load_combined_params, \
+    read_combined_params_header
+
+
+def infer_func():
+    x = fluid.layers.data(name='x', shape=[13], dtype='float32')
+    hidden = fluid.layers.fc(input=x, size=8, act='relu')
+    return fluid.layers.fc(input=hidden, size=2)
+
+
+class TestSharedParamScope(unittest.TestCase):
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.param_path = os.path.join(self.dirname, "params")
+        self.shared_path = os.path.join(self.dirname, "shared")
+
+        self.program = fluid.Program()
+        startup_program = fluid.Program()
+        with fluid.program_guard(self.program, startup_program):
+            with fluid.unique_name.guard():
+                infer_func()
+        exe = fluid.Executor(fluid.CPUPlace())
+        self.scope = fluid.core.Scope()
+        with fluid.scope_guard(self.scope):
+            exe.run(startup_program)
+            fluid.io.save_params(
+                exe, self.param_path, main_program=self.program)
+        save_shared_params(self.shared_path, self.program, self.scope)
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def test_load(self):
+        shared = SharedParamScope(self.shared_path)
+        params = self.program.global_block().all_parameters()
+        self.assertEqual(shared.var_names, sorted(p.name for p in params))
+        for p in params:
+            expected = np.array(self.scope.find_var(p.name).get_tensor())
+            actual = np.array(shared.find_var(p.name).get_tensor())
+            self.assertTrue(np.array_equal(expected, actual))
+            # the child scopes see the parameters of the root.
+            child_var = shared.new_scope().find_var(p.name)
+            self.assertTrue(
+                np.array_equal(expected, np.array(child_var.get_tensor())))
+
+        subset = SharedParamScope(self.shared_path, [params[0].name])
+        self.assertEqual(subset.var_names, [params[0].name])
+        self.assertIsNone(subset.find_var(params[1].name))
+        with self.assertRaises(ValueError):
+            SharedParamScope(self.shared_path, ["not_saved"])
+
+    def test_inferencer(self):
+        place = fluid.CPUPlace()
+        inferencer = fluid.Inferencer(
+            infer_func=infer_func, param_path=self.param_path, place=place)
+        shared = SharedParamScope(self.shared_path)
+        shared_inferencers = [
+            fluid.Inferencer(
+                infer_func=infer_func,
+                param_path=None,
+                place=place,
+                param_scope=shared) for _ in range(2)
+        ]
+        x = np.random.random((4, 13)).astype('float32')
+        expected = inferencer.infer({'x': x})[0]
+        for shared_inferencer in shared_inferencers:
+            result = shared_inferencer.infer({'x': x})[0]
+            self.assertTrue(np.allclose(expected, result, atol=1e-5))
+
+
+class TestCombinedParams(unittest.TestCase):
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.program = fluid.Program()
+        startup_program = fluid.Program()
+        with fluid.program_guard(self.program, startup_program):
+            with fluid.unique_name.guard():
+                infer_func()
+        self.exe = fluid.Executor(fluid.CPUPlace())
+        self.scope = fluid.core.Scope()
+        with fluid.scope_guard(self.scope):
+            self.exe.run(startup_program)
+        self.names = [
+            p.name for p in self.program.global_block().all_parameters()
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def check_loaded(self, filename, names):
+        scope = fluid.core.Scope()
+        self.assertEqual(
+            load_combined_params(
+                filename, scope=scope, var_names=names), names)
+        for name in self.names:
+            var = scope.find_var(name)
+            if name not in names:
+                self.assertIsNone(var)
+                continue
+            expected = np.array(self.scope.find_var(name).get_tensor())
+            self.assertTrue(
+                np.array_equal(expected, np.array(var.get_tensor())))
+
+    def test_convert(self):
+        for save_filename in [None, "__params__"]:
+            param_path = os.path.join(self.dirname, "params")
+            with fluid.scope_guard(self.scope):
+                fluid.io.save_params(
+                    self.exe,
+                    param_path,
+                    main_program=self.program,
+                    filename=save_filename)
+            output = os.path.join(self.dirname, "model.params")
+            convert_to_combined_params(
+                param_path,
+                output,
+                main_program=self.program,
+                filename=save_filename)
+            data_start, entries = read_combined_params_header(output)
+            self.assertEqual(data_start % 64, 0)
+            self.assertEqual(
+                sorted(entry["name"] for entry in entries), sorted(self.names))
+            for entry in entries:
+                self.assertEqual(entry["offset"] % 64, 0)
+            self.check_loaded(output, self.names)
+            self.check_loaded(output, self.names[1:2])
+            shutil.rmtree(param_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
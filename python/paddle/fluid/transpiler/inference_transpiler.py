@@ -15,20 +15,90 @@
 from __future__ import print_function
 
 import os
+import collections
 import numpy as np
+import six
 from .. import core
+from .. import unique_name
 from ..framework import Program
-from ..executor import global_scope
+from ..executor import Executor, global_scope
+
+__all__ = ['InferenceTranspiler', 'register_inference_pass']
+
+
+class _InferencePass(object):
+    def __init__(self, name, func, use_mkldnn, cpu_only):
+        self.name = name
+        self.func = func
+        self.use_mkldnn = use_mkldnn
+        self.cpu_only = cpu_only
+
+    def enabled(self, use_mkldnn, place):
+        if self.use_mkldnn is not None and self.use_mkldnn != use_mkldnn:
+            return False
+        if self.cpu_only and not isinstance(place, core.CPUPlace):
+            return False
+        return True
+
+
+# pass name --> _InferencePass, run in the registered order.
+_inference_passes = collections.OrderedDict()
+
+
+def register_inference_pass(name, use_mkldnn=None, cpu_only=False):
+    '''
+    Register a pass of InferenceTranspiler. Passes run in the order they are
+    registered.
+
+    The pass is a function :code:`func(transpiler, program, place, scope)`
+    which rewrites :code:`program` in place. It can use
+    :code:`transpiler._find_chain` to match a chain of operators and
+    :code:`transpiler._replace_chain` to replace it with a fused operator.
+
+    Examples:
+
+    .. code-block:: python
+
+        @register_inference_pass("remove_assign")
+        def remove_assign(transpiler, program, place, scope):
+            ...
+
+    Args:
+        name (str): the unique name of the pass.
+        use_mkldnn (bool|None): run the pass only when FLAGS_use_mkldnn is
+            set (True) or not set (False). None runs it in both cases.
+        cpu_only (bool): run the pass only for CPUPlace, for the fused
+            operators which have no CUDA kernel.
+    '''
+
+    def decorator(func):
+        if name in _inference_passes:
+            raise ValueError("inference pass %s is already registered" % name)
+        _inference_passes[name] = _InferencePass(name, func, use_mkldnn,
+                                                 cpu_only)
+        return func
+
+    return decorator
 
 
 class InferenceTranspiler(object):
     '''
     Convert the fluid program to optimized inference program.
 
-    There are several optimizations:
+    The program is rewritten by the passes registered by
+    :code:`register_inference_pass`. There are several optimizations:
 
+      - fold the operators that only depend on parameters into parameters
       - fuse convolution and batch normalization
       - fuse batch normalization and relu (MKLDNN only)
+      - fuse convolution and elementwise_add (MKLDNN only)
+      - replace dropout by scale, and merge consecutive scale operators
+      - merge consecutive reshape and transpose operators
+      - fuse mul and elementwise_add into fc (CPU only)
+      - fuse elementwise_add and relu/scale into fused_elemwise_activation
+
+    After :code:`transpile`, :code:`fuse_stats` maps the name of each pass
+    to the number of operators it removed.
 
     Examples:
 
@@ -49,6 +119,9 @@ class InferenceTranspiler(object):
             program (Program): program to transpile
             place (Place): inference place
             scope (Scope|None): inference Scope
+
+        Returns:
+            int: the number of operators removed.
         '''
         if not isinstance(program, Program):
             raise TypeError("program should be as Program type")
@@ -60,11 +133,17 @@ class InferenceTranspiler(object):
         if not isinstance(scope, core.Scope):
             raise TypeError("scope should be as Scope type or None")
         use_mkldnn = bool(os.getenv("FLAGS_use_mkldnn", False))
-        if use_mkldnn:
-            self._fuse_relu_mkldnn(program)
-            self._fuse_conv_bias_mkldnn(program)
-        else:
-            self._fuse_batch_norm(program, place, scope)
+        self.fuse_stats = collections.OrderedDict()
+        for name, inference_pass in six.iteritems(_inference_passes):
+            if not inference_pass.enabled(use_mkldnn, place):
+                continue
+            num_ops = len(program.block(0).ops)
+            inference_pass.func(self, program, place, scope)
+            self.fuse_stats[name] = num_ops - len(program.block(0).ops)
+
+        self.block = program.block(0)
+        self._remove_unused_var()
+        return sum(self.fuse_stats.values())
 
     def _fuse_relu_mkldnn(self, program):
         '''
@@ -385,6 +464,74 @@ class InferenceTranspiler(object):
                     current_op.rename_input(input_arg,
                                             self.input_map[input_arg])
 
+    def _consumers(self):
+        '''
+        Get the map from variable name to the operators which take it as
+        input, and the map from variable name to the number of operators
+        which write it.
+        '''
+        consumers = collections.defaultdict(list)
+        writers = collections.defaultdict(int)
+        for op in self.block.ops:
+            for name in set(op.input_arg_names):
+                consumers[name].append(op)
+            for name in set(op.output_arg_names):
+                writers[name] += 1
+        return consumers, writers
+
+    def _find_chain(self, types, condition=None):
+        '''
+        Find the first chain of operators of the given types, where the
+        input X of each operator is the output Out of the previous one, and
+        the output is consumed only by the next operator of the chain.
+
+        :param types: the types of the operators in the chain, each item is
+            a type or a list of types.
+        :type types: list
+        :param condition: extra check on the matched chain.
+        :type condition: callable
+        :return: the matched operators, or None if there is no match.
+        :rtype: list|None
+        '''
+        types = [[t] if isinstance(t, str) else t for t in types]
+        consumers, writers = self._consumers()
+        for op in self.block.ops:
+            if op.type not in types[0]:
+                continue
+            chain = [op]
+            for next_types in types[1:]:
+                out_name = chain[-1].output("Out")[0]
+                out_var = self.block.vars.get(out_name, None)
+                ops = consumers[out_name]
+                if out_var is None or out_var.persistable or \
+                        writers[out_name] != 1 or len(ops) != 1:
+                    break
+                next_op = ops[0]
+                if next_op.type not in next_types or \
+                        next_op.input("X") != [out_name]:
+                    break
+                chain.append(next_op)
+            if len(chain) == len(types) and (condition is None or
+                                             condition(chain)):
+                return chain
+        return None
+
+    def _replace_chain(self, chain, type, inputs, outputs, attrs):
+        '''
+        Replace the operators in chain by a new operator, which is inserted
+        at the position of the last operator of the chain.
+
+        :return: the new operator
+        :rtype: Operator
+        '''
+        index = chain[-1].idx
+        self.block._insert_op(
+            index, type=type, inputs=inputs, outputs=outputs, attrs=attrs)
+        new_op = self.block.ops[index]
+        for op in chain:
+            self.block._remove_op(op.idx)
+        return new_op
+
     def _remove_unused_var(self):
         '''
         remove unused varibles in program
@@ -399,3 +546,272 @@ class InferenceTranspiler(object):
         for var in list(self.block.vars.keys()):
             if var not in args:
                 self.block._remove_var(var)
+
+
+# ====================== registered inference passes ========================
+
+# The operator types that can be folded into parameters when all their inputs
+# are parameters. They are deterministic and have no side effects.
+FOLDABLE_OP_TYPES = {
+    'fill_constant', 'assign', 'cast', 'scale', 'sum', 'mul', 'matmul',
+    'elementwise_add', 'elementwise_sub', 'elementwise_mul',
+    'elementwise_div', 'elementwise_max', 'elementwise_min', 'transpose',
+    'transpose2', 'reshape', 'reshape2', 'concat', 'sqrt', 'square', 'exp',
+    'log', 'abs', 'relu', 'sigmoid', 'tanh', 'clip'
+}
+
+
+@register_inference_pass("constant_folding")
+def _fold_constant(transpiler, program, place, scope):
+    '''
+    Fold the operators whose inputs are all parameters into parameters.
+
+    These operators are run once in the scope, their outputs become
+    persistable variables, and the operators are removed.
+    '''
+    block = program.block(0)
+    # The variables written by the sub-blocks, like the counter of a while
+    # loop, change in each run and can not be folded.
+    writers = collections.defaultdict(int)
+    for b in program.blocks:
+        for op in b.ops:
+            for name in set(op.output_arg_names):
+                writers[name] += 1 if b.idx == 0 else 2
+
+    constants = set(name for name, var in six.iteritems(block.vars)
+                    if var.persistable and scope.find_var(name) is not None)
+    folded_ops = []
+    for op in block.ops:
+        if op.type not in FOLDABLE_OP_TYPES:
+            continue
+        if not all(name in constants for name in op.input_arg_names):
+            continue
+        outputs = op.output_arg_names
+        if not outputs or not all(
+                name in block.vars and writers[name] == 1 and
+                block.vars[name].type == core.VarDesc.VarType.LOD_TENSOR
+                for name in outputs):
+            continue
+        folded_ops.append(op)
+        constants.update(outputs)
+
+    if not folded_ops:
+        return
+
+    fold_program = Program()
+    fold_block = fold_program.global_block()
+    for op in folded_ops:
+        for name in op.input_arg_names + op.output_arg_names:
+            if not fold_block.has_var(name):
+                var = block.var(name)
+                fold_block.create_var(
+                    name=name,
+                    shape=var.shape,
+                    dtype=var.dtype,
+                    type=var.type,
+                    lod_level=var.lod_level,
+                    persistable=True)
+        fold_block.append_op(
+            type=op.type,
+            inputs=dict((k, op.input(k)) for k in op.input_names),
+            outputs=dict((k, [fold_block.var(n) for n in op.output(k)])
+                         for k in op.output_names),
+            attrs=op.all_attrs())
+    Executor(place).run(fold_program, scope=scope)
+
+    for op in folded_ops:
+        for name in op.output_arg_names:
+            block.var(name).persistable = True
+        block._remove_op(op.idx)
+
+
+@register_inference_pass("conv_bn_fuse", use_mkldnn=False)
+def _conv_bn_fuse(transpiler, program, place, scope):
+    transpiler._fuse_batch_norm(program, place, scope)
+
+
+@register_inference_pass("bn_relu_mkldnn_fuse", use_mkldnn=True)
+def _bn_relu_mkldnn_fuse(transpiler, program, place, scope):
+    transpiler._fuse_relu_mkldnn(program)
+
+
+@register_inference_pass("conv_bias_mkldnn_fuse", use_mkldnn=True)
+def _conv_bias_mkldnn_fuse(transpiler, program, place, scope):
+    transpiler._fuse_conv_bias_mkldnn(program)
+
+
+@register_inference_pass("dropout_to_scale")
+def _dropout_to_scale(transpiler, program, place, scope):
+    '''
+    In test phase dropout computes Out = X * (1 - dropout_prob), replace it
+    by a scale operator, which may be merged by the following passes.
+    '''
+    transpiler.block = program.block(0)
+    while True:
+        chain = transpiler._find_chain(
+            ["dropout"], lambda chain: chain[0].attr("is_test"))
+        if chain is None:
+            break
+        dropout_op = chain[0]
+        transpiler._replace_chain(
+            chain,
+            type="scale",
+            inputs={"X": dropout_op.input("X")},
+            outputs={
+                "Out": transpiler.block.var(dropout_op.output("Out")[0])
+            },
+            attrs={"scale": 1.0 - dropout_op.attr("dropout_prob")})
+
+
+@register_inference_pass("scale_fuse")
+def _scale_fuse(transpiler, program, place, scope):
+    '''
+    Merge consecutive scale operators: scale(scale(X, a), b) = scale(X, a * b)
+    '''
+    transpiler.block = program.block(0)
+    while True:
+        chain = transpiler._find_chain(["scale", "scale"])
+        if chain is None:
+            break
+        transpiler._replace_chain(
+            chain,
+            type="scale",
+            inputs={"X": chain[0].input("X")},
+            outputs={"Out": transpiler.block.var(chain[1].output("Out")[0])},
+            attrs={"scale": chain[0].attr("scale") * chain[1].attr("scale")})
+
+
+def _is_mergeable_reshape(chain):
+    for op in chain:
+        if "Shape" in op.input_names and op.input("Shape"):
+            return False
+    return 0 not in chain[1].attr("shape")
+
+
+@register_inference_pass("reshape_fuse")
+def _reshape_fuse(transpiler, program, place, scope):
+    '''
+    Merge consecutive reshape operators into the last one, if its shape does
+    not copy any dimension (0) from its input.
+    '''
+    transpiler.block = program.block(0)
+    for op_type in ["reshape", "reshape2"]:
+        while True:
+            chain = transpiler._find_chain([op_type, op_type],
+                                           _is_mergeable_reshape)
+            if chain is None:
+                break
+            outputs = {
+                "Out": transpiler.block.var(chain[1].output("Out")[0])
+            }
+            if op_type == "reshape2":
+                outputs["XShape"] = transpiler.block.var(chain[0].output(
+                    "XShape")[0])
+            transpiler._replace_chain(
+                chain,
+                type=op_type,
+                inputs={"X": chain[0].input("X")},
+                outputs=outputs,
+                attrs={"shape": chain[1].attr("shape")})
+
+
+@register_inference_pass("transpose_fuse")
+def _transpose_fuse(transpiler, program, place, scope):
+    '''
+    Merge consecutive transpose operators by composing their axis.
+    '''
+    transpiler.block = program.block(0)
+    for op_type in ["transpose", "transpose2"]:
+        while True:
+            chain = transpiler._find_chain([op_type, op_type])
+            if chain is None:
+                break
+            first_axis = chain[0].attr("axis")
+            axis = [first_axis[i] for i in chain[1].attr("axis")]
+            outputs = {
+                "Out": transpiler.block.var(chain[1].output("Out")[0])
+            }
+            if op_type == "transpose2":
+                outputs["XShape"] = transpiler.block.var(chain[0].output(
+                    "XShape")[0])
+            transpiler._replace_chain(
+                chain,
+                type=op_type,
+                inputs={"X": chain[0].input("X")},
+                outputs=outputs,
+                attrs={"axis": axis})
+
+
+@register_inference_pass("fc_fuse", use_mkldnn=False, cpu_only=True)
+def _fc_fuse(transpiler, program, place, scope):
+    '''
+    Fuse mul and the elementwise_add of bias into a fc operator.
+    '''
+    block = program.block(0)
+    transpiler.block = block
+
+    def _is_fc_chain(chain):
+        mul_op, add_op = chain
+        if mul_op.attr("x_num_col_dims") != 1 or \
+                mul_op.attr("y_num_col_dims") != 1:
+            return False
+        x_var = block.vars.get(mul_op.input("X")[0], None)
+        w_var = block.vars.get(mul_op.input("Y")[0], None)
+        bias_var = block.vars.get(add_op.input("Y")[0], None)
+        if x_var is None or w_var is None or bias_var is None:
+            return False
+        return len(x_var.shape) in (2, 4) and len(w_var.shape) == 2 and \
+            bias_var.persistable and list(bias_var.shape) == [w_var.shape[1]] \
+            and add_op.attr("axis") in (1, -1)
+
+    while True:
+        chain = transpiler._find_chain(["mul", "elementwise_add"],
+                                       _is_fc_chain)
+        if chain is None:
+            break
+        mul_op, add_op = chain
+        transpiler._replace_chain(
+            chain,
+            type="fc",
+            inputs={
+                "Input": mul_op.input("X"),
+                "W": mul_op.input("Y"),
+                "Bias": add_op.input("Y")
+            },
+            outputs={"Out": block.var(add_op.output("Out")[0])},
+            attrs={"use_mkldnn": False})
+
+
+@register_inference_pass("elementwise_act_fuse")
+def _elementwise_act_fuse(transpiler, program, place, scope):
+    '''
+    Fuse elementwise_add and the following relu/scale into a
+    fused_elemwise_activation operator, which computes Unary(Binary(X, Y)).
+    '''
+    block = program.block(0)
+    transpiler.block = block
+    while True:
+        chain = transpiler._find_chain(["elementwise_add", ["relu", "scale"]])
+        if chain is None:
+            break
+        binary_op, unary_op = chain
+        out_var = block.var(unary_op.output("Out")[0])
+        intermediate_var = block.create_var(
+            name=unique_name.generate(out_var.name + ".intermediate"),
+            dtype=out_var.dtype,
+            type=out_var.type)
+        attrs = {
+            "axis": binary_op.attr("axis"),
+            "functor_list": [unary_op.type, binary_op.type],
+            "keep_intermediate_value": False
+        }
+        if unary_op.type == "scale":
+            attrs["scale"] = unary_op.attr("scale")
+        transpiler._replace_chain(
+            chain,
+            type="fused_elemwise_activation",
+            inputs={"X": binary_op.input("X"),
+                    "Y": binary_op.input("Y")},
+            outputs={"Out": out_var,
+                     "IntermediateOut": intermediate_var},
+            attrs=attrs)
@@ -14,19 +14,23 @@
 
 __all__ = [
     'map_readers', 'buffered', 'compose', 'chain', 'shuffle',
-    'ComposeNotAligned', 'firstn', 'xmap_readers', 'PipeReader'
+    'ComposeNotAligned', 'firstn', 'xmap_readers', 'PipeReader', 'interleave',
+    'bucket_batch', 'stream_shuffle'
 ]
 
-from threading import Thread
+from threading import Thread, Event
 import subprocess
+import sys
 
-from six.moves.queue import Queue
+import six
+from six.moves.queue import Queue, Full
 from six.moves import zip_longest
 from six.moves import map
 from six.moves import zip
 import itertools
 import random
 import zlib
+import numpy as np
 import paddle.compat as cpt
 
 
@@ -87,6 +91,93 @@ def shuffle(reader, buf_size):
     return data_reader
 
 
+class _ShuffleBuffer(object):
+    """
+    Fixed size sample storage of stream_shuffle. Numpy fields of the samples
+    are stored in one preallocated array per field, other fields are stored
+    in a list. The layout is decided by the first sample.
+    """
+
+    def __init__(self, sample, size):
+        self.is_tuple = isinstance(sample, tuple)
+        fields = sample if self.is_tuple else (sample, )
+        self.store = []
+        for f in fields:
+            if isinstance(f, np.ndarray):
+                self.store.append(np.empty((size, ) + f.shape, dtype=f.dtype))
+            else:
+                self.store.append([None] * size)
+
+    def put(self, idx, sample):
+        fields = sample if self.is_tuple else (sample, )
+        if len(fields) != len(self.store):
+            raise ValueError("all samples must have the same number of "
+                             "fields.")
+        for s, f in zip(self.store, fields):
+            if isinstance(s, np.ndarray):
+                f = np.asarray(f)
+                if f.shape != s.shape[1:]:
+                    raise ValueError("sample of shape %s does not match the "
+                                     "shape %s of the first sample." %
+                                     (str(f.shape), str(s.shape[1:])))
+            s[idx] = f
+
+    def get(self, idx):
+        fields = tuple(s[idx].copy() if isinstance(s, np.ndarray) else s[idx]
+                       for s in self.store)
+        return fields if self.is_tuple else fields[0]
+
+
+def stream_shuffle(reader, buf_size, seed=None):
+    """
+    Creates a data reader whose data output is shuffled with a swap buffer.
+
+    Unlike :code:`shuffle`, which outputs nothing while its buffer refills,
+    the reader yields one sample for every sample it reads once the buffer
+    is full: a random sample of the buffer is yielded and replaced by the
+    new one. Numpy arrays in the samples are kept in preallocated arrays
+    instead of a list of objects, so they must have the same shape and
+    dtype in every sample.
+
+    :param reader: the original reader whose output will be shuffled.
+    :type reader: callable
+    :param buf_size: shuffle buffer size.
+    :type buf_size: int
+    :param seed: the random seed. The output is reproducible for a fixed
+        seed.
+    :type seed: int
+
+    :return: the new reader whose output is shuffled.
+    :rtype: callable
+    """
+    buf_size = int(buf_size)
+    if buf_size <= 0:
+        raise ValueError("buf_size should be a positive integeral value, "
+                         "but got buf_size={}".format(buf_size))
+
+    def data_reader():
+        rand = random.Random(seed)
+        buf = None
+        size = 0
+        for e in reader():
+            if buf is None:
+                buf = _ShuffleBuffer(e, buf_size)
+            if size < buf_size:
+                buf.put(size, e)
+                size += 1
+                continue
+            idx = rand.randrange(buf_size)
+            yield buf.get(idx)
+            buf.put(idx, e)
+
+        remaining = list(range(size))
+        rand.shuffle(remaining)
+        for idx in remaining:
+            yield buf.get(idx)
+
+    return data_reader
+
+
 def chain(*readers):
     """
     Creates a data reader whose output is the outputs of input data
@@ -115,6 +206,152 @@ def chain(*readers):
     return reader
 
 
+class _Prefetcher(object):
+    """
+    Run a reader on a daemon thread, which buffers up to buf_size of its
+    samples. Iterating the prefetcher yields the samples, and re-raises the
+    error of the reader with its traceback. Call close() when the consumer
+    stops, so that the thread exits.
+    """
+
+    class _EndSignal(object):
+        pass
+
+    class _ErrorSignal(object):
+        def __init__(self, exc_info):
+            self.exc_info = exc_info
+
+    def __init__(self, reader, buf_size):
+        self._queue = Queue(maxsize=buf_size)
+        self._stop = Event()
+        self._done = False
+        t = Thread(target=self._work, args=(reader, ))
+        t.daemon = True
+        t.start()
+
+    def _put(self, e):
+        # give up once the consumer is gone, so that the thread exits.
+        while not self._stop.is_set():
+            try:
+                self._queue.put(e, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _work(self, reader):
+        try:
+            for d in reader():
+                if not self._put(d):
+                    return
+            self._put(_Prefetcher._EndSignal())
+        except:
+            self._put(_Prefetcher._ErrorSignal(sys.exc_info()))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        e = self._queue.get()
+        if isinstance(e, _Prefetcher._EndSignal):
+            self._done = True
+            raise StopIteration
+        if isinstance(e, _Prefetcher._ErrorSignal):
+            self._done = True
+            six.reraise(*e.exc_info)
+        return e
+
+    next = __next__
+
+    def close(self):
+        self._stop.set()
+        # release the buffered samples.
+        while not self._queue.empty():
+            self._queue.get()
+
+
+def interleave(readers, weights=None, buf_size=100, seed=None,
+               restart=False):
+    """
+    Creates a data reader that mixes the outputs of several readers, picking
+    the source of every sample at random according to its weight.
+
+    Every source is prefetched into its own buffer by a background thread,
+    so a slow source does not stall the others. The order of samples only
+    depends on the seed and the sources, not on the prefetch timing.
+
+    If input readers A and B are interleaved with weights [0.7, 0.3], about
+    70% of the output comes from A and 30% from B.
+
+    :param readers: input readers.
+    :type readers: list of callable
+    :param weights: sampling weight of each reader. Defaults to equal
+        weights. Weights do not need to sum to 1.
+    :type weights: list of float
+    :param buf_size: prefetch buffer size of each reader.
+    :type buf_size: int
+    :param seed: seed of the random source selection. The output order is
+        reproducible for a fixed seed.
+    :type seed: int
+    :param restart: if False, an exhausted reader is dropped and the
+        remaining readers are sampled with renormalized weights, the new
+        reader ends when all readers are exhausted. If True, an exhausted
+        reader is restarted and the new reader never ends. A reader that
+        yields nothing in a pass is dropped even if restart is True, so it
+        is not restarted forever.
+    :type restart: bool
+
+    :return: the new data reader.
+    :rtype: callable
+    """
+    readers = list(readers)
+    if weights is None:
+        weights = [1.0] * len(readers)
+    if len(weights) != len(readers):
+        raise ValueError("the number of weights must equal to the number of "
+                         "readers.")
+    if any(w < 0 for w in weights) or sum(weights) <= 0:
+        raise ValueError("weights must be non-negative and not all zero.")
+
+    def restarted(r):
+        def reader():
+            while True:
+                empty = True
+                for d in r():
+                    empty = False
+                    yield d
+                if not restart or empty:
+                    break
+
+        return reader
+
+    def data_reader():
+        rand = random.Random(seed)
+        sources = [_Prefetcher(restarted(r), buf_size) for r in readers]
+        try:
+            alive = [i for i, w in enumerate(weights) if w > 0]
+            while alive:
+                total = sum(weights[i] for i in alive)
+                pick = rand.random() * total
+                for i in alive:
+                    pick -= weights[i]
+                    if pick < 0:
+                        break
+                try:
+                    e = next(sources[i])
+                except StopIteration:
+                    alive.remove(i)
+                    continue
+                yield e
+        finally:
+            for source in sources:
+                source.close()
+
+    return data_reader
+
+
 class ComposeNotAligned(ValueError):
     pass
 
@@ -166,6 +403,95 @@ def compose(*readers, **kwargs):
     return reader
 
 
+def bucket_batch(reader,
+                 max_tokens,
+                 length_key=len,
+                 buf_size=1000,
+                 max_batch_size=None,
+                 shuffle=True,
+                 seed=None):
+    """
+    Creates a batched reader that groups samples of similar length.
+
+    Samples are read into a window of buf_size, sorted by length_key and cut
+    into batches whose padded size, which is the number of samples times the
+    longest length in the batch, does not exceed max_tokens. Batching samples
+    of similar length wastes less computation on padding than batching them
+    in arrival order. The batches of a window are shuffled before they are
+    yielded, so the batch order does not follow the length.
+
+    A sample longer than max_tokens is yielded as a batch of its own.
+
+    ..  code-block:: python
+
+        # wmt16 samples are (src_ids, trg_ids, trg_ids_next)
+        batch_reader = paddle.reader.bucket_batch(
+            paddle.dataset.wmt16.train(10000, 10000),
+            max_tokens=4096,
+            length_key=lambda sample: max(len(sample[0]), len(sample[1])))
+
+    :param reader: the data reader to read from.
+    :type reader: callable
+    :param max_tokens: max padded number of tokens of each mini-batch.
+    :type max_tokens: int
+    :param length_key: function that returns the length of a sample.
+    :type length_key: callable
+    :param buf_size: number of samples that are sorted together.
+    :type buf_size: int
+    :param max_batch_size: max number of samples of each mini-batch, no limit
+        if None.
+    :type max_batch_size: int
+    :param shuffle: whether to shuffle the batches of each window.
+    :type shuffle: bool
+    :param seed: seed of the batch shuffling.
+    :type seed: int
+    :return: the batched reader.
+    :rtype: callable
+    """
+    max_tokens = int(max_tokens)
+    if max_tokens <= 0:
+        raise ValueError("max_tokens should be a positive integeral value, "
+                         "but got max_tokens={}".format(max_tokens))
+
+    def make_batches(buf):
+        buf.sort(key=length_key)
+        batches = []
+        b = []
+        for instance in buf:
+            # buf is sorted, so the current instance is the longest one.
+            length = length_key(instance)
+            if b and ((len(b) + 1) * length > max_tokens or
+                      len(b) == max_batch_size):
+                batches.append(b)
+                b = []
+            b.append(instance)
+        if b:
+            batches.append(b)
+        return batches
+
+    def batch_reader():
+        rand = random.Random(seed)
+        buf = []
+        for e in reader():
+            buf.append(e)
+            if len(buf) >= buf_size:
+                batches = make_batches(buf)
+                if shuffle:
+                    rand.shuffle(batches)
+                for b in batches:
+                    yield b
+                buf = []
+
+        if len(buf) > 0:
+            batches = make_batches(buf)
+            if shuffle:
+                rand.shuffle(batches)
+            for b in batches:
+                yield b
+
+    return batch_reader
+
+
 def buffered(reader, size):
     """
     Creates a buffered data reader.
@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 import time
 import unittest
 
+import numpy
+
 import paddle.reader
 
 
@@ -108,6 +111,107 @@ class TestChain(unittest.TestCase):
         self.assertEqual(idx, 20)
 
 
+class TestInterleave(unittest.TestCase):
+    def test_drop_exhausted(self):
+        def reader_creator_n(n, base):
+            def reader():
+                for i in range(n):
+                    yield base + i
+
+            return reader
+
+        r = paddle.reader.interleave(
+            [reader_creator_n(10, 0), reader_creator_n(30, 100)],
+            weights=[0.7, 0.3],
+            buf_size=4,
+            seed=1)
+        result = list(r())
+        self.assertEqual(len(result), 40)
+        # the samples of every source keep their order
+        self.assertEqual([e for e in result if e < 100], list(range(10)))
+        self.assertEqual([e for e in result if e >= 100],
+                         list(range(100, 130)))
+        # the output only depends on the seed
+        self.assertEqual(result, list(r()))
+
+    def test_restart(self):
+        r = paddle.reader.interleave(
+            [reader_creator_10(0), reader_creator_10(0)],
+            weights=[3, 1],
+            seed=2,
+            restart=True)
+        result = list(paddle.reader.firstn(r, 1000)())
+        self.assertEqual(len(result), 1000)
+        self.assertEqual(sorted(set(result)), list(range(10)))
+
+    def test_restart_empty(self):
+        def empty_reader():
+            return iter([])
+
+        r = paddle.reader.interleave(
+            [reader_creator_10(0), empty_reader], seed=3, restart=True)
+        # the empty reader is dropped instead of being restarted forever.
+        result = list(paddle.reader.firstn(r, 30)())
+        self.assertEqual(result, list(range(10)) * 3)
+
+        r = paddle.reader.interleave([empty_reader], restart=True)
+        self.assertEqual(list(r()), [])
+
+    def test_weights_not_aligned(self):
+        with self.assertRaises(ValueError):
+            paddle.reader.interleave([reader_creator_10(0)], weights=[1, 1])
+
+    def test_reader_error(self):
+        def broken_reader():
+            yield 0
+            raise IOError("broken reader")
+
+        r = paddle.reader.interleave(
+            [reader_creator_10(0), broken_reader], seed=1)
+        with self.assertRaises(IOError):
+            list(r())
+
+    def test_early_exit(self):
+        r = paddle.reader.interleave(
+            [reader_creator_10(0), reader_creator_10(0)],
+            buf_size=1,
+            restart=True)
+        threads = threading.active_count()
+        for _ in range(3):
+            list(paddle.reader.firstn(r, 5)())
+        # the workers of the abandoned readers exit.
+        deadline = time.time() + 5
+        while threading.active_count() > threads and time.time() < deadline:
+            time.sleep(0.1)
+        self.assertEqual(threading.active_count(), threads)
+
+
+class TestBucketBatch(unittest.TestCase):
+    def test_bucket_batch(self):
+        def reader():
+            for i in range(100):
+                yield [0] * (i * 7 % 31 + 1)
+
+        max_tokens = 64
+        r = paddle.reader.bucket_batch(
+            reader, max_tokens, buf_size=40, max_batch_size=8, seed=1)
+        total = 0
+        for b in r():
+            longest = max(len(e) for e in b)
+            self.assertLessEqual(len(b), 8)
+            self.assertLessEqual(len(b) * longest, max_tokens)
+            total += len(b)
+        self.assertEqual(total, 100)
+
+    def test_too_long_sample(self):
+        def reader():
+            yield [0] * 10
+            yield [0] * 100
+
+        r = paddle.reader.bucket_batch(reader, 50, shuffle=False)
+        self.assertEqual([len(b) for b in r()], [1, 1])
+
+
 class TestShuffle(unittest.TestCase):
     def test_shuffle(self):
         case = [(0, True), (1, True), (10, False), (100, False)]
@@ -122,6 +226,40 @@ class TestShuffle(unittest.TestCase):
             self.assertEqual(total, 10)
 
 
+class TestStreamShuffle(unittest.TestCase):
+    def test_stream_shuffle(self):
+        for size in [1, 3, 10, 100]:
+            s = paddle.reader.stream_shuffle(reader_creator_10(0), size)
+            result = list(s())
+            self.assertEqual(sorted(result), list(range(10)))
+            if size == 1:
+                self.assertEqual(result, list(range(10)))
+
+    def test_numpy_samples(self):
+        def reader():
+            for i in range(50):
+                yield numpy.full([2, 3], i, dtype='float32'), i
+
+        s = paddle.reader.stream_shuffle(reader, 16, seed=1)
+        result = list(s())
+        self.assertEqual(sorted(label for _, label in result), list(range(50)))
+        for data, label in result:
+            self.assertEqual(data.shape, (2, 3))
+            self.assertTrue((data == label).all())
+        # the output is reproducible for a fixed seed
+        self.assertEqual([label for _, label in result],
+                         [label for _, label in s()])
+
+    def test_shape_mismatch(self):
+        def reader():
+            yield numpy.zeros([2])
+            yield numpy.zeros([3])
+
+        s = paddle.reader.stream_shuffle(reader, 4)
+        with self.assertRaises(ValueError):
+            list(s())
+
+
 class TestXmap(unittest.TestCase):
     def test_xmap(self):
         def mapper(x):
@@ -12,11 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import array
+import atexit
 import cPickle
 import logging
 import collections
 import functools
 import itertools
+import multiprocessing
+import os
+import Queue
+import random
+import shutil
+import sys
+import tempfile
+import traceback
 
 logging.basicConfig(format="[%(levelname)s %(asctime)s %(filename)s:%(lineno)s]"
                     " %(message)s")
@@ -59,6 +69,11 @@ class CacheType(object):
     # memory during rest passes.
     CACHE_PASS_IN_MEM = 1
 
+    # First pass, read data from python. And store them on local disk in a
+    # binary layout of the input types. Read from the memory-mapped files
+    # during rest passes.
+    CACHE_PASS_ON_DISK = 2
+
 
 class InputType(object):
     """
@@ -362,6 +377,292 @@ class CheckInputTypeWrapper(object):
                 raise
 
 
+class WorkerError(object):
+    """
+    The error raised in a worker process of MultiProcessWrapper.
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+
+class WorkerReader(object):
+    """
+    The iterator of the samples streamed back by a worker process. It raises
+    RuntimeError if the worker fails, or exits without finishing the stream,
+    for example when it is killed.
+    """
+
+    def __init__(self, worker, queue, poll_interval=1.0):
+        self.worker = worker
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.chunk = iter(())
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        while True:
+            for item in self.chunk:
+                return item
+            if self.worker is None:
+                raise StopIteration()
+            # Everything a dead worker has put is already readable, so it is
+            # checked before waiting.
+            alive = self.worker.is_alive()
+            try:
+                chunk = self.queue.get(timeout=self.poll_interval)
+            except Queue.Empty:
+                if alive:
+                    continue
+                exitcode = self.worker.exitcode
+                self.close()
+                raise RuntimeError(
+                    "Data provider worker exited unexpectedly with exit code "
+                    "%s." % exitcode)
+            if chunk is None:
+                self.close()
+                raise StopIteration()
+            if isinstance(chunk, WorkerError):
+                self.close()
+                raise RuntimeError("Data provider worker failed:\n" +
+                                   chunk.message)
+            self.chunk = iter(chunk)
+
+    def close(self):
+        if self.worker is not None:
+            if self.worker.is_alive():
+                self.worker.terminate()
+            self.worker.join()
+            self.worker = None
+
+    def __del__(self):
+        self.close()
+
+
+class MultiProcessWrapper(object):
+    """
+    Generate the samples in worker processes. The file list is sharded across
+    the workers, and the samples of the i-th worker are streamed back through a
+    bounded queue, in chunks, as the samples of the i-th file. The other files
+    yield nothing, so the samples of all workers are mixed by the data pool.
+    """
+
+    def __init__(self,
+                 generator,
+                 num_workers,
+                 chunk_size=64,
+                 queue_size=16):
+        self.generator = generator
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.num_calls = 0
+
+    def __call__(self, obj, filename):
+        # The generator is called for each file in file_list in order.
+        index = self.num_calls % len(obj.file_list)
+        self.num_calls += 1
+        if index >= self.num_workers:
+            return iter(())
+
+        queue = multiprocessing.Queue(self.queue_size)
+        worker = multiprocessing.Process(
+            target=self.work,
+            args=(obj, obj.file_list[index::self.num_workers], queue))
+        worker.daemon = True
+        worker.start()
+        return WorkerReader(worker, queue)
+
+    def work(self, obj, file_list, queue):
+        try:
+            # The forked workers should not generate the same random numbers.
+            random.seed()
+            if 'numpy' in sys.modules:
+                sys.modules['numpy'].random.seed()
+            chunk = []
+            for filename in file_list:
+                for item in self.generator(obj, filename):
+                    chunk.append(item)
+                    if len(chunk) == self.chunk_size:
+                        queue.put(chunk)
+                        chunk = []
+            if chunk:
+                queue.put(chunk)
+            queue.put(None)
+        except Exception:
+            queue.put(WorkerError(traceback.format_exc()))
+
+
+class SlotCacheWriter(object):
+    """
+    Write the values of a slot into the files of the disk cache. The values are
+    flattened into three streams, the indices, the floats and the lengths of
+    the sequences and the sparse vectors.
+    """
+
+    def __init__(self, input_type, prefix, flush_size=1 << 16):
+        self.input_type = input_type
+        self.flush_size = flush_size
+        self.streams = [(array.array('i'), open(prefix + '.ints', 'wb')),
+                        (array.array('f'), open(prefix + '.floats', 'wb')),
+                        (array.array('i'), open(prefix + '.lengths', 'wb'))]
+        self.ints, self.floats, self.lengths = [
+            buf for buf, _ in self.streams
+        ]
+
+    def write(self, value):
+        self.__write__(value, self.input_type.seq_type)
+        for buf, f in self.streams:
+            if len(buf) >= self.flush_size:
+                buf.tofile(f)
+                del buf[:]
+
+    def __write__(self, value, seq_type):
+        if seq_type > 0:
+            self.lengths.append(len(value))
+            for each in value:
+                self.__write__(each, seq_type - 1)
+            return
+
+        tp = self.input_type.type
+        if tp == DataType.Dense:
+            if len(value) != self.input_type.dim:
+                raise ValueError("Dense value of size %d is not %d" %
+                                 (len(value), self.input_type.dim))
+            self.floats.extend(value)
+        elif tp == DataType.Index:
+            self.ints.append(value)
+        elif tp == DataType.SparseNonValue:
+            self.lengths.append(len(value))
+            self.ints.extend(value)
+        elif tp == DataType.SparseValue:
+            self.lengths.append(len(value))
+            for k, v in value:
+                self.ints.append(k)
+                self.floats.append(v)
+        else:
+            raise RuntimeError("Not support input type")
+
+    def close(self):
+        for buf, f in self.streams:
+            buf.tofile(f)
+            f.close()
+
+
+class SlotCacheReader(object):
+    """
+    Read the values of a slot from the memory-mapped files of the disk cache.
+    """
+
+    def __init__(self, input_type, prefix):
+        self.input_type = input_type
+        self.ints = SlotCacheReader.mmap(prefix + '.ints', 'int32')
+        self.floats = SlotCacheReader.mmap(prefix + '.floats', 'float32')
+        self.lengths = SlotCacheReader.mmap(prefix + '.lengths', 'int32')
+        self.int_pos = 0
+        self.float_pos = 0
+        self.length_pos = 0
+
+    @staticmethod
+    def mmap(filename, dtype):
+        import numpy
+        if os.path.getsize(filename) == 0:
+            # an empty file can not be memory-mapped.
+            return numpy.empty(0, dtype=dtype)
+        return numpy.memmap(filename, dtype=dtype, mode='r')
+
+    def read(self):
+        return self.__read__(self.input_type.seq_type)
+
+    def __read__(self, seq_type):
+        if seq_type > 0:
+            return [
+                self.__read__(seq_type - 1)
+                for _ in xrange(self.__length__())
+            ]
+
+        tp = self.input_type.type
+        if tp == DataType.Dense:
+            return self.__floats__(self.input_type.dim)
+        elif tp == DataType.Index:
+            return self.__ints__(1)[0]
+        elif tp == DataType.SparseNonValue:
+            return self.__ints__(self.__length__())
+        elif tp == DataType.SparseValue:
+            length = self.__length__()
+            return zip(self.__ints__(length), self.__floats__(length))
+        else:
+            raise RuntimeError("Not support input type")
+
+    def __length__(self):
+        self.length_pos += 1
+        return int(self.lengths[self.length_pos - 1])
+
+    def __ints__(self, n):
+        self.int_pos += n
+        return self.ints[self.int_pos - n:self.int_pos].tolist()
+
+    def __floats__(self, n):
+        self.float_pos += n
+        return self.floats[self.float_pos - n:self.float_pos].tolist()
+
+
+class DiskCacheWrapper(object):
+    """
+    Cache the samples of each file on local disk in the first pass, and read
+    them from the cache in the rest passes. A file is read from the cache only
+    if all of its samples were cached.
+    """
+
+    def __init__(self, generator, input_types, cache_dir=None):
+        self.generator = generator
+        self.input_types = input_types
+        self.cache_dir = tempfile.mkdtemp(prefix='pydp2_cache_', dir=cache_dir)
+        atexit.register(shutil.rmtree, self.cache_dir, True)
+        self.num_calls = 0
+        # the number of samples of each cached file.
+        self.num_samples = dict()
+
+    def __call__(self, obj, filename):
+        # The generator is called for each file in file_list in order.
+        index = self.num_calls % len(obj.file_list)
+        self.num_calls += 1
+        if index in self.num_samples:
+            return self.replay(index)
+        else:
+            return self.record(obj, filename, index)
+
+    def prefix(self, index, slot_id):
+        return os.path.join(self.cache_dir, '%d_%d' % (index, slot_id))
+
+    def record(self, obj, filename, index):
+        writers = [
+            SlotCacheWriter(input_type, self.prefix(index, i))
+            for i, input_type in enumerate(self.input_types)
+        ]
+        num_samples = 0
+        try:
+            for items in self.generator(obj, filename):
+                for writer, item in itertools.izip(writers, items):
+                    writer.write(item)
+                num_samples += 1
+                yield items
+        finally:
+            for writer in writers:
+                writer.close()
+        self.num_samples[index] = num_samples
+
+    def replay(self, index):
+        readers = [
+            SlotCacheReader(input_type, self.prefix(index, i))
+            for i, input_type in enumerate(self.input_types)
+        ]
+        for _ in xrange(self.num_samples[index]):
+            yield [reader.read() for reader in readers]
+
+
 def provider(input_types=None,
              should_shuffle=None,
              pool_size=-1,
@@ -372,6 +673,8 @@ def provider(input_types=None,
              check=False,
              check_fail_continue=False,
              init_hook=None,
+             num_workers=0,
+             cache_dir=None,
              **outter_kwargs):
     """
     Provider decorator. Use it to make a function into PyDataProvider2 object.
@@ -429,6 +732,12 @@ def provider(input_types=None,
     :param cache: Cache strategy of Data Provider. Default is CacheType.NO_CACHE
     :type cache: int
 
+    :param cache_dir: The local directory to create the cache in, when cache is
+                      CacheType.CACHE_PASS_ON_DISK. Default is the temporary
+                      directory of the system. The cache is removed when the
+                      process exits.
+    :type cache_dir: basestring
+
     :param init_hook: Initialize hook. Useful when data provider need load some
                       external data like dictionary. The parameter is
                       (settings, file_list, \*\*kwargs).
@@ -450,6 +759,13 @@ def provider(input_types=None,
                                 drop the wrong format data when it is True. Has
                                 no effect when check set to False.
     :type check_fail_continue: bool
+
+    :param num_workers: The number of worker processes to generate the samples.
+                        The file list is sharded across the workers, which
+                        fork from the trainer after init_hook. It is useful
+                        when the generator is CPU-heavy. Default is 0, which
+                        generates the samples in the trainer process.
+    :type num_workers: int
     """
 
     def __wrapper__(generator):
@@ -491,6 +807,7 @@ def provider(input_types=None,
                 self.min_pool_size = min_pool_size
                 self.input_order = kwargs['input_order']
                 self.check = check
+                self.num_workers = num_workers
                 if init_hook is not None:
                     init_hook(self, file_list=file_list, **kwargs)
 
@@ -526,6 +843,12 @@ def provider(input_types=None,
                     self.generator = CheckWrapper(self.generator, self.slots,
                                                   check_fail_continue,
                                                   self.logger)
+                if self.num_workers > 0:
+                    self.generator = MultiProcessWrapper(self.generator,
+                                                         self.num_workers)
+                if self.cache == CacheType.CACHE_PASS_ON_DISK:
+                    self.generator = DiskCacheWrapper(self.generator,
+                                                      self.slots, cache_dir)
 
         return DataProvider
 
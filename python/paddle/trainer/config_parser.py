@@ -73,13 +73,18 @@ To use this from paddle_trainer, paddle_trainer should be called with
 --config_args=extension_module_name=[MODULE_NAME]
 
 '''
+import __builtin__
 import copy
+import cPickle as pickle
+import hashlib
 import logging
 import os
 import sys
+import tempfile
 import traceback
 import math
 import shutil
+import types
 
 try:
     from paddle.proto.DataConfig_pb2 import DataConfig
@@ -138,7 +143,10 @@ def init_config_environment(
         g_root_submodel=None,
         g_submodel_map={},
         g_submodel_stack=[],
-        g_add_submodel_suffix=False, ):
+        g_add_submodel_suffix=False,
+
+        # the files read by the config, to validate the config cache
+        g_config_dependencies=set(), ):
 
     # directly iterate through locals().iteritems() will change
     # the size of locals() due to introducing k, v into scope
@@ -4197,8 +4205,10 @@ def make_importer(config_dir, config_args):
         if not config_file.startswith('/'):
             config_file = config_dir + '/' + config_file
             g_config.config_files.append(config_file)
-        execfile(config_file,
-                 make_config_environment(config_file, config_args), local_args)
+        env = make_config_environment(config_file, config_args)
+        execfile(config_file, env, local_args)
+        g_config_dependencies.add(os.path.abspath(config_file))
+        _add_module_dependencies(env)
 
     return Import
 
@@ -4299,13 +4309,23 @@ def make_config_environment(config_file, config_args):
 
     funcs.update(
         Import=make_importer(config_dir, config_args),
-        get_config_arg=make_get_config_arg(config_args), )
+        get_config_arg=make_get_config_arg(config_args),
+        open=make_opener(), )
 
     funcs.update(g_extended_config_funcs)
 
     return funcs
 
 
+def make_opener():
+    def open(name, mode='r', *args):
+        if 'w' not in mode and 'a' not in mode:
+            g_config_dependencies.add(os.path.abspath(name))
+        return __builtin__.open(name, mode, *args)
+
+    return open
+
+
 def make_get_config_arg(config_args):
     def get_config_arg(name, type, default=None):
         if type == bool:
@@ -4395,12 +4415,151 @@ def begin_parse():
     g_current_submodel = g_root_submodel
 
 
-def parse_config(trainer_config, config_arg_str):
+CONFIG_CACHE_VERSION = 1
+
+
+def _add_module_dependencies(env, modules_before=None):
+    '''
+    Add the source files of the modules used by a config to the dependencies
+    of the config: the modules and the modules of the functions and classes
+    in its environment, and the modules imported after modules_before.
+    '''
+    modules = set()
+    for v in env.itervalues():
+        if isinstance(v, types.ModuleType):
+            modules.add(v)
+        elif getattr(v, '__module__', None) in sys.modules:
+            modules.add(sys.modules[v.__module__])
+    if modules_before is not None:
+        for name in set(sys.modules) - modules_before:
+            modules.add(sys.modules[name])
+
+    for m in modules:
+        filename = getattr(m, '__file__', None)
+        if not filename:
+            continue
+        if filename.endswith('.pyc') or filename.endswith('.pyo'):
+            filename = filename[:-1]
+        g_config_dependencies.add(os.path.abspath(filename))
+
+
+def _file_digest(filename):
+    try:
+        with open(filename, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except IOError:
+        return None
+
+
+def _config_cache_path(trainer_config, config_arg_str, cache_dir):
+    key = hashlib.sha1('%s\0%s' % (os.path.abspath(trainer_config),
+                                    config_arg_str)).hexdigest()
+    return os.path.join(cache_dir, key + '.config_cache')
+
+
+def _load_config_cache(trainer_config, config_arg_str, cache_dir):
+    '''
+    Load the cached config of trainer_config and config_arg_str.
+
+    @return: the serialized TrainerConfig, or None if the cache is invalid,
+    and a list of the reasons why the cache is invalid.
+    '''
+    path = _config_cache_path(trainer_config, config_arg_str, cache_dir)
+    if not os.path.exists(path):
+        return None, ['no cache entry %s' % path]
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception as e:
+        return None, ['cache entry %s is unreadable: %s' % (path, e)]
+
+    if entry.get('version') != CONFIG_CACHE_VERSION:
+        return None, ['cache version %s is not %s' %
+                      (entry.get('version'), CONFIG_CACHE_VERSION)]
+    if entry['trainer_config'] != os.path.abspath(trainer_config) or \
+            entry['config_arg_str'] != config_arg_str:
+        return None, ['cache entry %s is of %s with config_arg_str "%s"' %
+                      (path, entry['trainer_config'], entry['config_arg_str'])]
+
+    reasons = []
+    for filename, digest in sorted(entry['dependencies'].iteritems()):
+        current = _file_digest(filename)
+        if current is None:
+            reasons.append('%s is removed' % filename)
+        elif current != digest:
+            reasons.append('%s is changed' % filename)
+    if reasons:
+        return None, reasons
+    return entry['config'], []
+
+
+def check_config_cache(trainer_config, config_arg_str, cache_dir):
+    '''
+    Check whether parse_config can restore the config from the cache.
+
+    @return: a list of the reasons why the cache is invalid, which is empty if
+    the cache is valid.
+    '''
+    return _load_config_cache(trainer_config, config_arg_str, cache_dir)[1]
+
+
+def _save_config_cache(trainer_config, config_arg_str, cache_dir, config):
+    dependencies = {}
+    for filename in g_config_dependencies:
+        digest = _file_digest(filename)
+        if digest is not None:
+            dependencies[filename] = digest
+    entry = dict(
+        version=CONFIG_CACHE_VERSION,
+        trainer_config=os.path.abspath(trainer_config),
+        config_arg_str=config_arg_str,
+        dependencies=dependencies,
+        config=config.SerializeToString())
+
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+    except OSError:
+        # created by another process.
+        pass
+    try:
+        # write to a temporary file and rename it, since the trainers may
+        # save the same entry at the same time.
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_path,
+                  _config_cache_path(trainer_config, config_arg_str, cache_dir))
+    except (IOError, OSError) as e:
+        logger.warning('Failed to save the config cache to %s: %s' %
+                       (cache_dir, e))
+
+
+def parse_config(trainer_config, config_arg_str, cache_dir=None):
     '''
     @param config_arg_str: a string of the form var1=val1,var2=val2. It will be
     passed to config script as a dictionary CONFIG_ARGS
+    @param cache_dir: the directory to cache the parsed config. If it is set,
+    and none of config_arg_str, the config file and the files it imports or
+    reads is changed, the TrainerConfig is restored from the cache without
+    executing the config file. The other global states of the config parser,
+    like g_layer_map, are not restored. The config should not depend on other
+    inputs, like environment variables.
     '''
 
+    use_cache = cache_dir and not hasattr(trainer_config, '__call__')
+    if use_cache:
+        config, reasons = _load_config_cache(trainer_config, config_arg_str,
+                                            cache_dir)
+        if config is not None:
+            begin_parse()
+            g_config.ParseFromString(config)
+            logger.info('Restored the config of %s from the cache' %
+                        trainer_config)
+            return g_config
+        logger.info('Parsing %s, since the config cache is invalid: %s' %
+                    (trainer_config, '; '.join(reasons)))
+
     begin_parse()
     config_args = {}
 
@@ -4421,15 +4580,24 @@ def parse_config(trainer_config, config_arg_str):
             make_config_environment("", config_args))
         trainer_config()
     else:
-        execfile(trainer_config,
-                 make_config_environment(trainer_config, config_args))
+        modules_before = set(sys.modules)
+        env = make_config_environment(trainer_config, config_args)
+        execfile(trainer_config, env)
+        g_config_dependencies.add(os.path.abspath(trainer_config))
+        _add_module_dependencies(env, modules_before)
 
-    return update_g_config()
+    config = update_g_config()
+    if use_cache:
+        _save_config_cache(trainer_config, config_arg_str, cache_dir, config)
+    return config
 
 
 def parse_config_and_serialize(trainer_config, config_arg_str):
     try:
-        config = parse_config(trainer_config, config_arg_str)
+        config = parse_config(
+            trainer_config,
+            config_arg_str,
+            cache_dir=os.environ.get('PADDLE_CONFIG_CACHE_DIR'))
         #logger.info(config)
         return config.SerializeToString()
     except:
@@ -0,0 +1,100 @@
+# Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from paddle.trainer.config_parser import parse_config, check_config_cache
+
+CONFIG = '''
+from paddle.trainer_config_helpers import *
+
+settings(batch_size=16)
+Import('sub_config.py')
+dict_size = len(open(get_config_arg('dict', str, 'dict.txt')).readlines())
+data = data_layer(name='data', size=dict_size)
+outputs(fc_layer(input=data, size=8))
+# files written by the config are not its dependencies.
+open('executed.log', 'a').write('x\\n')
+'''
+
+
+class TestConfigCache(unittest.TestCase):
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.dirname, 'cache')
+        self.config = self.write('config.py', CONFIG)
+        self.sub_config = self.write('sub_config.py',
+                                     'Settings(learning_rate=0.5)\n')
+        self.dict_file = self.write('dict.txt', 'a\nb\nc\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def write(self, filename, content):
+        path = os.path.join(self.dirname, filename)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def parse(self, cache_dir):
+        cwd = os.getcwd()
+        os.chdir(self.dirname)
+        try:
+            return parse_config(
+                self.config, '', cache_dir=cache_dir).SerializeToString()
+        finally:
+            os.chdir(cwd)
+
+    def num_executed(self):
+        with open(os.path.join(self.dirname, 'executed.log')) as f:
+            return len(f.readlines())
+
+    def test_cache(self):
+        expected = self.parse(self.cache_dir)
+        self.assertEqual(
+            check_config_cache(self.config, '', self.cache_dir), [])
+        self.assertEqual(self.parse(self.cache_dir), expected)
+        self.assertEqual(self.num_executed(), 1)
+        self.assertEqual(self.parse(None), expected)
+        self.assertEqual(self.num_executed(), 2)
+
+        reasons = check_config_cache(self.config, 'dict=dict.txt',
+                                     self.cache_dir)
+        self.assertEqual(len(reasons), 1)
+        self.assertTrue(reasons[0].startswith('no cache entry'))
+
+    def test_invalidation(self):
+        expected = self.parse(self.cache_dir)
+        self.write('dict.txt', 'a\nb\n')
+        self.write('sub_config.py', 'Settings(learning_rate=0.25)\n')
+        self.assertEqual(
+            check_config_cache(self.config, '', self.cache_dir),
+            ['%s is changed' % self.dict_file,
+             '%s is changed' % self.sub_config])
+        self.assertNotEqual(self.parse(self.cache_dir), expected)
+        self.assertEqual(self.num_executed(), 2)
+        self.assertEqual(
+            check_config_cache(self.config, '', self.cache_dir), [])
+
+        os.remove(self.dict_file)
+        self.assertEqual(
+            check_config_cache(self.config, '', self.cache_dir),
+            ['%s is removed' % self.dict_file])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@
 
 from paddle.trainer.config_parser import parse_config
 from paddle.proto import TrainerConfig_pb2
+import os
 import sys
 
 __all__ = []
@@ -21,12 +22,13 @@ __all__ = []
 if __name__ == '__main__':
     whole_conf = False
     binary = False
+    cache_dir = os.environ.get('PADDLE_CONFIG_CACHE_DIR')
     if len(sys.argv) == 2:
-        conf = parse_config(sys.argv[1], '')
+        conf = parse_config(sys.argv[1], '', cache_dir=cache_dir)
     elif len(sys.argv) == 3:
-        conf = parse_config(sys.argv[1], sys.argv[2])
+        conf = parse_config(sys.argv[1], sys.argv[2], cache_dir=cache_dir)
     elif len(sys.argv) == 4:
-        conf = parse_config(sys.argv[1], sys.argv[2])
+        conf = parse_config(sys.argv[1], sys.argv[2], cache_dir=cache_dir)
         if sys.argv[3] == '--whole':
             whole_conf = True
         elif sys.argv[3] == '--binary':
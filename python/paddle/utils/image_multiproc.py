@@ -18,8 +18,10 @@ from PIL import Image
 import six
 from six.moves import cStringIO as StringIO
 import multiprocessing
+import multiprocessing.sharedctypes
 import functools
 import itertools
+import traceback
 
 from paddle.utils.image_util import *
 from paddle.trainer.config_parser import logger
@@ -196,6 +198,43 @@ def job(is_img_string, transformer, data_label_pack):
         return transformer.transform_from_file(data), label
 
 
+# The worker-side state of the shared memory transport. It is installed by
+# _init_shared_worker when the pool starts, so the slots and the transformer
+# are sent to every worker once instead of being pickled with each task.
+_shared_worker_state = {}
+
+
+def _init_shared_worker(slots, transformer, is_img_string):
+    _shared_worker_state['slots'] = slots
+    _shared_worker_state['transformer'] = transformer
+    _shared_worker_state['is_img_string'] = is_img_string
+
+
+def shared_job(seq, slot, data, label):
+    """
+    Transform one image and write it into the shared memory slot `slot`.
+    Only the slot index, the shape and the label are sent back to the
+    parent process. An error is returned as a formatted traceback because
+    the result of a failed task would otherwise never reach the parent.
+    """
+    try:
+        transformer = _shared_worker_state['transformer']
+        if _shared_worker_state['is_img_string']:
+            im = transformer.transform_from_string(data)
+        else:
+            im = transformer.transform_from_file(data)
+        buf = np.frombuffer(
+            _shared_worker_state['slots'][slot], dtype=np.float32)
+        if im.size > buf.size:
+            raise ValueError("transformed image of shape %s does not fit "
+                             "into a slot of %d floats" %
+                             (str(im.shape), buf.size))
+        buf[:im.size] = im.ravel()
+        return seq, slot, im.shape, label, None
+    except Exception:
+        return seq, slot, None, label, traceback.format_exc()
+
+
 class MultiProcessImageTransformer(object):
     def __init__(self,
                  procnum=10,
@@ -206,7 +245,10 @@ class MultiProcessImageTransformer(object):
                  mean=None,
                  is_train=True,
                  is_color=True,
-                 is_img_string=True):
+                 is_img_string=True,
+                 use_shared_memory=False,
+                 num_slots=None,
+                 keep_order=False):
         """
         Processing image with multi-process. If it is used in PyDataProvider,
         the simple usage for CNN is as follows:
@@ -258,11 +300,26 @@ class MultiProcessImageTransformer(object):
         :type is_color: bool.
         :param is_img_string: The input can be the file name of image or image string.
         :type is_img_string: bool.
+        :param use_shared_memory: whether the workers write transformed images
+                                  into shared memory slots and return only
+                                  the slot index, instead of pickling every
+                                  image back to the parent process. It
+                                  requires crop_size to be set.
+        :type use_shared_memory: bool.
+        :param num_slots: the number of shared memory slots, which bounds the
+                          number of images in flight. Defaults to
+                          4 * procnum. Only used when use_shared_memory
+                          is True.
+        :type num_slots: int
+        :param keep_order: whether images are returned in the input order.
+                           Only used when use_shared_memory is True.
+        :type keep_order: bool.
         """
 
         self.procnum = procnum
-        self.pool = multiprocessing.Pool(procnum)
         self.is_img_string = is_img_string
+        self.use_shared_memory = use_shared_memory
+        self.keep_order = keep_order
         if cv2 is not None:
             self.transformer = CvTransformer(resize_size, crop_size, transpose,
                                              channel_swap, mean, is_train,
@@ -272,7 +329,98 @@ class MultiProcessImageTransformer(object):
                                               channel_swap, mean, is_train,
                                               is_color)
 
+        if self.use_shared_memory:
+            if crop_size is None:
+                raise ValueError("crop_size must be set when "
+                                 "use_shared_memory is True")
+            self.num_slots = num_slots or 4 * procnum
+            slot_size = crop_size * crop_size * (3 if is_color else 1)
+            # Slots are allocated before the pool is forked so that every
+            # worker maps the same memory.
+            self.slots = [
+                multiprocessing.sharedctypes.RawArray('f', slot_size)
+                for _ in six.moves.range(self.num_slots)
+            ]
+            self.pool = multiprocessing.Pool(
+                procnum,
+                initializer=_init_shared_worker,
+                initargs=(self.slots, self.transformer, is_img_string))
+        else:
+            self.pool = multiprocessing.Pool(procnum)
+
     def run(self, data, label):
+        if self.use_shared_memory:
+            return self._run_shared(data, label)
         fun = functools.partial(job, self.is_img_string, self.transformer)
         return self.pool.imap_unordered(
             fun, six.moves.zip(data, label), chunksize=100 * self.procnum)
+
+    def _run_shared(self, data, label):
+        """
+        Dispatch images to the workers one slot at a time. A new image is
+        only submitted when a slot is free, so at most num_slots transformed
+        images are held in memory no matter how fast data is produced.
+        """
+        results = six.moves.queue.Queue()
+        free_slots = list(six.moves.range(self.num_slots))
+        samples = six.moves.zip(data, label)
+        finished = {}
+        pending = {}
+        next_seq = 0
+        out_seq = 0
+        exhausted = False
+
+        try:
+            while True:
+                while free_slots and not exhausted:
+                    try:
+                        d, l = next(samples)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[next_seq] = self.pool.apply_async(
+                        shared_job, (next_seq, free_slots.pop(), d, l),
+                        callback=results.put)
+                    next_seq += 1
+
+                if not pending:
+                    break
+
+                try:
+                    seq, slot, shape, lab, error = results.get(timeout=0.1)
+                except six.moves.queue.Empty:
+                    # The callback is not called for a task that failed out
+                    # of shared_job, like one that can not be pickled, so
+                    # get its error from the result.
+                    for result in list(pending.values()):
+                        if result.ready() and not result.successful():
+                            result.get()
+                    continue
+                del pending[seq]
+                if error is not None:
+                    raise RuntimeError("image transform failed in worker:\n%s"
+                                       % error)
+
+                if not self.keep_order:
+                    yield self._take_slot(slot, shape, free_slots), lab
+                    continue
+
+                finished[seq] = (slot, shape, lab)
+                while out_seq in finished:
+                    slot, shape, lab = finished.pop(out_seq)
+                    out_seq += 1
+                    yield self._take_slot(slot, shape, free_slots), lab
+        finally:
+            # The slots are handed out again by the next run, so wait until
+            # no task writes into them any more, even if the consumer stops
+            # early.
+            for result in six.itervalues(pending):
+                result.wait()
+
+    def _take_slot(self, slot, shape, free_slots):
+        size = int(np.prod(shape))
+        im = np.frombuffer(
+            self.slots[slot], dtype=np.float32, count=size).reshape(shape)
+        im = im.copy()
+        free_slots.append(slot)
+        return im
@@ -17,6 +17,7 @@
 
 from __future__ import print_function
 
+import os
 import six
 import sys
 import traceback
@@ -41,7 +42,10 @@ def make_layer_label(layer_config):
 
 
 def make_diagram(config_file, dot_file, config_arg_str):
-    config = parse_config(config_file, config_arg_str)
+    config = parse_config(
+        config_file,
+        config_arg_str,
+        cache_dir=os.environ.get('PADDLE_CONFIG_CACHE_DIR'))
     make_diagram_from_proto(config.model_config, dot_file)
 
 
@@ -0,0 +1,86 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from paddle.utils.image_multiproc import MultiProcessImageTransformer
+
+
+class TestSharedMemoryTransport(unittest.TestCase):
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        np.random.seed(1)
+        self.files = []
+        for i in range(20):
+            filename = os.path.join(self.dirname, '%d.png' % i)
+            im = np.random.randint(0, 256, size=(40, 36, 3)).astype('uint8')
+            Image.fromarray(im).save(filename)
+            self.files.append(filename)
+        self.labels = list(range(len(self.files)))
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def create_transformer(self, use_shared_memory, keep_order=False):
+        return MultiProcessImageTransformer(
+            procnum=2,
+            resize_size=32,
+            crop_size=24,
+            is_train=False,
+            is_img_string=False,
+            use_shared_memory=use_shared_memory,
+            num_slots=3,
+            keep_order=keep_order)
+
+    def test_same_as_pickled(self):
+        expected = dict((lab, im)
+                        for im, lab in self.create_transformer(False).run(
+                            self.files, self.labels))
+        for keep_order in [False, True]:
+            transformer = self.create_transformer(True, keep_order)
+            result = list(transformer.run(self.files, self.labels))
+            labels = [lab for _, lab in result]
+            if keep_order:
+                self.assertEqual(labels, self.labels)
+            self.assertEqual(sorted(labels), self.labels)
+            for im, lab in result:
+                self.assertTrue(np.array_equal(im, expected[lab]))
+
+            # abandon a run while images are in flight, the next run still
+            # gets its own images.
+            images = transformer.run(self.files, self.labels)
+            next(images)
+            images.close()
+            for im, lab in transformer.run(self.files, self.labels):
+                self.assertTrue(np.array_equal(im, expected[lab]))
+
+    def test_transform_error(self):
+        transformer = self.create_transformer(True)
+        files = self.files[:5] + [os.path.join(self.dirname, 'missing.png')]
+        with self.assertRaises(RuntimeError):
+            list(transformer.run(files, self.labels))
+        # the transformer is still usable after the error.
+        self.assertEqual(
+            len(list(transformer.run(self.files, self.labels))),
+            len(self.files))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -105,9 +105,19 @@ class EndIteration(WithMetric):
     in your event_handler call back
     """
 
-    def __init__(self, pass_id, batch_id, cost, evaluator, gm):
+    def __init__(self,
+                 pass_id,
+                 batch_id,
+                 cost,
+                 evaluator,
+                 gm,
+                 data_time=None,
+                 compute_time=None):
         self.pass_id = pass_id
         self.batch_id = batch_id
         self.cost = cost
         self.gm = gm
+        # The seconds waiting for the data batch and computing it.
+        self.data_time = data_time
+        self.compute_time = compute_time
         WithMetric.__init__(self, evaluator)
@@ -16,7 +16,6 @@ import numpy
 import collections
 import topology
 import paddle
-import cPickle
 
 __all__ = ['infer', 'Inference']
 
@@ -38,6 +37,10 @@ class Inference(object):
                         of paddle.v2.config_base.Layer
     :param parameters: The parameters dictionary.
     :type parameters: paddle.v2.parameters.Parameters
+    :param fileobj: The topology saved by
+                    paddle.v2.topology.Topology.serialize_for_inference, used
+                    when output_layer is not set.
+    :type fileobj: file
     """
 
     def __init__(self, parameters, output_layer=None, fileobj=None):
@@ -49,11 +52,11 @@ class Inference(object):
                 topo.proto(), api.CREATE_MODE_TESTING, [api.PARAMETER_VALUE])
             self.__data_types__ = topo.data_type()
         elif fileobj is not None:
-            tmp = cPickle.load(fileobj)
+            protobin, data_type = topology.deserialize_for_inference(
+                fileobj)
             gm = api.GradientMachine.createByConfigProtoStr(
-                tmp['protobin'], api.CREATE_MODE_TESTING,
-                [api.PARAMETER_VALUE])
-            self.__data_types__ = tmp['data_type']
+                protobin, api.CREATE_MODE_TESTING, [api.PARAMETER_VALUE])
+            self.__data_types__ = data_type
         else:
             raise ValueError("Either output_layer or fileobj must be set")
 
@@ -71,10 +74,27 @@ class Inference(object):
             param.setValueUpdated()
         self.__gradient_machine__ = gm
 
-    def iter_infer(self, input, feeding=None):
+    def iter_infer(self, input, feeding=None, batch_size=None,
+                   pipelined=False):
+        """
+        Yield the outputs of the gradient machine for each batch of the input.
+
+        :param input: input data. Should be python iterable object.
+        :param feeding: Reader dictionary. Default could generate from input
+                        value.
+        :param batch_size: The number of samples of each batch. Default is the
+                           whole input as one batch.
+        :type batch_size: int
+        :param pipelined: Whether to convert the next batch on a background
+                          thread while the current batch is inferred. It
+                          only takes effect on CPU.
+        :type pipelined: bool
+        """
         from data_feeder import DataFeeder
+        from trainer import __converted_batches__
         feeder = DataFeeder(self.__data_types__, feeding)
-        batch_size = len(input)
+        if batch_size is None:
+            batch_size = len(input)
 
         def __reader_impl__():
             for each_sample in input:
@@ -83,9 +103,12 @@ class Inference(object):
         reader = paddle.batch(__reader_impl__, batch_size=batch_size)
 
         self.__gradient_machine__.start()
-        for data_batch in reader():
-            yield self.__gradient_machine__.forwardTest(feeder(data_batch))
-        self.__gradient_machine__.finish()
+        try:
+            for _, in_args, _ in __converted_batches__(reader, feeder,
+                                                       pipelined):
+                yield self.__gradient_machine__.forwardTest(in_args)
+        finally:
+            self.__gradient_machine__.finish()
 
     def iter_infer_field(self, field, **kwargs):
         if not isinstance(field, list) and not isinstance(field, tuple):
@@ -96,6 +119,110 @@ class Inference(object):
                 item = [each_result[each_field] for each_field in field]
                 yield item
 
+    def iter_infer_batch(self,
+                         input,
+                         batch_size,
+                         field='value',
+                         feeding=None,
+                         pipelined=True):
+        """
+        Infer the input batch by batch, and yield the results of each batch as
+        soon as they are computed, so that the memory does not grow with the
+        input.
+
+        ..  code-block:: python
+
+            for prob in inferer.iter_infer_batch(input=reader(),
+                                                 batch_size=128):
+                save(prob)
+
+        :param input: input data. Should be python iterable object, like a
+                      generator of samples.
+        :param batch_size: The number of samples of each batch.
+        :type batch_size: int
+        :param field: output field.
+        :param pipelined: Whether to convert the next batch on a background
+                          thread while the current batch is inferred. It
+                          only takes effect on CPU.
+        :type pipelined: bool
+        :return: The numpy arrays of the batch, ordered as
+                 output_layer1.field1, output_layer2.field1, ...,
+                 output_layer1.field2, ... A single array if there is only one
+                 output.
+        """
+        field = field if isinstance(field, (list, tuple)) else [field]
+        for result in self.iter_infer(
+                input=input,
+                feeding=feeding,
+                batch_size=batch_size,
+                pipelined=pipelined):
+            retv = [
+                each_result[each_field]
+                for each_field in field for each_result in result
+            ]
+            yield retv[0] if len(retv) == 1 else retv
+
+    def infer_into(self,
+                   input,
+                   out,
+                   batch_size,
+                   field='value',
+                   feeding=None,
+                   pipelined=True):
+        """
+        Infer the input batch by batch, and write the results into the
+        preallocated arrays. Together with numpy.memmap, a large input can be
+        inferred to disk with constant memory.
+
+        ..  code-block:: python
+
+            out = numpy.memmap('prob.bin', dtype='float32', mode='w+',
+                               shape=(num_samples, num_classes))
+            inferer.infer_into(input=reader(), out=out, batch_size=128)
+
+        :param input: input data. Should be python iterable object, like a
+                      generator of samples.
+        :param out: The array to write the results into, row by row, or a list
+                    of arrays if there are multiple outputs, in the order of
+                    iter_infer_batch.
+        :type out: numpy.ndarray|list
+        :param batch_size: The number of samples of each batch.
+        :type batch_size: int
+        :param field: output field.
+        :param pipelined: Whether to convert the next batch on a background
+                          thread while the current batch is inferred. It
+                          only takes effect on CPU.
+        :type pipelined: bool
+        :return: The number of rows written into each array.
+        :rtype: list
+        """
+        outs = out if isinstance(out, (list, tuple)) else [out]
+        rows = [0] * len(outs)
+        for retv in self.iter_infer_batch(
+                input=input,
+                batch_size=batch_size,
+                field=field,
+                feeding=feeding,
+                pipelined=pipelined):
+            if not isinstance(retv, list):
+                retv = [retv]
+            if len(retv) != len(outs):
+                raise ValueError("There are %d outputs but %d arrays" %
+                                 (len(retv), len(outs)))
+            for i, item in enumerate(retv):
+                end = rows[i] + len(item)
+                if end > len(outs[i]):
+                    raise ValueError("Output %d has more than %d rows" %
+                                     (i, len(outs[i])))
+                outs[i][rows[i]:end] = item.reshape(
+                    (len(item), ) + outs[i].shape[1:])
+                rows[i] = end
+
+        for each_out in outs:
+            if isinstance(each_out, numpy.memmap):
+                each_out.flush()
+        return rows
+
     def infer(self, input, field='value', flatten_result=True, **kwargs):
         """
         Infer a data by model.
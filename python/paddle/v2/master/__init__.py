@@ -14,4 +14,4 @@
 
 from client import *
 
-__all__ = ['client']
+__all__ = ['client', 'local_master', 'records']
@@ -13,7 +13,11 @@
 # limitations under the License.
 
 import ctypes
+import glob
 import os
+import sys
+import threading
+import Queue
 
 __lib__ = None
 
@@ -93,3 +97,207 @@ class client(object):
 
     def paddle_start_get_records(self, pass_id):
         get_c_lib().paddle_start_get_records(self.c, pass_id)
+
+    def next_records(self, buf, sizes):
+        """gets the next records for training in bulk
+
+        The records are copied into buf back to back, and their sizes
+        are written into sizes. It blocks until the first record is
+        available, and then takes the records that are already buffered,
+        as many as buf and sizes can hold.
+
+        :param buf: the buffer of the records.
+        :type buf: ctypes.c_char array
+        :param sizes: the sizes of the records.
+        :type sizes: ctypes.c_int array
+
+        Returns:
+            int: the number of records if successful, -1 if error
+            happened, -2 if the pass ends, -3 if buf is too small for the
+            next record, whose size is written into sizes[0].
+        """
+        return get_c_lib().paddle_next_records(self.c, buf,
+                                               len(buf), sizes, len(sizes))
+
+
+class local_master(object):
+    """
+    local_master is a stand-in of the master server together with its
+    client. It dispatches the recordio files of the dataset in order, and
+    serves their records from the local disk with the same interface as
+    `client`. It is used to run and test the readers of the master client
+    without a master server.
+    """
+
+    def __init__(self):
+        self.paths = []
+        self.tasks = iter([])
+        self.reader = None
+        self.pending = None
+
+    def request_save_model(self, trainer_id, block_ms):
+        return 1
+
+    def release(self):
+        self.__close__()
+        self.pending = None
+
+    def set_dataset(self, paths):
+        if self.paths:
+            # only the first call is honored, like the master server.
+            return
+        for path in paths:
+            self.paths.extend(sorted(glob.glob(path)))
+
+    def paddle_start_get_records(self, pass_id):
+        self.__close__()
+        self.pending = None
+        self.tasks = iter(self.paths)
+
+    def next_record(self):
+        r = self.__next_record__()
+        if r is None:
+            return None, -2
+        return r, 0
+
+    def next_records(self, buf, sizes):
+        n = 0
+        offset = 0
+        while n < len(sizes):
+            r = self.pending
+            self.pending = None
+            if r is None:
+                r = self.__next_record__()
+            if r is None:
+                break
+            if offset + len(r) > len(buf):
+                self.pending = r
+                if n == 0:
+                    sizes[0] = len(r)
+                    return -3
+                break
+            ctypes.memmove(ctypes.addressof(buf) + offset, r, len(r))
+            offset += len(r)
+            sizes[n] = len(r)
+            n += 1
+        return n if n > 0 else -2
+
+    def __next_record__(self):
+        import recordio
+        while True:
+            if self.reader is None:
+                path = next(self.tasks, None)
+                if path is None:
+                    return None
+                self.reader = recordio.reader(path)
+            r = self.reader.read()
+            if r is not None:
+                return r
+            self.__close__()
+
+    def __close__(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+
+class _RecordBuffer(object):
+    """
+    A reusable buffer of the records fetched in bulk.
+    """
+
+    def __init__(self, buf_size, max_records):
+        self.buf = ctypes.create_string_buffer(buf_size)
+        self.sizes = (ctypes.c_int * max_records)()
+        self.ret = 0
+
+    def records(self, decoder):
+        offset = 0
+        address = ctypes.addressof(self.buf)
+        for i in xrange(self.ret):
+            size = self.sizes[i]
+            r = ctypes.string_at(address + offset, size)
+            offset += size
+            yield decoder(r) if decoder else r
+
+
+def records(c,
+            decoder=None,
+            buf_size=1 << 20,
+            max_records=1024,
+            num_buffers=2):
+    """
+    Yields the records of the current pass from the master client.
+
+    A background thread fetches the records in bulk into reusable buffers,
+    so that the records of the next tasks are prefetched while the current
+    ones are consumed. The records are copied out of the buffers and
+    decoded only when they are yielded.
+
+    ..  code-block:: python
+
+        c.paddle_start_get_records(pass_id)
+        for sample in records(c, decoder=cPickle.loads):
+            ...
+
+    :param c: the master client, or a local_master.
+    :type c: client|local_master
+    :param decoder: the function to decode a record. The raw record is
+        yielded if it is None.
+    :type decoder: callable
+    :param buf_size: the initial size of each buffer in bytes. A buffer
+        grows if it can not hold a record.
+    :type buf_size: int
+    :param max_records: the max number of records fetched at once, which
+        should be positive.
+    :type max_records: int
+    :param num_buffers: the number of buffers.
+    :type num_buffers: int
+    """
+    if max_records <= 0:
+        raise ValueError("max_records should be positive")
+    free = Queue.Queue()
+    ready = Queue.Queue()
+    stop = threading.Event()
+    for _ in xrange(num_buffers):
+        free.put(_RecordBuffer(buf_size, max_records))
+
+    def fetch():
+        try:
+            while True:
+                b = free.get()
+                if stop.is_set():
+                    # the consumer quits.
+                    return
+                b.ret = c.next_records(b.buf, b.sizes)
+                while b.ret == -3:
+                    b.buf = ctypes.create_string_buffer(
+                        max(b.sizes[0], 2 * len(b.buf)))
+                    b.ret = c.next_records(b.buf, b.sizes)
+                ready.put(b)
+                if b.ret < 0:
+                    return
+        except:
+            ready.put(sys.exc_info())
+
+    t = threading.Thread(target=fetch)
+    t.daemon = True
+    t.start()
+    try:
+        while True:
+            b = ready.get()
+            if isinstance(b, tuple):
+                raise b[0], b[1], b[2]
+            if b.ret == -2:
+                break
+            if b.ret < 0:
+                raise RuntimeError("get records error: %d" % b.ret)
+            for r in b.records(decoder):
+                yield r
+            free.put(b)
+    finally:
+        stop.set()
+        free.put(None)
+        # wait for the records being fetched, so that they are not taken
+        # from the next pass started by the caller.
+        t.join()
@@ -14,10 +14,11 @@
 
 import numpy as np
 from paddle.proto.ParameterConfig_pb2 import ParameterConfig
-from collections import OrderedDict
+from collections import OrderedDict, deque
 import paddle.trainer.config_parser as cp
 import struct
 import tarfile
+import zlib
 import cStringIO
 from topology import Topology
 
@@ -62,6 +63,10 @@ class Parameters(object):
     :param __tmp_params__: a dict to store dummy parameters if no
         __gradient_machines__ is appended to `Parameters`.
     :type __tmp_params__: dict
+    :param __pending_rows__: the rows set to parameters without a value in
+        __tmp_params__, by parameter name. They are applied on top of the
+        initialized values when a gradient machine is appended.
+    :type __pending_rows__: dict
 
     Basically usage is
 
@@ -82,6 +87,7 @@ class Parameters(object):
         self.__param_conf__ = OrderedDict()
         self.__gradient_machines__ = []
         self.__tmp_params__ = dict()
+        self.__pending_rows__ = dict()
 
     def __append_config__(self, param_conf):
         """
@@ -222,8 +228,12 @@ class Parameters(object):
             raise ValueError("Value shape mismatch, expect %s, should %s" %
                              (shape, value.shape))
 
+        self.__set_value__(key, value)
+
+    def __set_value__(self, key, value):
         if len(self.__gradient_machines__) == 0:
             self.__tmp_params__[key] = value
+            self.__pending_rows__.pop(key, None)
         else:
             for each_gradient_machine in self.__gradient_machines__:
                 __copy_parameter_to_gradient_machine__(each_gradient_machine,
@@ -257,6 +267,104 @@ class Parameters(object):
 
         return self.__getter_inner(key, api.PARAMETER_GRADIENT)
 
+    def get_rows(self, key, ids):
+        """
+        Get the rows of a parameter by their indices. Only these rows are
+        copied from C++ side, so it is cheap to inspect a few rows of a large
+        embedding.
+
+        :note: If the parameter is on GPU, it is copied as a whole.
+        :param key: parameter name
+        :type key: basestring
+        :param ids: the indices of the rows.
+        :type ids: list|np.ndarray
+        :return: The rows, in the order of ids.
+        :rtype: np.ndarray
+        """
+        import py_paddle.swig_paddle as api
+        return self.__get_rows__(key, ids, api.PARAMETER_VALUE)
+
+    def get_grad_rows(self, key, ids):
+        """
+        Get the rows of a gradient by their indices. Only these rows are
+        copied from C++ side.
+
+        :note: If the gradient is on GPU, it is copied as a whole.
+        :param key: parameter name
+        :type key: basestring
+        :param ids: the indices of the rows.
+        :type ids: list|np.ndarray
+        :return: The rows of the gradient, in the order of ids.
+        :rtype: np.ndarray
+        """
+        import py_paddle.swig_paddle as api
+        if self.__param_conf__[key].is_static:
+            ids = self.__check_rows__(key, ids)
+            return np.zeros(
+                (len(ids), ) + self.get_shape(key)[1:], dtype=np.float32)
+
+        return self.__get_rows__(key, ids, api.PARAMETER_GRADIENT)
+
+    def __get_rows__(self, key, ids, param_type):
+        ids = self.__check_rows__(key, ids)
+        shape = self.get_shape(key)
+        if len(self.__gradient_machines__) == 0:
+            if key not in self.__tmp_params__:
+                raise ValueError("Parameter %s has no value before a gradient "
+                                 "machine is appended" % key)
+            return self.__tmp_params__[key].reshape(shape)[ids]
+        else:
+            vec, mat = __parameter_matrix__(self.__gradient_machines__[0],
+                                            key, param_type, shape)
+            return mat[ids]
+
+    def set_rows(self, key, ids, values):
+        """
+        Set the rows of a parameter by their indices. Only these rows are
+        copied to C++ side, so it is cheap to update a few rows of a large
+        embedding.
+
+        :note: If the parameter is on GPU, it is copied as a whole. If the
+            parameter has no value yet, like after `paddle.parameters.create`,
+            the rows are kept and set on top of the initialized value when a
+            gradient machine is appended.
+        :param key: parameter name
+        :type key: basestring
+        :param ids: the indices of the rows.
+        :type ids: list|np.ndarray
+        :param values: the rows, in the order of ids.
+        :type values: np.ndarray
+        :return: Nothing.
+        """
+        ids = self.__check_rows__(key, ids)
+        shape = self.get_shape(key)
+        if not isinstance(values, np.ndarray):
+            raise ValueError("Must return ndarray")
+        values = values.astype(dtype=np.float32)
+        if values.shape != (len(ids), ) + shape[1:]:
+            raise ValueError("Rows shape mismatch, expect %s, should %s" %
+                             ((len(ids), ) + shape[1:], values.shape))
+
+        if len(self.__gradient_machines__) == 0:
+            if key in self.__tmp_params__:
+                self.__tmp_params__[key].reshape(shape)[ids] = values
+            else:
+                self.__pending_rows__.setdefault(key, []).append((ids, values))
+        else:
+            for each_gradient_machine in self.__gradient_machines__:
+                __set_rows_in_gradient_machine__(each_gradient_machine, key,
+                                                 ids, values, shape)
+
+    def __check_rows__(self, key, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.ndim != 1:
+            raise ValueError("ids should be a list of row indices")
+        rows = self.get_shape(key)[0]
+        if ids.size > 0 and (ids.min() < 0 or ids.max() >= rows):
+            raise ValueError("Row index out of range [0, %d) of %s" %
+                             (rows, key))
+        return ids
+
     def set(self, parameter_name, value):
         """
         Set parameter by parameter name & matrix.
@@ -291,41 +399,58 @@ class Parameters(object):
                     # If no such parameter in gradient machine, then don't copy
                     pass
 
+        for name, patches in self.__pending_rows__.iteritems():
+            for ids, values in patches:
+                try:
+                    __set_rows_in_gradient_machine__(
+                        gradient_machine, name, ids, values,
+                        self.get_shape(name))
+                except ValueError:
+                    # If no such parameter in gradient machine, then don't copy
+                    pass
+
         self.__gradient_machines__.append(gradient_machine)
 
     def serialize(self, name, f):
         """
+        Serialize a parameter into the file. The parameter is written in
+        chunks directly from the buffer of its matrix.
 
-        :param name:
+        :param name: parameter name
+        :type name: basestring
         :param f:
         :type f: file
         :return:
         """
-        param = self.get(name)
-        size = reduce(lambda a, b: a * b, param.shape)
-        f.write(struct.pack("IIQ", 0, 4, size))
-        param = param.astype(np.float32)
-        s = param.tostring()
-        wrote_size = 0
-        buf = buffer(s, wrote_size, 65535)
+        stream = _ParameterStream(self.get(name))
+        buf = stream.read(_CHUNK_SIZE)
         while buf:  # f.write crashes with big data blog.
             f.write(buf)
-            wrote_size += 65535
-            buf = buffer(s, wrote_size, 65535)
+            buf = stream.read(_CHUNK_SIZE)
 
     def deserialize(self, name, f):
         """
+        Deserialize a parameter from the file. The data is read in chunks
+        into a preallocated matrix.
 
-        :param name:
+        :param name: parameter name
+        :type name: basestring
         :param f:
         :type f: file
         :return:
         """
-        f.read(16)  # header
-        arr = np.frombuffer(f.read(), dtype=np.float32)
-        self.set(name, arr.reshape(self.get_shape(name)))
+        value = None
+        if len(self.__gradient_machines__) == 0:
+            # reuse the matrix of the parameter if possible.
+            value = self.__tmp_params__.get(name)
+        shape = self.get_shape(name)
+        if value is None or value.shape != shape or \
+                value.dtype != np.float32 or not value.flags.c_contiguous:
+            value = np.empty(shape, dtype=np.float32)
+        __read_parameter__(f, value)
+        self.__set_value__(name, value)
 
-    def to_tar(self, f):
+    def to_tar(self, f, compress=False, num_threads=1):
         """
         Save parameters to a tar file.
 
@@ -335,16 +460,21 @@ class Parameters(object):
 
         :param f:
         :type f: file
+        :param compress: whether to gzip the tar file. The blocks of the file
+            are compressed in parallel, each into a gzip member, so it is
+            still a valid .tar.gz file.
+        :type compress: bool
+        :param num_threads: the number of threads to compress the file.
+        :type num_threads: int
         :return:
         """
-        tar = tarfile.TarFile(fileobj=f, mode='w')
+        fileobj = _ParallelGzipWriter(f, num_threads) if compress else f
+        tar = tarfile.TarFile(fileobj=fileobj, mode='w')
         for nm in self.names():
-            buf = cStringIO.StringIO()
-            self.serialize(nm, buf)
+            stream = _ParameterStream(self.get(nm))
             tarinfo = tarfile.TarInfo(name=nm)
-            buf.seek(0)
-            tarinfo.size = len(buf.getvalue())
-            tar.addfile(tarinfo, buf)
+            tarinfo.size = stream.size
+            tar.addfile(tarinfo, stream)
 
             conf = self.__param_conf__[nm]
             confStr = conf.SerializeToString()
@@ -353,6 +483,9 @@ class Parameters(object):
             buf = cStringIO.StringIO(confStr)
             buf.seek(0)
             tar.addfile(tarinfo, fileobj=buf)
+        tar.close()
+        if compress:
+            fileobj.close()
 
     @staticmethod
     def from_tar(f):
@@ -363,43 +496,271 @@ class Parameters(object):
         defined network and the given file. For example, it
         can be used in the inference.
 
-        :param f: the initialized model file.
+        :param f: the initialized model file, which may be gzipped.
         :type f: tar file
         :return: A Parameters object.
         :rtype: Parameters.
         """
         params = Parameters()
-        tar = tarfile.TarFile(fileobj=f, mode='r')
+        values = dict()
+        tar = tarfile.open(fileobj=f, mode='r')
+        # read the members in order, so that a gzipped file is not rewound.
         for finfo in tar:
             assert isinstance(finfo, tarfile.TarInfo)
+            member = tar.extractfile(finfo)
             if finfo.name.endswith('.protobuf'):
-                f = tar.extractfile(finfo)
                 conf = ParameterConfig()
-                conf.ParseFromString(f.read())
+                conf.ParseFromString(member.read())
                 params.__append_config__(conf)
+            else:
+                values[finfo.name] = __read_parameter__(member)
 
         for param_name in params.names():
-            f = tar.extractfile(param_name)
-            params.deserialize(param_name, f)
+            value = values.pop(param_name)
+            params.__set_value__(param_name,
+                                 value.reshape(params.get_shape(param_name)))
         return params
 
-    def init_from_tar(self, f, exclude_params=[]):
+    def init_from_tar(self, f, exclude_params=[], rows=None):
         """
         Different from `from_tar`, this interface can be used to
         init partial network parameters from another saved model.
+        Only the parameters to be initialized are read from the file.
 
-        :param f: the initialized model file.
+        :param f: the initialized model file, which may be gzipped.
         :type f: tar file
         :param exclude_params: the names of parameters that should  
             not be initialized from the model file.
         :type exclude_params: list of strings
+        :param rows: the indices of the rows to initialize, by parameter
+            name. Only these rows of the parameters are read from the model
+            file and set, like the rows of an embedding to warm start.
+        :type rows: dict
         :return: Nothing.
         """
+        rows = rows or dict()
+        tar = tarfile.open(fileobj=f, mode='r')
+        for finfo in tar:
+            pname = finfo.name
+            if pname.endswith('.protobuf') or \
+                    pname not in self.__param_conf__ or \
+                    pname in exclude_params:
+                continue
+            if pname in rows:
+                ids = self.__check_rows__(pname, rows[pname])
+                self.set_rows(pname, ids,
+                              __read_parameter_rows__(
+                                  tar.extractfile(finfo), ids,
+                                  self.get_shape(pname)))
+            else:
+                self.deserialize(pname, tar.extractfile(finfo))
+
+
+_CHUNK_SIZE = 1 << 16
+
+
+class _ParameterStream(object):
+    """
+    A read-only file object of a serialized parameter. The chunks are sliced
+    from the buffer of the parameter matrix, so that it is not copied as a
+    whole when written into a tar file.
+    """
+
+    def __init__(self, value):
+        value = np.ascontiguousarray(value, dtype=np.float32)
+        self.header = struct.pack("IIQ", 0, 4, value.size)
+        self.data = value.reshape(-1).view(np.uint8)
+        self.size = len(self.header) + self.data.size
+        self.offset = 0
+
+    def read(self, size=-1):
+        if size < 0:
+            size = self.size - self.offset
+        end = min(self.offset + size, self.size)
+        header_size = len(self.header)
+        if self.offset < header_size:
+            buf = self.header[self.offset:end] + \
+                  self.data[:max(end - header_size, 0)].tostring()
+        else:
+            buf = buffer(self.data, self.offset - header_size,
+                         end - self.offset)
+        self.offset = end
+        return buf
+
+
+class _ParallelGzipWriter(object):
+    """
+    A write-only file object which gzips the data written into it by a pool
+    of threads, like pigz. The data is split into blocks, each compressed
+    into a gzip member, and a concatenation of gzip members is a valid gzip
+    file.
+    """
+
+    def __init__(self, fileobj, num_threads, block_size=1 << 22,
+                 compresslevel=6):
+        from multiprocessing.pool import ThreadPool
+        self.fileobj = fileobj
+        self.num_threads = num_threads
+        self.block_size = block_size
+        self.compresslevel = compresslevel
+        self.pool = ThreadPool(num_threads)
+        self.pending = deque()
+        self.bufs = []
+        self.bufs_size = 0
+        self.offset = 0
+
+    def tell(self):
+        return self.offset
+
+    def write(self, buf):
+        self.bufs.append(buf)
+        self.bufs_size += len(buf)
+        self.offset += len(buf)
+        if self.bufs_size >= self.block_size:
+            self.__submit__()
+
+    def __submit__(self):
+        self.pending.append(
+            self.pool.apply_async(__gzip_compress__,
+                                  (self.bufs, self.compresslevel)))
+        self.bufs = []
+        self.bufs_size = 0
+        # write the oldest blocks in order, which also bounds the memory.
+        while len(self.pending) > self.num_threads:
+            self.fileobj.write(self.pending.popleft().get())
+
+    def close(self):
+        if self.bufs:
+            self.__submit__()
+        while self.pending:
+            self.fileobj.write(self.pending.popleft().get())
+        self.pool.close()
+        self.pool.join()
+
+
+def __gzip_compress__(bufs, compresslevel):
+    """
+    Compress the buffers into a gzip member. zlib releases the GIL, so it is
+    run in parallel by the threads.
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED,
+                                  16 + zlib.MAX_WBITS)
+    out = [compressor.compress(buf) for buf in bufs]
+    out.append(compressor.flush())
+    return ''.join(out)
+
+
+def __read_parameter__(f, value=None):
+    """
+    Read a serialized parameter from the file into the matrix in chunks.
+
+    :param f:
+    :type f: file
+    :param value: the preallocated matrix. A flat one is allocated if None.
+    :type value: np.ndarray
+    :return: the matrix
+    :rtype: np.ndarray
+    """
+    _, value_size, size = struct.unpack("IIQ", f.read(16))
+    if value_size != 4:
+        raise ValueError("Only float32 parameters are supported")
+    if value is None:
+        value = np.empty(size, dtype=np.float32)
+    elif value.size != size:
+        raise ValueError("Parameter size mismatch, expect %d, got %d" %
+                         (value.size, size))
+    data = value.reshape(-1).view(np.uint8)
+    offset = 0
+    while offset < data.size:
+        buf = f.read(min(_CHUNK_SIZE, data.size - offset))
+        if not buf:
+            raise ValueError("Unexpected end of the parameter")
+        data[offset:offset + len(buf)] = np.frombuffer(buf, dtype=np.uint8)
+        offset += len(buf)
+    return value
+
+
+def __read_parameter_rows__(f, ids, shape):
+    """
+    Read the rows of a serialized parameter from the file. The rows are read
+    in ascending order, so that a gzipped file is not rewound, and the rest
+    of the parameter is skipped.
+
+    :param f:
+    :type f: file
+    :param ids: the indices of the rows.
+    :type ids: np.ndarray
+    :param shape: the shape of the parameter.
+    :type shape: tuple
+    :return: the rows, in the order of ids.
+    :rtype: np.ndarray
+    """
+    _, value_size, size = struct.unpack("IIQ", f.read(16))
+    if value_size != 4:
+        raise ValueError("Only float32 parameters are supported")
+    if size != np.prod(shape):
+        raise ValueError("Parameter size mismatch, expect %d, got %d" %
+                         (np.prod(shape), size))
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    values = np.empty((len(unique_ids), size // shape[0]), dtype=np.float32)
+    row_size = values.shape[1] * 4
+    for i, row in enumerate(unique_ids):
+        f.seek(16 + int(row) * row_size)
+        buf = f.read(row_size)
+        if len(buf) != row_size:
+            raise ValueError("Unexpected end of the parameter")
+        values[i] = np.frombuffer(buf, dtype=np.float32)
+    return values[inverse].reshape((len(ids), ) + tuple(shape[1:]))
+
+
+def __parameter_matrix__(gradient_machine, name, param_type, shape):
+    """
+    Get a matrix of the parameter buffer in the gradient machine. It is a
+    view of the buffer if it is on CPU, otherwise a copy of it.
+
+    :param gradient_machine:
+    :type gradient_machine: api.GradientMachine
+    :param name:
+    :param param_type: api.PARAMETER_VALUE or api.PARAMETER_GRADIENT
+    :param shape: the shape of the parameter.
+    :type shape: tuple
+    :return: the buffer, which should be kept alive with the view, and the
+        matrix.
+    :rtype: tuple
+    """
+    import py_paddle.swig_paddle as api
+    param = __get_parameter_in_gradient_machine__(gradient_machine, name)
+    vec = param.getBuf(param_type)
+    assert isinstance(vec, api.Vector)
+    if vec.isGpu():
+        mat = vec.copyToNumpyArray()
+    else:
+        mat = vec.toNumpyArrayInplace()
+    return vec, mat.reshape(shape)
+
 
-        tar_param = Parameters.from_tar(f)
-        for pname in tar_param.names():
-            if pname in self.names() and pname not in exclude_params:
-                self.set(pname, tar_param.get(pname))
+def __set_rows_in_gradient_machine__(gradient_machine, name, ids, values,
+                                     shape):
+    """
+    Set the rows of the parameter buffer in the gradient machine.
+
+    :param gradient_machine:
+    :type gradient_machine: api.GradientMachine
+    :param name:
+    :param ids: the indices of the rows.
+    :type ids: np.ndarray
+    :param values: the rows, in the order of ids.
+    :type values: np.ndarray
+    :param shape: the shape of the parameter.
+    :type shape: tuple
+    :return:
+    """
+    import py_paddle.swig_paddle as api
+    vec, mat = __parameter_matrix__(gradient_machine, name,
+                                    api.PARAMETER_VALUE, shape)
+    mat[ids] = values
+    if vec.isGpu():
+        vec.copyFromNumpyArray(mat.ravel())
 
 
 def __get_parameter_in_gradient_machine__(gradient_machine, name):
@@ -438,4 +799,4 @@ def __copy_parameter_to_gradient_machine__(gradient_machine, name, arr):
     param = __get_parameter_in_gradient_machine__(gradient_machine, name)
     vec = param.getBuf(api.PARAMETER_VALUE)
     assert isinstance(vec, api.Vector)
-    vec.copyFromNumpyArray(arr.flatten())
+    vec.copyFromNumpyArray(arr.ravel())
@@ -88,12 +88,18 @@ def recordio(paths, buf_size=100):
 pass_num = 0
 
 
-def cloud_reader(paths, etcd_endpoints, timeout_sec=5, buf_size=64):
+def cloud_reader(paths,
+                 etcd_endpoints,
+                 timeout_sec=5,
+                 buf_size=64,
+                 prefetch=False):
     """
     Create a data reader that yield a record one by one from
         the paths:
     :paths: path of recordio files, can be a string or a string list.
     :etcd_endpoints: the endpoints for etcd cluster
+    :prefetch: fetch the records in bulk on a background thread, see
+        `paddle.v2.master.records`.
     :returns: data reader of recordio files.
 
     ..  code-block:: python
@@ -119,6 +125,11 @@ def cloud_reader(paths, etcd_endpoints, timeout_sec=5, buf_size=64):
         c.paddle_start_get_records(pass_num)
         pass_num += 1
 
+        if prefetch:
+            for r in master.records(c, decoder=pickle.loads):
+                yield r
+            return
+
         while True:
             r, e = c.next_record()
             if not r:
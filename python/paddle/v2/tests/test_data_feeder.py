@@ -233,6 +233,36 @@ class DataFeederTest(unittest.TestCase):
             self.assertEqual(out_sparse.getSparseRowCols(i), data[i][1])
             self.assertEqual(out_index[i], data[i][0])
 
+    def test_integer_sub_sequence(self):
+        data = [[[[1, 2], [3]]], [[[4], [5, 6, 7], [8]]]]
+        data_types = [('input', data_type.integer_value_sub_sequence(10))]
+        feeder = DataFeeder(data_types, {'input': 0})
+        arg = feeder(data)
+        self.assertEqual(
+            arg.getSlotSequenceStartPositions(0).copyToNumpyArray().tolist(),
+            [0, 3, 8])
+        self.assertEqual(
+            arg.getSlotSubSequenceStartPositions(0).copyToNumpyArray().tolist(),
+            [0, 2, 3, 4, 7, 8])
+        self.assertEqual(
+            arg.getSlotIds(0).copyToNumpyArray().tolist(), range(1, 9))
+
+    def test_dense_shape_mismatch(self):
+        data = [[np.random.random(10)], [np.random.random(9)]]
+        feeder = DataFeeder([('input', data_type.dense_vector(10))],
+                            {'input': 0})
+        self.assertRaises(ValueError, feeder, data)
+
+    def test_empty_dense_sequence(self):
+        data = [[[]], [[]]]
+        feeder = DataFeeder(
+            [('input', data_type.dense_vector_sequence(10))], {'input': 0})
+        arg = feeder(data)
+        self.assertEqual(arg.getSlotValue(0).getHeight(), 0)
+        self.assertEqual(
+            arg.getSlotSequenceStartPositions(0).copyToNumpyArray().tolist(),
+            [0, 0, 0])
+
     def test_dense_set_shape(self):
         # test 2-D data
         def gen_data(batch_size, shape):
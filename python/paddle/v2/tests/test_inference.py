@@ -0,0 +1,90 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import paddle.v2 as paddle
+
+
+def reader():
+    np.random.seed(1)
+    for _ in xrange(50):
+        yield np.random.random(8).astype('float32'),
+
+
+class TestStreamingInference(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        paddle.init(use_gpu=False, trainer_count=1)
+
+    def setUp(self):
+        x = paddle.layer.data(name='x', type=paddle.data_type.dense_vector(8))
+        self.predict = paddle.layer.fc(input=x,
+                                       size=3,
+                                       act=paddle.activation.Softmax())
+        self.parameters = paddle.parameters.create(self.predict)
+        self.inferer = paddle.inference.Inference(
+            output_layer=self.predict, parameters=self.parameters)
+        self.expected = self.inferer.infer(input=list(reader()))
+
+    def test_iter_infer_batch(self):
+        for pipelined in [False, True]:
+            batches = list(
+                self.inferer.iter_infer_batch(
+                    input=reader(), batch_size=16, pipelined=pipelined))
+            self.assertEqual([len(b) for b in batches], [16, 16, 16, 2])
+            self.assertTrue(
+                np.allclose(np.concatenate(batches), self.expected))
+
+    def test_early_exit(self):
+        threads = threading.active_count()
+        for _ in xrange(3):
+            batches = self.inferer.iter_infer_batch(
+                input=reader(), batch_size=4)
+            next(batches)
+            batches.close()
+        # the conversion threads of the abandoned calls exit.
+        deadline = time.time() + 5
+        while threading.active_count() > threads and time.time() < deadline:
+            time.sleep(0.1)
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_infer_into(self):
+        dirname = tempfile.mkdtemp()
+        try:
+            out = np.memmap(
+                os.path.join(dirname, 'prob.bin'),
+                dtype='float32',
+                mode='w+',
+                shape=(50, 3))
+            rows = self.inferer.infer_into(
+                input=reader(), out=out, batch_size=16)
+            self.assertEqual(rows, [50])
+            self.assertTrue(np.allclose(out, self.expected))
+
+            too_small = np.zeros((40, 3), dtype='float32')
+            self.assertRaises(ValueError, self.inferer.infer_into, reader(),
+                              too_small, 16)
+        finally:
+            shutil.rmtree(dirname)
+
+
+if __name__ == '__main__':
+    unittest.main()
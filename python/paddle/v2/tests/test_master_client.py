@@ -0,0 +1,73 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import cPickle as pickle
+import os
+import shutil
+import tempfile
+import unittest
+
+import recordio
+
+import paddle.v2.master as master
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.samples = []
+        for i in xrange(3):
+            w = recordio.writer(os.path.join(self.dirname, "%d.recordio" % i))
+            for j in xrange(100):
+                sample = (i, j, "x" * (i * 100 + j))
+                w.write(pickle.dumps(sample))
+                self.samples.append(sample)
+            w.close()
+        self.c = master.local_master()
+        self.c.set_dataset([os.path.join(self.dirname, "*.recordio")])
+
+    def tearDown(self):
+        self.c.release()
+        shutil.rmtree(self.dirname)
+
+    def test_records(self):
+        for pass_id in xrange(2):
+            self.c.paddle_start_get_records(pass_id)
+            # the small buffers grow to hold the large records.
+            samples = list(
+                master.records(
+                    self.c,
+                    decoder=pickle.loads,
+                    buf_size=64,
+                    max_records=7))
+            self.assertEqual(samples, self.samples)
+
+    def test_raw_records(self):
+        self.c.paddle_start_get_records(0)
+        records = master.records(self.c)
+        self.assertEqual(pickle.loads(next(records)), self.samples[0])
+        # quit in the middle of the pass.
+        records.close()
+        # the records of the next pass are not taken by the quitted reader.
+        self.c.paddle_start_get_records(1)
+        samples = list(master.records(self.c, decoder=pickle.loads))
+        self.assertEqual(samples, self.samples)
+
+    def test_invalid_max_records(self):
+        with self.assertRaises(ValueError):
+            next(master.records(self.c, max_records=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
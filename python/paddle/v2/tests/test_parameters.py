@@ -24,10 +24,13 @@ except ImportError:
                          "unittest will not be run."
     sys.exit(0)
 
+import py_paddle.swig_paddle as api
+import paddle.v2 as paddle
 import paddle.v2.parameters as parameters
 import paddle.v2.data_type as data_type
 import paddle.v2.layer as layer
 from paddle.v2.attr import ParamAttr
+from paddle.v2.topology import Topology
 from paddle.proto.ParameterConfig_pb2 import ParameterConfig
 import random
 import cStringIO
@@ -138,6 +141,150 @@ class TestParameters(unittest.TestCase):
             v2 = p2.get(name)
             self.assertTrue(numpy.isclose(v1, v2).all())
 
+    def test_compressed_serialization(self):
+        params = parameters.Parameters()
+        params.__append_config__(__rand_param_config__("param_0"))
+        params.__append_config__(__rand_param_config__("param_1", 1))
+        for name in params.names():
+            params.set(name,
+                       numpy.random.uniform(
+                           -1.0, 1.0, size=params.get_shape(name)))
+
+        tmp_file = cStringIO.StringIO()
+        params.to_tar(tmp_file, compress=True, num_threads=4)
+        self.assertEqual(tmp_file.getvalue()[:2], '\x1f\x8b')
+        tmp_file.seek(0)
+        params_dup = parameters.Parameters.from_tar(tmp_file)
+        self.assertEqual(params_dup.names(), params.names())
+        for name in params.names():
+            self.assertTrue(
+                numpy.array_equal(params.get(name), params_dup.get(name)))
+
+    def test_init_from_tar_selected(self):
+        p1 = parameters.Parameters()
+        p2 = parameters.Parameters()
+        for name, size in [('param_0', 128), ('param_1', 256)]:
+            p1.__append_config__(__rand_param_config__(name, size))
+            p2.__append_config__(__rand_param_config__(name, size))
+            p1.set(name, numpy.random.uniform(-1.0, 1.0, size=(1, size)))
+            p2.set(name, numpy.zeros((1, size), dtype=numpy.float32))
+        p2.__append_config__(__rand_param_config__('param_2', 64))
+        tmp_file = cStringIO.StringIO()
+        p1.to_tar(tmp_file)
+
+        tmp_file.seek(0)
+        p2.init_from_tar(tmp_file, exclude_params=['param_1'])
+        self.assertTrue(numpy.array_equal(p1.get('param_0'), p2.get('param_0')))
+        self.assertFalse(p2.get('param_1').any())
+
+        p3 = parameters.Parameters()
+        p3.__append_config__(__rand_param_config__('param_0', 64))
+        tmp_file.seek(0)
+        with self.assertRaises(ValueError):
+            p3.init_from_tar(tmp_file)
+
+    def test_rows(self):
+        params = parameters.Parameters()
+        params.__append_config__(__rand_param_config__("param_0"))
+        shape = params.get_shape("param_0")
+        value = numpy.random.uniform(-1.0, 1.0, size=shape)
+        params.set("param_0", value)
+        ids = [shape[0] - 1, 0, 0]
+        self.assertTrue(
+            numpy.allclose(params.get_rows("param_0", ids), value[ids]))
+
+        rows = numpy.random.uniform(-1.0, 1.0, size=(2, shape[1]))
+        params.set_rows("param_0", [shape[0] - 1, 0], rows)
+        value[[shape[0] - 1, 0]] = rows
+        self.assertTrue(numpy.allclose(params.get("param_0"), value))
+
+        with self.assertRaises(ValueError):
+            params.get_rows("param_0", [shape[0]])
+        with self.assertRaises(ValueError):
+            params.set_rows("param_0", [0], rows)
+
+    def test_rows_with_gradient_machine(self):
+        paddle.init(use_gpu=False, trainer_count=1)
+        x = layer.data(name="x", type=data_type.dense_vector(3))
+        y = layer.fc(x,
+                     size=4,
+                     bias_attr=False,
+                     param_attr=ParamAttr(name="fc.w"))
+        params = parameters.create(y)
+        value = numpy.random.uniform(-1.0, 1.0, size=(3, 4))
+        params.set("fc.w", value)
+        gm = api.GradientMachine.createFromConfigProto(
+            Topology(y).proto(), api.CREATE_MODE_TESTING,
+            [api.PARAMETER_VALUE])
+        params.append_gradient_machine(gm)
+
+        ids = [2, 0, 2]
+        self.assertTrue(
+            numpy.allclose(params.get_rows("fc.w", ids), value[ids]))
+
+        rows = numpy.random.uniform(-1.0, 1.0, size=(1, 4))
+        params.set_rows("fc.w", [1], rows)
+        value[1] = rows
+        self.assertTrue(numpy.allclose(params.get_rows("fc.w", [1]), rows))
+        # the other rows of the buffer in the gradient machine are untouched
+        param, = [p for p in gm.getParameters() if p.getName() == "fc.w"]
+        buf = param.getBuf(api.PARAMETER_VALUE).copyToNumpyArray()
+        self.assertTrue(numpy.allclose(buf.reshape(3, 4), value))
+
+    def test_init_from_tar_rows_before_gradient_machine(self):
+        paddle.init(use_gpu=False, trainer_count=1)
+        x = layer.data(name="x", type=data_type.dense_vector(3))
+        y = layer.fc(x,
+                     size=4,
+                     bias_attr=False,
+                     param_attr=ParamAttr(
+                         name="fc.w", initial_mean=0.5, initial_std=0.0))
+        saved = parameters.create(y)
+        saved.set("fc.w", numpy.random.uniform(-1.0, 1.0, size=(3, 4)))
+        tmp_file = cStringIO.StringIO()
+        saved.to_tar(tmp_file)
+        tmp_file.seek(0)
+
+        # no value exists before the gradient machine is appended, so the
+        # rows are set on top of its initialization.
+        params = parameters.create(y)
+        params.init_from_tar(tmp_file, rows={"fc.w": [2]})
+        with self.assertRaises(ValueError):
+            params.get_rows("fc.w", [2])
+        gm = api.GradientMachine.createFromConfigProto(
+            Topology(y).proto(), api.CREATE_MODE_NORMAL,
+            [api.PARAMETER_VALUE])
+        gm.randParameters()
+        params.append_gradient_machine(gm)
+        expected = numpy.full((3, 4), 0.5, dtype=numpy.float32)
+        expected[2] = saved.get("fc.w")[2]
+        self.assertTrue(
+            numpy.allclose(params.get("fc.w").reshape(3, 4), expected))
+
+    def test_init_from_tar_rows(self):
+        p1 = parameters.Parameters()
+        p2 = parameters.Parameters()
+        for name in ['param_0', 'param_1']:
+            conf = __rand_param_config__(name)
+            p1.__append_config__(conf)
+            p2.__append_config__(conf)
+            shape = p1.get_shape(name)
+            p1.set(name, numpy.random.uniform(-1.0, 1.0, size=shape))
+            p2.set(name, numpy.zeros(shape, dtype=numpy.float32))
+
+        for compress in [False, True]:
+            tmp_file = cStringIO.StringIO()
+            p1.to_tar(tmp_file, compress=compress)
+            tmp_file.seek(0)
+            rows = p1.get_shape('param_0')[0]
+            ids = [rows - 1, 0, rows // 2]
+            p2.init_from_tar(
+                tmp_file, exclude_params=['param_1'], rows={'param_0': ids})
+            expected = numpy.zeros(p1.get_shape('param_0'))
+            expected[ids] = p1.get('param_0')[ids]
+            self.assertTrue(numpy.allclose(p2.get('param_0'), expected))
+            self.assertFalse(p2.get('param_1').any())
+
 
 if __name__ == '__main__':
     unittest.main()
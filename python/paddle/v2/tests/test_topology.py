@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import cStringIO
 import unittest
 import paddle.v2.layer as layer
 import paddle.v2.topology as topology
@@ -80,6 +81,39 @@ class TestTopology(unittest.TestCase):
         topology.Topology([cost1, cost2]).proto()
         topology.Topology([inference, maxid]).proto()
 
+    def test_memoize(self):
+        pixel = layer.data(name='pixel4', type=data_type.dense_vector(784))
+        label = layer.data(name='label4', type=data_type.integer_value(10))
+        inference = layer.fc(input=pixel,
+                             size=10,
+                             act=conf_helps.SoftmaxActivation())
+        cost = layer.classification_cost(input=inference, label=label)
+        topo1 = topology.Topology(cost)
+        topo2 = topology.Topology(cost)
+        self.assertEqual(topo1.proto(), topo2.proto())
+        self.assertEqual(topo1.data_type(), topo2.data_type())
+        # each topology owns its model config.
+        self.assertIsNot(topo1.proto(), topo2.proto())
+        topo1.proto().parameters[0].momentum = 0.5
+        self.assertNotEqual(topo2.proto().parameters[0].momentum, 0.5)
+        self.assertNotEqual(
+            topology.Topology(cost).proto().parameters[0].momentum, 0.5)
+
+    def test_serialize_for_inference(self):
+        pixel = layer.data(name='pixel5', type=data_type.dense_vector(784))
+        inference = layer.fc(input=pixel,
+                             size=10,
+                             act=conf_helps.SoftmaxActivation())
+        topo = topology.Topology(inference)
+        stream = cStringIO.StringIO()
+        topo.serialize_for_inference(stream)
+        stream.seek(0)
+        protobin, data_types = topology.deserialize_for_inference(stream)
+        self.assertEqual(protobin, topo.proto().SerializeToString())
+        self.assertEqual(len(data_types), 1)
+        self.assertEqual(data_types[0][0], 'pixel5')
+        self.assertEqual(data_types[0][1].dim, 784)
+
 
 if __name__ == '__main__':
     unittest.main()
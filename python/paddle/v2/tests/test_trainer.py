@@ -0,0 +1,105 @@
+#   Copyright (c) 2018 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest
+
+import numpy as np
+import py_paddle.swig_paddle as api
+import paddle.v2 as paddle
+from paddle.v2.trainer import __converted_batches__
+
+
+def reader():
+    np.random.seed(1)
+    for _ in xrange(20):
+        x = np.random.random(8).astype('float32')
+        yield x, int(x.sum() > 4)
+
+
+class TestPipelinedTrain(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        paddle.init(use_gpu=False, trainer_count=1)
+
+    def train(self, pipelined, batch_reader):
+        x = paddle.layer.data(name='x', type=paddle.data_type.dense_vector(8))
+        label = paddle.layer.data(
+            name='label', type=paddle.data_type.integer_value(2))
+        predict = paddle.layer.fc(input=x,
+                                  size=2,
+                                  act=paddle.activation.Softmax(),
+                                  param_attr=paddle.attr.Param(
+                                      initial_std=0.1, initial_mean=0))
+        cost = paddle.layer.classification_cost(input=predict, label=label)
+        parameters = paddle.parameters.create(cost)
+        for name in parameters.names():
+            parameters.set(name,
+                           np.full(
+                               parameters.get_shape(name), 0.1,
+                               dtype='float32'))
+        trainer = paddle.trainer.SGD(
+            cost, parameters, paddle.optimizer.Momentum(learning_rate=0.1))
+        events = []
+
+        def event_handler(event):
+            events.append(event)
+
+        trainer.train(
+            batch_reader,
+            num_passes=2,
+            event_handler=event_handler,
+            feeding={'x': 0,
+                     'label': 1},
+            pipelined=pipelined)
+        return events
+
+    def test_pipelined(self):
+        batch_reader = paddle.batch(reader, batch_size=4)
+        events = self.train(False, batch_reader)
+        pipelined_events = self.train(True, batch_reader)
+        self.assertEqual([type(e) for e in events],
+                         [type(e) for e in pipelined_events])
+        for event, pipelined_event in zip(events, pipelined_events):
+            if isinstance(event, paddle.event.EndIteration):
+                self.assertEqual(event.batch_id, pipelined_event.batch_id)
+                self.assertAlmostEqual(event.cost, pipelined_event.cost)
+                self.assertGreaterEqual(pipelined_event.data_time, 0)
+                self.assertGreater(pipelined_event.compute_time, 0)
+
+    def test_pipelined_on_gpu(self):
+        is_using_gpu = api.isUsingGpu
+        api.isUsingGpu = lambda: True
+        try:
+            threads = threading.active_count()
+            batches = __converted_batches__(
+                paddle.batch(reader, batch_size=4), len, True)
+            data_batch, in_args, _ = next(batches)
+            # the batches are converted on the calling thread on GPU.
+            self.assertEqual(threading.active_count(), threads)
+            self.assertEqual(in_args, len(data_batch))
+            batches.close()
+        finally:
+            api.isUsingGpu = is_using_gpu
+
+    def test_reader_error(self):
+        def broken_reader():
+            yield [(np.zeros(8, dtype='float32'), 0)]
+            raise IOError("broken reader")
+
+        self.assertRaises(IOError, self.train, True, broken_reader)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,7 +21,12 @@ import config_base
 import cPickle
 from paddle.trainer import config_parser as cp
 
-__all__ = ['Topology']
+__all__ = ['Topology', 'deserialize_for_inference']
+
+# The model configs of the recently parsed networks, keyed on the identity of
+# their layers and the state of the global config, in the order of use.
+__parsed_networks__ = collections.OrderedDict()
+__MAX_PARSED_NETWORKS__ = 16
 
 
 class Topology(object):
@@ -43,8 +48,8 @@ class Topology(object):
         if extra_layers is not None:
             extra_layers = __check__(extra_layers)
 
-        self.__model_config__ = v2_layer.parse_network(
-            layers, extra_layers=extra_layers)
+        self.__model_config__ = __parse_network__(layers, extra_layers)
+        self.__data_type__ = None
 
         if extra_layers is not None:
             self.layers.extend(extra_layers)
@@ -120,10 +125,11 @@ class Topology(object):
         get data_type from proto, such as:
         [('image', dense_vector(768)), ('label', integer_value(10))]
         """
-        data_layers = self.data_layers()
-
-        return [(nm, data_layers[nm].data_type)
-                for nm in self.proto().input_layer_names]
+        if self.__data_type__ is None:
+            data_layers = self.data_layers()
+            self.__data_type__ = [(nm, data_layers[nm].data_type)
+                                  for nm in self.proto().input_layer_names]
+        return list(self.__data_type__)
 
     def get_layer_proto(self, name):
         for layer in self.__model_config__.layers:
@@ -132,6 +138,14 @@ class Topology(object):
         return None
 
     def serialize_for_inference(self, stream):
+        """
+        Save the model config and the data types of the topology to the
+        stream, as one binary artifact. It can be loaded by
+        deserialize_for_inference, or by paddle.v2.inference.Inference with
+        the fileobj argument.
+
+        :param stream: The file object to write to, opened in binary mode.
+        """
         protobin = self.proto().SerializeToString()
         data_type = self.data_type()
         cPickle.dump({
@@ -140,6 +154,50 @@ class Topology(object):
         }, stream, cPickle.HIGHEST_PROTOCOL)
 
 
+def deserialize_for_inference(stream):
+    """
+    Load a topology saved by Topology.serialize_for_inference.
+
+    :param stream: The file object to read from, opened in binary mode.
+    :return: The serialized model config and the data types of the topology.
+    :rtype: tuple
+    """
+    tmp = cPickle.load(stream)
+    if not isinstance(tmp, dict) or 'protobin' not in tmp or \
+            'data_type' not in tmp:
+        raise ValueError("The stream does not contain a serialized topology")
+    return tmp['protobin'], tmp['data_type']
+
+
+def __parse_network__(layers, extra_layers):
+    """
+    Parse the network of the layers, or reuse the model config of the same
+    layers parsed before, if no layer, evaluator, sub model or parameter has
+    been defined since.
+    """
+    extra_layers = extra_layers or []
+    g_model_config = cp.g_config.model_config
+    key = (tuple(map(id, layers)), tuple(map(id, extra_layers)),
+           id(cp.g_config), len(g_model_config.layers),
+           len(g_model_config.evaluators), len(g_model_config.sub_models),
+           len(g_model_config.parameters))
+    entry = __parsed_networks__.pop(key, None)
+    if entry is None:
+        model_config = v2_layer.parse_network(
+            layers, extra_layers=extra_layers)
+        # hold the keyed objects, so their ids are not reused.
+        entry = (list(layers) + list(extra_layers), cp.g_config, model_config)
+        while len(__parsed_networks__) >= __MAX_PARSED_NETWORKS__:
+            __parsed_networks__.popitem(last=False)
+    __parsed_networks__[key] = entry
+
+    # the model config of a topology may be updated, like by
+    # update_from_default, so each topology gets a copy.
+    model_config = ModelConfig()
+    model_config.CopyFrom(entry[2])
+    return model_config
+
+
 def __check_layer_type__(layer):
     if not isinstance(layer, config_base.Layer):
         raise ValueError('layer should have type paddle.v2.config_base.Layer')
@@ -15,6 +15,8 @@
 Module Trainer
 """
 import collections
+import time
+from paddle.reader.decorator import _Prefetcher
 from topology import Topology
 from . import event as v2_event
 from . import optimizer as v2_optimizer
@@ -127,17 +129,27 @@ class SGD(object):
             self.__gradient_machine__.prefetch(in_args)
             self.__parameter_updater__.getParametersRemote()
 
-    def save_parameter_to_tar(self, f):
+    def save_parameter_to_tar(self, f, compress=False, num_threads=1):
         self.__parameter_updater__.catchUpWith()
         self.__parameter_updater__.apply()
         self.__parameter_updater__.getParametersRemote(True, True)
-        self.__parameters__.to_tar(f)
+        self.__parameters__.to_tar(
+            f, compress=compress, num_threads=num_threads)
         self.__parameter_updater__.restore()
 
-    def train(self, reader, num_passes=1, event_handler=None, feeding=None):
+    def train(self,
+              reader,
+              num_passes=1,
+              event_handler=None,
+              feeding=None,
+              pipelined=False):
         """
         Training method. Will train num_passes of input data.
 
+        The EndIteration events carry the seconds the iteration waited for
+        its data batch, as data_time, and spent on forward, backward and
+        update, as compute_time.
+
         :param reader: A reader that reads and yeilds data items. Usually we use a
                        batched reader to do mini-batch training.
         :type reader: collections.Iterable
@@ -148,6 +160,11 @@ class SGD(object):
         :param feeding: Feeding is a map of neural network input name and array
                         index that reader returns.
         :type feeding: dict|list
+        :param pipelined: Whether to read and convert the next batch on a
+                          background thread while the current batch is
+                          trained. The events are the same as without it.
+                          It only takes effect on CPU.
+        :type pipelined: bool
         :return:
         """
         import py_paddle.swig_paddle as api
@@ -172,14 +189,15 @@ class SGD(object):
             event_handler(v2_event.BeginPass(pass_id))
             pass_evaluator.start()
             self.__parameter_updater__.startPass()
-            for batch_id, data_batch in enumerate(reader()):
+            for batch_id, (data_batch, in_args, data_time) in enumerate(
+                    __converted_batches__(reader, feeder, pipelined)):
                 batch_evaluator.start()
                 event_handler(
                     v2_event.BeginIteration(
                         pass_id=pass_id, batch_id=batch_id))
+                compute_start = time.time()
                 pass_type = self.__parameter_updater__.startBatch(
                     len(data_batch))
-                in_args = feeder(data_batch)
                 self.__prepare_parameter__(in_args)
                 self.__gradient_machine__.forwardBackward(in_args, out_args,
                                                           pass_type)
@@ -203,7 +221,9 @@ class SGD(object):
                         batch_id=batch_id,
                         cost=cost,
                         evaluator=batch_evaluator,
-                        gm=self.__gradient_machine__))
+                        gm=self.__gradient_machine__,
+                        data_time=data_time,
+                        compute_time=time.time() - compute_start))
 
             self.__parameter_updater__.finishPass()
             pass_evaluator.finish()
@@ -247,6 +267,44 @@ class SGD(object):
             evaluator=evaluator, cost=total_cost / num_samples)
 
 
+def __converted_batches__(reader, feeder, pipelined):
+    """
+    Yield the data batches of the reader, with their converted arguments and
+    the seconds spent waiting for them. If pipelined, the batches are read
+    and converted on a background thread, at most two batches ahead.
+
+    The pipelined mode only works on CPU. The converter may allocate the
+    arguments on GPU, which is not safe on another thread while the compute
+    thread runs, so the batches are converted on the calling thread when
+    Paddle uses GPU.
+    """
+    import py_paddle.swig_paddle as api
+    if not pipelined or api.isUsingGpu():
+        start = time.time()
+        for data_batch in reader():
+            in_args = feeder(data_batch)
+            yield data_batch, in_args, time.time() - start
+            start = time.time()
+        return
+
+    def converted():
+        for data_batch in reader():
+            yield data_batch, feeder(data_batch)
+
+    batches = _Prefetcher(converted, 2)
+    try:
+        while True:
+            start = time.time()
+            try:
+                data_batch, in_args = next(batches)
+            except StopIteration:
+                break
+            yield data_batch, in_args, time.time() - start
+    finally:
+        # stop the conversion if the consumer stops early.
+        batches.close()
+
+
 def __check_train_args__(reader, event_handler, **kwargs):
     """
     Check train function's argument types